@@ -1,16 +1,94 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS # Needed for cross-origin requests during development
-import pandas as pd
-import numpy as np
-import json
 from src.pipeline.predict_pipeline import predict_input
+from src.pipeline.model_registry import registry
+from src.pipeline.tenant_registry import tenants, UnknownTenantError
+from src.pipeline.feature_schema import FeatureSchema, FeatureValidationError
+from src.pipeline.micro_batcher import MicroBatcher, QueueFullError
+from src.pipeline.prediction_cache import PredictionCache
+from src.pipeline.online_store import OnlineFeatureStore, split_features, assemble_features
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from datetime import date
+import math
+from src.components.config import SERVING
+from src import monitoring
 import traceback
+import time
 
 app = Flask(__name__)
 CORS(app) # Enable CORS for all routes (important for development)
 # At the beginning, Flask and React apps will be running on localhost but in 
 # differents ports so CORS allows to communicate each other.
 
+# Optional: coalesce concurrent /predict calls into one model call.
+batcher = MicroBatcher(predict_input) if SERVING['micro_batching'] else None
+
+# Repeated payloads (re-renders, polling dashboards) are answered without touching the model.
+cache = PredictionCache() if SERVING['prediction_cache'] else None
+
+# Recent daily metrics per user, so /predict/online clients only send today's values.
+online_store = OnlineFeatureStore()
+
+
+def request_model():
+    """ (tenant, snapshot): the model of the user named by the X-Tenant-Id header
+    (or the `tenant` query parameter), the global model when there is none.
+
+    Raises:
+        UnknownTenantError: If the tenant id is invalid or the tenant has no model.
+    """
+    tenant = request.headers.get('X-Tenant-Id') or request.args.get('tenant')
+    return tenant, tenants.get(tenant) if tenant else registry.get()
+
+
+def predict_row(row, loaded, cached=True):
+    """ Prediction of one validated row: prediction cache, then micro-batcher or direct call.
+
+    The cache holds the predictions of a single model version, so the per-tenant
+    models (cached=False) bypass it instead of invalidating it on every request.
+
+    Raises:
+        QueueFullError: If the micro-batching queue is full.
+        FuturesTimeoutError: If the micro-batched prediction took more than SERVING['batch_timeout_s'].
+    """
+    use_cache = cached and cache is not None
+    pred = cache.get(loaded.version, row) if use_cache else None
+    if pred is None:
+        if batcher is not None:
+            # Bounded wait: a stalled batcher thread must not hold the gunicorn thread forever.
+            pred = batcher.submit(row, loaded=loaded, timeout=SERVING['batch_timeout_s'])
+        else:
+            pred = predict_input(row, loaded=loaded)
+        if use_cache:
+            cache.put(loaded.version, row, pred)
+    return pred
+
+def stage(name: str):
+    """ Times a stage (parse, validate, model_lookup, predict...) of the current request. """
+    return monitoring.stage_latency.time(route=request.url_rule.rule, stage=name)
+
+
+@app.before_request
+def start_request():
+    g.start = time.perf_counter()
+    monitoring.http_in_flight.inc()
+
+
+@app.after_request
+def record_request(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    monitoring.http_latency.observe(time.perf_counter() - g.start, route=route)
+    monitoring.http_requests.inc(route=route, method=request.method, status=response.status_code)
+    if response.status_code >= 400:
+        monitoring.http_errors.inc(route=route, status_class=f'{response.status_code // 100}xx')
+    return response
+
+
+@app.teardown_request
+def end_request(error=None):
+    # Teardown runs even when the request failed, so the in-flight gauge can't leak.
+    monitoring.http_in_flight.dec()
+
 # @app.route('/', methods=['GET'])
 # def home():
 #     return 'The Flask Application is running ONLY as a Backend on port 2000'
@@ -20,30 +98,41 @@ CORS(app) # Enable CORS for all routes (important for development)
 def predict():
         try:
             # Parses the JSON data sent from the frontend into a Python dictionary.
-            data = request.get_json()
+            with stage('parse'):
+                data = request.get_json()
             
             if not data:
                 return jsonify({'Error': 'No data was provided'}), 400
             
-            # Then you simply convert the dict to DataFrame:
-            data = pd.DataFrame([data], index=[0])
-            
-                # Load feature order
-            with open("models/model_features.json") as f:
-                feature_order = json.load(f)
-            
-            # Reorder columns
-            data = data[feature_order]
+            # The feature order is loaded once together with the model and compiled
+            # into a validator, so both come from the same snapshot of the registry.
+            with stage('model_lookup'):
+                tenant, loaded = request_model()
+            if loaded.schema is None:
+                raise FileNotFoundError('models/model_features.json was not found next to the model')
             
             # IMPORTANT: all input values which send from the frontend 
-            # are string by default:
-            data = data.astype(float)
+            # are string by default, the schema converts them into a float row:
+            try:
+                with stage('validate'):
+                    data = loaded.schema.to_row(data)
+            except FeatureValidationError as e:
+                return jsonify({'Error': 'Invalid input values', 'Fields': e.errors}), 400
             
-            pred = predict_input(data)
+            try:
+                with stage('predict'):
+                    pred = predict_row(data, loaded, cached=tenant is None)
+            except QueueFullError as e:
+                return jsonify({'Error': str(e)}), 503, {'Retry-After': '1'}
+            except FuturesTimeoutError:
+                return jsonify({'Error': '⏳ The prediction took too long, try again'}), 503, {'Retry-After': '1'}
             
             # jsonify(): Converts a Python dictionary into a JSON response.
             return jsonify({'Prediction': round(float(pred[0]), 2)})
 
+        except UnknownTenantError as e:
+            return jsonify({'Error': str(e)}), 404
+        
             # Exception avoids to see the traceback from the predict_input function 
             # if fails so we need to set explicity. 
         except Exception as e:
@@ -51,6 +140,159 @@ def predict():
             traceback.print_exc() # <--- THIS WILL PRINT THE FULL TRACEBACK
             return jsonify({'Error': str(e)}), 500 # Can hide crucial details for the frontend.
 
+# Only today's raw metrics are sent: the lag/rolling features are built from the
+# days stored for the user, with the same feature engine as the training set.
+# Body: {"user_id": "...", "date": "YYYY-MM-DD" (optional, today by default), <daily metrics>}
+@app.route('/predict/online', methods=['POST'])
+def predict_online():
+        try:
+            with stage('parse'):
+                data = request.get_json()
+            
+            if not isinstance(data, dict) or not data.get('user_id'):
+                return jsonify({'Error': 'A user_id and the metrics of the day are required'}), 400
+            
+            with stage('model_lookup'):
+                tenant, loaded = request_model()
+            if loaded.schema is None:
+                raise FileNotFoundError('models/model_features.json was not found next to the model')
+            
+            try:
+                day = date.fromisoformat(data['date']) if data.get('date') else date.today()
+            except (TypeError, ValueError):
+                return jsonify({'Error': 'Invalid input values', 'Fields': {'date': 'Expected YYYY-MM-DD'}}), 400
+            
+            # Raw daily metrics = model features which the feature engine doesn't derive.
+            base_features, derived = split_features(loaded.schema.features)
+            try:
+                with stage('validate'):
+                    metrics = FeatureSchema(base_features).to_row(data)
+            except FeatureValidationError as e:
+                return jsonify({'Error': 'Invalid input values', 'Fields': e.errors}), 400
+            
+            with stage('feature_assembly'):
+                user_id = str(data['user_id'])
+                online_store.put(user_id, day, dict(zip(base_features, metrics[0].tolist())))
+                features = assemble_features(online_store.history(user_id, day), base_features)
+            
+            missing = [f for f in derived if math.isnan(features[f])]
+            if missing:
+                reason = f'Not enough history for this user (up to the previous {online_store.window_days - 1} days are used)'
+                return jsonify({'Error': reason, 'Fields': {f: reason for f in missing}}), 422
+            
+            try:
+                with stage('predict'):
+                    pred = predict_row(loaded.schema.to_row(features), loaded, cached=tenant is None)
+            except QueueFullError as e:
+                return jsonify({'Error': str(e)}), 503, {'Retry-After': '1'}
+            except FuturesTimeoutError:
+                return jsonify({'Error': '⏳ The prediction took too long, try again'}), 503, {'Retry-After': '1'}
+            
+            return jsonify({'Prediction': round(float(pred[0]), 2)})
+        
+        except UnknownTenantError as e:
+            return jsonify({'Error': str(e)}), 404
+        
+        except Exception as e:
+            print(f"An unexpected error occurred in predict online route: {e}")
+            traceback.print_exc()
+            return jsonify({'Error': str(e)}), 500
+
+# Scores a whole batch (list of records or {feature: [values]}) with a single model call.
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+        try:
+            with stage('parse'):
+                data = request.get_json()
+            
+            if not data:
+                return jsonify({'Error': 'No data was provided'}), 400
+            if not isinstance(data, (list, dict)):
+                return jsonify({'Error': 'Expected a list of records or {feature: [values]}'}), 400
+            
+            n_rows = len(data) if isinstance(data, list) else max((len(v) for v in data.values() if isinstance(v, list)), default=0)
+            if n_rows > SERVING['max_batch_size']:
+                return jsonify({'Error': f"The batch has {n_rows} rows but the maximum is {SERVING['max_batch_size']}"}), 413
+            
+            with stage('model_lookup'):
+                tenant, loaded = request_model()
+            if loaded.schema is None:
+                raise FileNotFoundError('models/model_features.json was not found next to the model')
+            
+            try:
+                with stage('validate'):
+                    matrix, valid_rows, errors = loaded.schema.to_matrix(data)
+            except FeatureValidationError as e:
+                return jsonify({'Error': 'Invalid batch', 'Fields': e.errors}), 400
+            
+            # Rejected rows keep their position in the response with a null prediction.
+            predictions = [None] * (len(valid_rows) + len(errors))
+            if len(valid_rows):
+                with stage('predict'):
+                    preds = predict_input(matrix, loaded=loaded)
+                for position, pred in zip(valid_rows.tolist(), preds.tolist()):
+                    predictions[position] = round(pred, 2)
+            
+            return jsonify({'Predictions': predictions,
+                            'Errors': {str(position): fields for position, fields in errors.items()}})
+        
+        except UnknownTenantError as e:
+            return jsonify({'Error': str(e)}), 404
+        
+        except Exception as e:
+            print(f"An unexpected error occurred in predict batch route: {e}")
+            traceback.print_exc()
+            return jsonify({'Error': str(e)}), 500
+
+# Batch size distribution and queueing delay of the micro-batching layer.
+@app.route('/predict/batching', methods=['GET'])
+def batching_stats():
+    if batcher is None:
+        return jsonify({'Enabled': False})
+    return jsonify({'Enabled': True, **batcher.stats()})
+
+# Hit/miss/eviction counters of the prediction cache.
+@app.route('/predict/cache', methods=['GET'])
+def cache_stats():
+    if cache is None:
+        return jsonify({'Enabled': False})
+    return jsonify({'Enabled': True, **cache.stats()})
+
+# Prometheus scrape endpoint: request/stage latencies, model gauges and the
+# stage timings of the last training run, in the text exposition format.
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return app.response_class(monitoring.render_metrics(), content_type=monitoring.CONTENT_TYPE)
+
+# Residency, hit/miss and eviction counters of the per-tenant models.
+@app.route('/predict/tenants', methods=['GET'])
+def tenant_stats():
+    return jsonify(tenants.stats())
+
+# Liveness: the process is up and answering.
+@app.route('/health', methods=['GET'])
+def health():
+    return jsonify({'Status': 'ok'})
+
+# Readiness: a model is resident, so the instance can receive traffic.
+@app.route('/ready', methods=['GET'])
+def ready():
+    info = registry.info()
+    if not info:
+        return jsonify({'Ready': False}), 503
+    return jsonify({'Ready': True, 'Version': info['Version']})
+
+# Reports which model is resident and how long it took to load it.
+@app.route('/model', methods=['GET'])
+def model_info():
+    info = registry.info()
+    if not info:
+        return jsonify({'Error': 'No model has been loaded yet'}), 503
+    return jsonify(info)
+
 
+# Development server only. In production the app is served by gunicorn (see wsgi.py).
 if __name__ == '__main__':
+    # Poll the models directory so a newly trained model is served without restarting.
+    registry.start_watcher()
     app.run(host='0.0.0.0', port=2000, debug=True) # Flask is listening on all network interfaces (0.0.0.0)
\ No newline at end of file
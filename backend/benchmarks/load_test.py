@@ -0,0 +1,319 @@
+"""
+HTTP load test and request replay of the prediction service.
+
+Payloads are replayed from a JSONL file (one /predict body per line) or
+synthesized from the feature schema (the Features listed by the /model
+endpoint of the server, or a model_features.json given with --features).
+
+Arrival modes:
+- closed   every worker sends its next request as soon as the previous one is answered
+- fixed    open loop, one request every 1/--rate seconds
+- poisson  open loop, exponential inter-arrival times with mean 1/--rate
+
+In the open-loop modes the latency is measured from the scheduled arrival
+time, so the time a request waits for a free worker is included (no
+coordinated omission): an overloaded server shows up as growing latencies,
+not as a lower offered rate.
+
+With --start-server a local gunicorn is started for the run, and --sweep runs
+the same load against several workers x threads configurations.
+
+From backend/:
+    PYTHONPATH=. python benchmarks/load_test.py --url http://127.0.0.1:2000 --concurrency 8 --duration 30
+    PYTHONPATH=. python benchmarks/load_test.py --payloads traffic.jsonl --arrival poisson --rate 200
+    PYTHONPATH=. python benchmarks/load_test.py --start-server --sweep 1x4 2x4 4x2 --rate 300 --arrival fixed
+"""
+import os
+import sys
+import json
+import time
+import queue
+import signal
+import argparse
+import threading
+import subprocess
+import http.client
+from urllib.parse import urlparse
+
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+PERCENTILES = (50, 95, 99, 99.9)
+
+
+def load_payloads(path: str) -> list:
+    """ Request bodies of a JSONL file (empty lines are skipped). """
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthesize_payloads(features: list, n: int = 1000, seed: int = 42) -> list:
+    """ Random daily metrics for the given features (heart rates and stress levels are all in ~0-200). """
+    rng = np.random.default_rng(seed)
+    values = rng.normal(75, 15, (n, len(features))).clip(1, 200).round()
+    return [dict(zip(features, map(float, row))) for row in values]
+
+
+def schema_features(url: str, features_file: str = None) -> list:
+    """ Feature order of a model_features.json file, or of the model served at `url`. """
+    if features_file:
+        with open(features_file) as f:
+            return json.load(f)
+    status, body = _get(url, '/model')
+    if status != 200:
+        raise RuntimeError(f'No feature schema: /model answered {status}')
+    return body['Features']
+
+
+def _get(url: str, path: str, timeout: float = 5) -> tuple:
+    target = urlparse(url)
+    conn = http.client.HTTPConnection(target.hostname, target.port, timeout=timeout)
+    try:
+        conn.request('GET', path)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b'null')
+    finally:
+        conn.close()
+
+
+class LoadGenerator:
+    """ Sends the payloads (round robin) from `concurrency` keep-alive connections and records every request. """
+
+    def __init__(self, url: str, payloads: list, path: str = '/predict', concurrency: int = 8,
+                 arrival: str = 'closed', rate: float = None, timeout: float = 10, seed: int = 0):
+        if arrival != 'closed' and not rate:
+            raise ValueError(f'The {arrival} arrival mode needs a --rate')
+        target = urlparse(url)
+        self.host, self.port = target.hostname, target.port or 80
+        self.path = path
+        self.bodies = [json.dumps(payload).encode() for payload in payloads]
+        self.concurrency = concurrency
+        self.arrival = arrival
+        self.rate = rate
+        self.timeout = timeout
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._next = 0
+        # (scheduled/start time, latency seconds, status or exception name)
+        self.records = []
+
+    def _body(self) -> bytes:
+        with self._lock:
+            body = self.bodies[self._next % len(self.bodies)]
+            self._next += 1
+        return body
+
+    def _send(self, conn: http.client.HTTPConnection, body: bytes):
+        """ Returns (connection to reuse, status or error name). """
+        try:
+            conn.request('POST', self.path, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            if response.getheader('Connection', '').lower() == 'close':
+                conn.close()
+            return conn, response.status
+        except Exception as e:
+            conn.close()
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), type(e).__name__
+
+    def _record(self, start: float, status):
+        latency = time.perf_counter() - start
+        with self._lock:
+            self.records.append((start, latency, status))
+
+    def _closed_worker(self, deadline: float, budget: list):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        while time.perf_counter() < deadline:
+            with self._lock:
+                if budget[0] is not None:
+                    if budget[0] <= 0:
+                        break
+                    budget[0] -= 1
+            start = time.perf_counter()
+            conn, status = self._send(conn, self._body())
+            self._record(start, status)
+        conn.close()
+
+    def _open_worker(self, arrivals: queue.Queue):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        while True:
+            scheduled = arrivals.get()
+            if scheduled is None:
+                break
+            conn, status = self._send(conn, self._body())
+            # Measured from the scheduled arrival, queueing for a free connection included.
+            self._record(scheduled, status)
+        conn.close()
+
+    def _schedule(self, arrivals: queue.Queue, start: float, deadline: float, n_requests: int = None):
+        sent, at = 0, start
+        while at < deadline and (n_requests is None or sent < n_requests):
+            delay = at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            arrivals.put(at)
+            sent += 1
+            gap = 1 / self.rate
+            at += self._rng.exponential(gap) if self.arrival == 'poisson' else gap
+
+    def run(self, duration: float = 10, n_requests: int = None) -> dict:
+        """ Generates the load for `duration` seconds (or until `n_requests` were sent) and returns the report. """
+        self.records = []
+        start = time.perf_counter()
+        deadline = start + duration if duration else float('inf')
+        if self.arrival == 'closed':
+            budget = [n_requests]
+            workers = [threading.Thread(target=self._closed_worker, args=(deadline, budget), daemon=True)
+                       for _ in range(self.concurrency)]
+            for worker in workers:
+                worker.start()
+        else:
+            arrivals = queue.Queue()
+            workers = [threading.Thread(target=self._open_worker, args=(arrivals,), daemon=True)
+                       for _ in range(self.concurrency)]
+            for worker in workers:
+                worker.start()
+            self._schedule(arrivals, start, deadline, n_requests)
+            for _ in workers:
+                arrivals.put(None)
+        for worker in workers:
+            worker.join()
+        return summarize(self.records, time.perf_counter() - start,
+                         offered_rate=self.rate if self.arrival != 'closed' else None)
+
+
+def summarize(records: list, elapsed: float, offered_rate: float = None) -> dict:
+    """ Throughput, latency percentiles (ms) and error rates of the recorded requests. """
+    latencies = np.array([latency for _, latency, _ in records]) * 1000
+    statuses = {}
+    for _, _, status in records:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(count for status, count in statuses.items() if not status.startswith('2'))
+    report = {'requests': len(records),
+              'elapsed_s': round(elapsed, 3),
+              'throughput_rps': round(len(records) / elapsed, 2) if elapsed else 0,
+              'offered_rps': offered_rate,
+              'errors': errors,
+              'error_rate': round(errors / len(records), 5) if records else 0,
+              'statuses': statuses}
+    if len(latencies):
+        for p in PERCENTILES:
+            report[f'p{p:g}_ms'.replace('.', '')] = round(float(np.percentile(latencies, p)), 3)
+        report['mean_ms'] = round(float(latencies.mean()), 3)
+        report['max_ms'] = round(float(latencies.max()), 3)
+    return report
+
+
+def print_report(report: dict, label: str = ''):
+    print(f"\n⏱️ {label}{report['requests']} requests in {report['elapsed_s']}s => "
+          f"{report['throughput_rps']} req/s" + (f" (offered {report['offered_rps']})" if report['offered_rps'] else ''))
+    if 'p50_ms' in report:
+        print(f"    p50 {report['p50_ms']} ms | p95 {report['p95_ms']} ms | p99 {report['p99_ms']} ms | "
+              f"p999 {report['p999_ms']} ms | max {report['max_ms']} ms")
+    print(f"    errors: {report['errors']} ({report['error_rate']:.2%}) {report['statuses']}")
+
+
+class LocalServer:
+    """ gunicorn (gunicorn.conf.py, wsgi:app) started for the duration of a `with` block. """
+
+    def __init__(self, workers: int, threads: int, port: int = 2100, env: dict = None, ready_timeout: float = 60):
+        self.workers, self.threads, self.port = workers, threads, port
+        self.env = {**os.environ, **(env or {}), 'PYTHONPATH': BACKEND_DIR, 'PORT': str(port),
+                    'WEB_WORKERS': str(workers), 'WEB_THREADS': str(threads)}
+        self.ready_timeout = ready_timeout
+        self.url = f'http://127.0.0.1:{port}'
+        self._process = None
+
+    def __enter__(self):
+        self._process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                                         cwd=BACKEND_DIR, env=self.env,
+                                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + self.ready_timeout
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(f'gunicorn exited with code {self._process.returncode}')
+            try:
+                if _get(self.url, '/ready', timeout=1)[0] == 200:
+                    return self
+            except OSError:
+                pass
+            time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError(f'The server was not ready after {self.ready_timeout}s')
+
+    def __exit__(self, *exc):
+        if self._process is not None and self._process.poll() is None:
+            # SIGTERM => graceful shutdown of the workers.
+            self._process.send_signal(signal.SIGTERM)
+            try:
+                self._process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:2000', help='Server to test (ignored with --start-server)')
+    parser.add_argument('--path', default='/predict')
+    parser.add_argument('--payloads', default=None, help='JSONL file of request bodies to replay')
+    parser.add_argument('--features', default=None,
+                        help='model_features.json used to synthesize payloads (the /model features of the server by default)')
+    parser.add_argument('--arrival', choices=['closed', 'fixed', 'poisson'], default='closed')
+    parser.add_argument('--rate', type=float, default=None, help='Requests per second (fixed/poisson)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Client connections')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds of load')
+    parser.add_argument('--requests', type=int, default=None, help='Stop after this many requests')
+    parser.add_argument('--warmup', type=float, default=1, help='Seconds of unrecorded load first')
+    parser.add_argument('--start-server', action='store_true', help='Start a local gunicorn for the run')
+    parser.add_argument('--port', type=int, default=2100, help='Port of the local server')
+    parser.add_argument('--sweep', nargs='+', default=None, metavar='WORKERSxTHREADS',
+                        help='Server configurations to compare, e.g. 1x4 2x4 4x2 (implies --start-server)')
+    parser.add_argument('--env', nargs='*', default=[], metavar='KEY=VALUE',
+                        help='Extra environment of the local server, e.g. MICRO_BATCHING=1')
+    parser.add_argument('--output', default=None, help='Where the JSON report is saved')
+    args = parser.parse_args()
+
+    configs = [tuple(map(int, config.lower().split('x'))) for config in args.sweep] if args.sweep else [None]
+    if configs == [None] and args.start_server:
+        configs = [(int(os.getenv('WEB_WORKERS', os.cpu_count())), int(os.getenv('WEB_THREADS', '4')))]
+    server_env = dict(pair.split('=', 1) for pair in args.env)
+
+    reports = []
+    for config in configs:
+        server = LocalServer(*config, port=args.port, env=server_env) if config else None
+        if server:
+            server.__enter__()
+        try:
+            url = server.url if server else args.url
+            if args.payloads:
+                payloads = load_payloads(args.payloads)
+            else:
+                payloads = synthesize_payloads(schema_features(url, args.features))
+            generator = LoadGenerator(url, payloads, args.path, args.concurrency, args.arrival, args.rate)
+            if args.warmup:
+                generator.run(duration=args.warmup)
+            report = generator.run(duration=args.duration, n_requests=args.requests)
+        finally:
+            if server:
+                server.__exit__()
+
+        label = f'{config[0]} workers x {config[1]} threads: ' if config else ''
+        print_report(report, label)
+        reports.append({'workers': config[0] if config else None, 'threads': config[1] if config else None,
+                        'arrival': args.arrival, 'concurrency': args.concurrency, **report})
+
+    if len(reports) > 1:
+        print('\n📊 Sweep')
+        print(f"    {'workers x threads':<18} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>8}")
+        for report in reports:
+            print(f"    {report['workers']:>7} x {report['threads']:<8} {report['throughput_rps']:>9} "
+                  f"{report.get('p50_ms', '-'):>9} {report.get('p99_ms', '-'):>9} {report['error_rate']:>8.2%}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(reports, f, indent=2)
+        print(f'\n📝 Report saved to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
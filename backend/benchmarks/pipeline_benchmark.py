@@ -0,0 +1,267 @@
+"""
+Benchmark suite of the whole pipeline: ingestion, transformation, training and inference.
+
+For every scale (1 month to 10 years of synthetic Samsung Health exports, see
+synthetic_data) it times:
+- load_data             parse + daily aggregation of the per-minute heart rate export
+- process_heart_data    daily statistics of the heart rate samples
+- lag_features          lag/rolling/EWM features of the merged daily data
+- data_transformation   full refresh (both exports, merge, features, Parquet sink), no parsed-data cache
+- train_selected_model  end to end training run (transformation included), model bundle saved
+- predict_single        predict_input of one row (per call)
+- predict_batch         predict_input of --batch-rows rows (per call)
+
+Wall time is the best of --repeat runs (median kept too). Peak memory comes
+from an extra tracemalloc run, so the tracing overhead never skews the timings;
+it covers the Python and NumPy/pandas allocations, not XGBoost's native ones.
+
+The results are saved as JSON; with --baseline the run is compared with a
+previous one and fails (exit code 1) when a benchmark got slower, or used more
+memory, by more than --threshold.
+
+From backend/:
+    PYTHONPATH=. python benchmarks/pipeline_benchmark.py --scales 1m 1y --output bench.json
+    PYTHONPATH=. python benchmarks/pipeline_benchmark.py --scales 1m 1y --baseline bench.json
+"""
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import tracemalloc
+import subprocess
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import write_synthetic_exports, make_heart_rate_export, use_synthetic_sources, HEART_DATE
+
+SCALES = {'1m': 30, '6m': 182, '1y': 365, '3y': 1095, '10y': 3650}
+# train_selected_model keeps the last 90 days as test set, and the early stopping 60 more.
+MIN_TRAINING_DAYS = 180
+
+# Slowdowns adding less than this many seconds to a whole timed run (all its `number` calls) are timer noise.
+MIN_REGRESSION_SECONDS = 0.001
+
+
+@contextmanager
+def _workdir(path: str):
+    """ The pipeline writes relative paths (data/, models/, logs/): run it inside a scratch folder. """
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def measure(fn, repeat: int = 3, number: int = 1, memory: bool = True) -> dict:
+    """ Times `fn` and measures its peak memory.
+
+    Args:
+        fn: function without arguments.
+        repeat (int): timed runs (the best one is the reported wall time).
+        number (int): calls per run, for functions too fast to be timed alone.
+        memory (bool): add a tracemalloc run for the peak memory.
+
+    Returns:
+        dict: wall_s (best, per call), median_s (per call), peak_mb, repeat, number.
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number)
+
+    peak_mb = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+
+    return {'wall_s': min(timings), 'median_s': statistics.median(timings),
+            'peak_mb': round(peak_mb, 3) if peak_mb is not None else None,
+            'repeat': repeat, 'number': number}
+
+
+def _heart_load_args() -> dict:
+    from src.components.config import DATA_SOURCES
+    config = DATA_SOURCES['heart_rate']
+    return dict(file_path=config['file_path'], cols_to_keep=config['cols_to_keep'],
+                col_date=config['col_date']['oem'], prefix=config['prefix'], data_type=config['data_type'],
+                chunksize=config.get('chunksize'), dtypes=config.get('dtypes'))
+
+
+def _stress_load_args() -> dict:
+    from src.components.config import DATA_SOURCES
+    config = DATA_SOURCES['stress']
+    return dict(file_path=config['file_path'], cols_to_keep=config['cols_to_keep'], col_date=config['col_date'],
+                prefix=config['prefix'], chunksize=config.get('chunksize'), dtypes=config.get('dtypes'))
+
+
+def run_scale(scale: str, n_days: int, repeat: int = 3, batch_rows: int = 1000,
+              single_calls: int = 200, skip_training: bool = False) -> dict:
+    """ Runs every benchmark on `n_days` of synthetic exports.
+
+    Returns:
+        dict: benchmark name => measure() result (or {'skipped': reason}).
+    """
+    from src.components.config import DATA_SOURCES
+    from src.components.data_ingestion import load_data, process_heart_data
+    from src.components.data_transformation import data_transformation, lag_features
+    from src.components.model_trainer import train_selected_model
+    from src.pipeline.model_registry import ModelRegistry
+    from src.pipeline.predict_pipeline import predict_input
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix=f'bench-{scale}-') as root, _workdir(root):
+        print(f'📦 {scale}: writing {n_days} days of synthetic exports...')
+        write_synthetic_exports(root, n_days)
+        use_synthetic_sources()
+        # Every transformation parses the raw exports: the parsed-data cache would turn the repeats into cache hits.
+        DATA_SOURCES['data_transformation']['cache_dir'] = None
+
+        results['load_data'] = measure(lambda: load_data(**_heart_load_args()), repeat)
+
+        samples = make_heart_rate_export(n_days)
+        samples['date'] = samples.pop(HEART_DATE).dt.date
+        results['process_heart_data'] = measure(lambda: process_heart_data(samples), repeat)
+        del samples
+
+        date_col = DATA_SOURCES['heart_rate']['col_date']['mod']
+        daily = pd.merge(load_data(**_heart_load_args()), load_data(**_stress_load_args()), on=date_col, how='outer')
+        features = DATA_SOURCES['data_transformation']['features_to_lag']
+        results['lag_features'] = measure(lambda: lag_features(daily, features), repeat)
+
+        results['data_transformation'] = measure(lambda: data_transformation(incremental=False), repeat)
+
+        if skip_training or n_days < MIN_TRAINING_DAYS:
+            reason = '--skip-training' if skip_training else f'less than {MIN_TRAINING_DAYS} days'
+            for name in ('train_selected_model', 'predict_single', 'predict_batch'):
+                results[name] = {'skipped': reason}
+        else:
+            # One training run per repeat: the tracemalloc run is skipped, XGBoost allocates natively.
+            results['train_selected_model'] = measure(train_selected_model, repeat=max(1, repeat // 2), memory=False)
+
+            loaded = ModelRegistry(model_dir=os.path.join(root, 'models')).get()
+            rng = np.random.default_rng(0)
+            matrix = rng.normal(70, 10, (batch_rows, len(loaded.schema.features))).astype(np.float32)
+            row = matrix[:1]
+            results['predict_single'] = measure(lambda: predict_input(row, loaded=loaded), repeat, number=single_calls)
+            results['predict_batch'] = measure(lambda: predict_input(matrix, loaded=loaded), repeat, number=10)
+            results['predict_batch']['rows'] = batch_rows
+    return results
+
+
+def environment() -> dict:
+    """ Where the numbers come from: they are only comparable on the same machine and versions. """
+    import xgboost
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except Exception:
+        commit = None
+    return {'created_at': datetime.now().isoformat(timespec='seconds'),
+            'commit': commit,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'xgboost': xgboost.__version__}
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.2) -> list:
+    """ Benchmarks of `current` which regressed against `baseline`.
+
+    A benchmark regresses when its wall time (or peak memory) grows by more than
+    `threshold` (relative). The wall times are per call, so the noise floor
+    (MIN_REGRESSION_SECONDS) applies to the slowdown of a whole timed run of
+    `number` calls: a fast benchmark repeated many times still fails when it
+    gets slower. Benchmarks missing on either side are not compared.
+
+    Returns:
+        list: (scale, benchmark, metric, baseline value, current value) tuples.
+    """
+    regressions = []
+    for scale, benchmarks in current['results'].items():
+        for name, result in benchmarks.items():
+            previous = baseline.get('results', {}).get(scale, {}).get(name, {})
+            for metric in ('wall_s', 'peak_mb'):
+                old, new = previous.get(metric), result.get(metric)
+                if old is None or new is None:
+                    continue
+                if metric == 'wall_s' and (new - old) * result.get('number', 1) < MIN_REGRESSION_SECONDS:
+                    continue
+                if new > old * (1 + threshold):
+                    regressions.append((scale, name, metric, old, new))
+    return regressions
+
+
+def print_results(results: dict, baseline: dict = None):
+    for scale, benchmarks in results.items():
+        print(f'\n⏱️ {scale} ({SCALES.get(scale, "?")} days)')
+        for name, result in benchmarks.items():
+            if 'skipped' in result:
+                print(f'    {name:<22} skipped ({result["skipped"]})')
+                continue
+            line = f'    {name:<22} {1000 * result["wall_s"]:10.3f} ms'
+            if result['peak_mb'] is not None:
+                line += f' {result["peak_mb"]:9.1f} MB'
+            old = (baseline or {}).get('results', {}).get(scale, {}).get(name, {}).get('wall_s')
+            if old:
+                line += f'  ({result["wall_s"] / old:5.2f}x baseline)'
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', nargs='+', default=['1m', '1y'], choices=list(SCALES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--batch-rows', type=int, default=1000)
+    parser.add_argument('--skip-training', action='store_true', help='Only ingestion and transformation')
+    parser.add_argument('--output', default='benchmark_results.json', help='Where the JSON results are saved')
+    parser.add_argument('--baseline', default=None, help='JSON results of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Relative regression that fails the run')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    output = os.path.abspath(args.output)
+    results = {scale: run_scale(scale, SCALES[scale], args.repeat, args.batch_rows, skip_training=args.skip_training)
+               for scale in args.scales}
+    report = {'environment': environment(), 'results': results}
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print_results(results, baseline)
+    print(f'\n📝 Results saved to {output}')
+
+    if baseline is None:
+        return
+    regressions = compare(report, baseline, args.threshold)
+    if regressions:
+        print(f'❌ {len(regressions)} regression(s) over {args.threshold:.0%}:')
+        for scale, name, metric, old, new in regressions:
+            print(f'    {scale} {name} {metric}: {old:.4g} => {new:.4g} ({new / old:.2f}x)')
+        sys.exit(1)
+    print(f'✅ No regression over {args.threshold:.0%} against {args.baseline}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Cold start benchmark of the serving path.
+
+It measures, in fresh interpreters:
+- the `python -X importtime` cost of `import app`
+- the time from interpreter start to the first answered /predict request
+
+and fails (exit code 1) when a budget is exceeded or when a heavy module
+(pandas, sklearn, xgboost) ends up imported by the request path.
+
+From backend/: PYTHONPATH=. python benchmarks/startup_benchmark.py --model-dir models
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Budgets in milliseconds (medians over --repeat runs).
+IMPORT_BUDGET_MS = 800
+FIRST_PREDICTION_BUDGET_MS = 1500
+HEAVY_MODULES = ['pandas', 'sklearn', 'xgboost']
+
+# Executed in a fresh interpreter: import the app, send one request through the
+# Flask test client and report the timings and which heavy modules got imported.
+FIRST_PREDICTION_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+from app import app, registry
+imported = time.perf_counter()
+features = registry.get().schema.features
+response = app.test_client().post('/predict', json=dict.fromkeys(features, 60))
+done = time.perf_counter()
+print(json.dumps({
+    'status': response.status_code,
+    'import_ms': 1000 * (imported - start),
+    'first_prediction_ms': 1000 * (done - start),
+    'heavy_modules': [m for m in %r if m in sys.modules],
+}))
+'''
+
+
+def _env(model_dir: str = None) -> dict:
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    if model_dir:
+        env['MODEL_DIR'] = os.path.abspath(model_dir)
+    return env
+
+
+def parse_importtime(stderr: str) -> list:
+    """ Parses the `-X importtime` output into (module, self_us, cumulative_us) tuples. """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        # Drop the space after the "|" separator but keep the nesting indentation.
+        rows.append((module[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure_importtime() -> tuple:
+    """ Returns (total ms of `import app`, top 10 slowest modules imported by it). """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, check=True)
+    rows = parse_importtime(result.stderr)
+    # Top-level imports are the ones without indentation after the "|".
+    top_level = [(module.strip(), cumulative) for module, _, cumulative in rows if not module.startswith('  ')]
+    total_ms = sum(cumulative for _, cumulative in top_level) / 1000
+    # Direct imports of a top-level module are indented by two spaces.
+    direct = [(module.strip(), cumulative) for module, _, cumulative in rows
+              if module.startswith('  ') and not module.startswith('   ')]
+    slowest = sorted(direct, key=lambda row: row[1], reverse=True)[:10]
+    return total_ms, [(module, cumulative / 1000) for module, cumulative in slowest]
+
+
+def measure_first_prediction(model_dir: str) -> dict:
+    result = subprocess.run([sys.executable, '-c', FIRST_PREDICTION_SCRIPT % HEAVY_MODULES],
+                            cwd=BACKEND_DIR, env=_env(model_dir), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f'The first prediction failed => {result.stderr.strip()}')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model-dir', default=None, help='Models directory (defaults to the serving one)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--import-budget-ms', type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument('--first-prediction-budget-ms', type=float, default=FIRST_PREDICTION_BUDGET_MS)
+    args = parser.parse_args()
+
+    import_runs, first_runs, heavy = [], [], set()
+    for _ in range(args.repeat):
+        total_ms, slowest = measure_importtime()
+        import_runs.append(total_ms)
+        run = measure_first_prediction(args.model_dir)
+        if run['status'] != 200:
+            raise RuntimeError(f"/predict answered {run['status']}")
+        first_runs.append(run['first_prediction_ms'])
+        heavy.update(run['heavy_modules'])
+
+    import_ms = statistics.median(import_runs)
+    first_ms = statistics.median(first_runs)
+
+    print(f'⏱️ import app (-X importtime): {import_ms:.1f} ms (budget {args.import_budget_ms:.0f} ms)')
+    for module, ms in slowest:
+        print(f'    {module:<40} {ms:8.1f} ms')
+    print(f'⏱️ Time to first prediction: {first_ms:.1f} ms (budget {args.first_prediction_budget_ms:.0f} ms)')
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append('import time over budget')
+    if first_ms > args.first_prediction_budget_ms:
+        failures.append('time to first prediction over budget')
+    if heavy:
+        failures.append(f'heavy modules imported by the request path: {sorted(heavy)}')
+
+    if failures:
+        print(f'❌ Startup benchmark failed: {"; ".join(failures)}')
+        sys.exit(1)
+    print('✅ Startup within budget')
+
+
+if __name__ == '__main__':
+    main()
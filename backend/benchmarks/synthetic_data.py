@@ -0,0 +1,103 @@
+"""
+Synthetic Samsung Health exports for the benchmarks.
+
+The column names follow the real exports and SYNTHETIC_SOURCES mirrors the
+DATA_SOURCES schema of src/components/config.py, so the pipeline can run on
+the generated files through `use_synthetic_sources`.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+HEART_DATE = 'com.samsung.health.heart_rate.start_time'
+STRESS_DATE = 'start_time'
+
+SYNTHETIC_SOURCES = {
+    'stress': {
+        'file_path': 'data/raw/com.samsung.shealth.stress.csv',
+        'cols_to_keep': [STRESS_DATE, 'min', 'score', 'max'],
+        'col_date': STRESS_DATE,
+        'prefix': 'stress_',
+        'chunksize': None,
+        'dtypes': None,
+    },
+    'heart_rate': {
+        'file_path': 'data/raw/com.samsung.shealth.tracker.heart_rate.csv',
+        'cols_to_keep': [HEART_DATE, 'com.samsung.health.heart_rate.min',
+                         'com.samsung.health.heart_rate.heart_rate', 'com.samsung.health.heart_rate.max'],
+        'col_date': {'oem': HEART_DATE, 'mod': 'date'},
+        'prefix': 'heart_',
+        'data_type': 'heart',
+        'new_name_columns': ['date', 'heart_max_rate', 'heart_min_rate', 'heart_rate'],
+        'daily_stats': [(3, 'max', 'heart_max_rate'),
+                        (1, 'min', 'heart_min_rate'),
+                        (2, 'median', 'heart_rate')],
+        'chunksize': None,
+        'dtypes': None,
+    },
+    'data_transformation': {
+        'features_to_lag': ['heart_min_rate'],
+    },
+}
+
+
+def _timestamps(n_days: int, samples_per_day: int, start: str) -> pd.DatetimeIndex:
+    step = pd.Timedelta(days=1) / samples_per_day
+    return pd.date_range(start, periods=n_days * samples_per_day, freq=step)
+
+
+def make_heart_rate_export(n_days: int, samples_per_day: int = 1440, start: str = '2015-01-01',
+                           seed: int = 42) -> pd.DataFrame:
+    """ Per-minute (by default) heart rate samples like the tracker.heart_rate export. """
+    rng = np.random.default_rng(seed)
+    times = _timestamps(n_days, samples_per_day, start)
+    rate = rng.normal(78, 12, len(times)).round()
+    return pd.DataFrame({
+        HEART_DATE: times,
+        'com.samsung.health.heart_rate.min': rate - rng.integers(0, 8, len(times)),
+        'com.samsung.health.heart_rate.heart_rate': rate,
+        'com.samsung.health.heart_rate.max': rate + rng.integers(0, 15, len(times)),
+    })
+
+
+def make_stress_export(n_days: int, samples_per_day: int = 48, start: str = '2015-01-01',
+                       seed: int = 7) -> pd.DataFrame:
+    """ Stress measurements (every 30 minutes by default) like the shealth.stress export. """
+    rng = np.random.default_rng(seed)
+    times = _timestamps(n_days, samples_per_day, start)
+    score = rng.integers(1, 100, len(times)).astype(float)
+    return pd.DataFrame({
+        STRESS_DATE: times,
+        'min': np.maximum(score - rng.integers(0, 30, len(times)), 1),
+        'score': score,
+        'max': np.minimum(score + rng.integers(0, 30, len(times)), 100),
+    })
+
+
+def write_export(data: pd.DataFrame, path: str, name: str = 'com.samsung.health'):
+    """ Writes the export with the metadata line Samsung Health puts before the header. """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    data = data.copy()
+    date_col = data.columns[0]
+    data[date_col] = data[date_col].dt.strftime('%Y-%m-%d %H:%M:%S.000')
+    with open(path, 'w', encoding='latin-1') as f:
+        f.write(f'{name},6312002,6\n')
+        data.to_csv(f, index=False)
+
+
+def write_synthetic_exports(root: str, n_days: int, heart_per_day: int = 1440, stress_per_day: int = 48):
+    """ Writes both raw exports under root/ using the SYNTHETIC_SOURCES paths. """
+    write_export(make_heart_rate_export(n_days, heart_per_day),
+                 os.path.join(root, SYNTHETIC_SOURCES['heart_rate']['file_path']),
+                 'com.samsung.shealth.tracker.heart_rate')
+    write_export(make_stress_export(n_days, stress_per_day),
+                 os.path.join(root, SYNTHETIC_SOURCES['stress']['file_path']),
+                 'com.samsung.shealth.stress')
+
+
+def use_synthetic_sources():
+    """ Points the (placeholder) DATA_SOURCES to the synthetic exports, in place,
+    so every module that imported DATA_SOURCES sees the change. """
+    from src.components.config import DATA_SOURCES
+    for key, value in SYNTHETIC_SOURCES.items():
+        DATA_SOURCES[key] = dict(value)
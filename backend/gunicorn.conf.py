@@ -0,0 +1,35 @@
+# Gunicorn settings for the backend. Every value can be overridden through
+# environment variables (see docker-compose.yml).
+import os
+import multiprocessing
+
+bind = f"0.0.0.0:{os.getenv('PORT', '2000')}"
+
+# Pre-fork workers x threads per worker. Predictions release the GIL inside
+# XGBoost, so a few threads per worker keep the cores busy.
+workers = int(os.getenv('WEB_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.getenv('WEB_THREADS', '4'))
+worker_class = 'gthread'
+
+# Seconds a request may take before the worker is restarted, and seconds the
+# workers have to finish the in-flight requests after a SIGTERM.
+timeout = int(os.getenv('WEB_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('WEB_KEEPALIVE', '5'))
+
+# Load the app (and the model, see wsgi.py) in the master before forking.
+preload_app = True
+
+accesslog = os.getenv('WEB_ACCESS_LOG', None)
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Threads don't survive a fork: every worker polls the models directory on its own.
+    from app import registry
+    registry.start_watcher()
+
+
+def worker_exit(server, worker):
+    from app import registry
+    registry.stop_watcher()
@@ -0,0 +1,179 @@
+import os
+import json
+import numpy as np
+
+# Arrays stored as separate .npy files when the forest is saved to a folder.
+ARRAYS = ('roots', 'feature', 'threshold', 'child', 'default_right', 'value')
+
+# Objectives whose prediction is just base_score + sum of leaves (identity link).
+IDENTITY_OBJECTIVES = {'reg:squarederror', 'reg:squaredlogerror', 'reg:absoluteerror',
+                       'reg:pseudohubererror', 'reg:quantileerror'}
+
+
+class CompiledForest:
+    """ XGBoost trees flattened into NumPy arrays and evaluated without xgboost.
+
+    Every node of every tree lives in the same set of arrays and the two
+    children of a split are stored next to each other, so the next node is
+    just `child[node] + (x >= threshold)`. A leaf points to itself with a NaN
+    threshold (nothing compares >= NaN): all trees walk down in lockstep for `max_depth` steps
+    and the rows which already reached a leaf simply stay there.
+    """
+
+    def __init__(self, feature_names, base_score, roots, feature, threshold,
+                 child, default_right, value, max_depth):
+        self.feature_names = [str(name) for name in feature_names]
+        self.base_score = float(base_score)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.child = np.asarray(child, dtype=np.intp)
+        self.default_right = np.asarray(default_right, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float32)
+        self.max_depth = int(max_depth)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict(self, X) -> np.ndarray:
+        """ Same output as `XGBRegressor.predict` (up to float32 rounding).
+
+        Args:
+            X (np.ndarray | pd.DataFrame): rows to score. Arrays must follow `feature_names` order.
+
+        Returns:
+            np.ndarray: one prediction per row.
+        """
+        if hasattr(X, 'columns'):
+            X = X[self.feature_names].to_numpy()
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        # Offset of every (row, tree) pair inside the flattened matrix.
+        row_offset = np.repeat(np.arange(n_rows) * n_features, self.n_trees)
+        node = np.tile(self.roots, n_rows)
+        has_missing = np.isnan(flat).any()
+
+        for _ in range(self.max_depth):
+            x = flat[row_offset + self.feature[node]]
+            go_right = x >= self.threshold[node]
+            if has_missing:
+                # NaN compares False, so it must follow the default branch of the split.
+                go_right |= np.isnan(x) & self.default_right[node]
+            node = self.child[node] + go_right
+
+        leaves = self.value[node].reshape(n_rows, self.n_trees)
+        return (leaves.sum(axis=1, dtype=np.float64) + self.base_score).astype(np.float32)
+
+    def save(self, path: str):
+        """ Writes the forest as a plain .npz file, or as a folder of .npy files
+        (which can be memory-mapped) when `path` doesn't end with .npz. No pickle involved. """
+        path = str(path)
+        if path.endswith('.npz'):
+            np.savez(path, feature_names=np.array(self.feature_names), base_score=self.base_score,
+                     roots=self.roots, feature=self.feature, threshold=self.threshold,
+                     child=self.child, default_right=self.default_right,
+                     value=self.value, max_depth=self.max_depth)
+            return
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(path, 'forest.json'), 'w') as f:
+            json.dump({'feature_names': self.feature_names, 'base_score': self.base_score,
+                       'max_depth': self.max_depth}, f)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str = None) -> 'CompiledForest':
+        """ Loads a forest saved by `save`.
+
+        Args:
+            path (str): .npz file or folder.
+            mmap_mode (str): e.g. 'r' to memory-map the arrays of a folder: nothing
+                             is copied and the pre-forked workers share the same pages.
+        """
+        if os.path.isdir(path):
+            with open(os.path.join(path, 'forest.json')) as f:
+                meta = json.load(f)
+            arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode, allow_pickle=False)
+                      for name in ARRAYS}
+            return cls(**meta, **arrays)
+        with np.load(path, allow_pickle=False) as f:
+            return cls(feature_names=f['feature_names'].tolist(), base_score=f['base_score'],
+                       roots=f['roots'], feature=f['feature'], threshold=f['threshold'],
+                       child=f['child'], default_right=f['default_right'],
+                       value=f['value'], max_depth=f['max_depth'])
+
+
+def _base_score(config: dict) -> float:
+    # Stored as '5E-1' in older versions and '[5E-1]' in xgboost >= 3.
+    raw = config['learner']['learner_model_param']['base_score']
+    return float(raw.strip('[]').split(',')[0])
+
+
+def compile_booster(booster, n_trees: int = None) -> CompiledForest:
+    """ Converts a trained booster into a CompiledForest using its JSON dump.
+
+    Args:
+        booster (xgboost.Booster): trained booster (e.g. `XGBRegressor.get_booster()`).
+        n_trees (int): keep only the first n trees (e.g. up to the best iteration).
+
+    Returns:
+        CompiledForest: array-backed copy of the trees.
+
+    Raises:
+        ValueError: If the booster isn't a plain tree ensemble (gbtree) or the objective
+                    doesn't have an identity link.
+    """
+    config = json.loads(booster.save_config())
+    # dart scales the tree outputs at prediction time and gblinear has no trees: the sum of leaves would be wrong.
+    booster_type = config['learner']['gradient_booster']['name']
+    if booster_type != 'gbtree':
+        raise ValueError(f'Booster {booster_type} is not supported by the compiled forest')
+    objective = config['learner']['objective']['name']
+    if objective not in IDENTITY_OBJECTIVES:
+        raise ValueError(f'Objective {objective} is not supported by the compiled forest')
+
+    feature_names = booster.feature_names or [f'f{i}' for i in range(booster.num_features())]
+    feature_index = {name: i for i, name in enumerate(feature_names)}
+
+    trees = booster.get_dump(dump_format='json')
+    if n_trees is not None:
+        trees = trees[:n_trees]
+
+    roots, feature, threshold, child, default_right, value = [], [], [], [], [], []
+    max_depth = 0
+
+    def add_node():
+        for column in (feature, threshold, child, default_right, value):
+            column.append(None)
+        return len(feature) - 1
+
+    for tree in trees:
+        root = json.loads(tree)
+        roots.append(add_node())
+        # Breadth first: both children of a split get consecutive ids (left, right).
+        queue = [(root, roots[-1], 0)]
+        while queue:
+            node, me, depth = queue.pop(0)
+            max_depth = max(max_depth, depth)
+            if 'leaf' in node:
+                feature[me], threshold[me], child[me] = 0, np.nan, me
+                default_right[me], value[me] = False, node['leaf']
+                continue
+            children = {c['nodeid']: c for c in node['children']}
+            left_id, right_id = add_node(), add_node()
+            feature[me] = feature_index[node['split']]
+            threshold[me] = node['split_condition']
+            child[me] = left_id
+            default_right[me] = node['missing'] == node['no']
+            value[me] = 0.0
+            queue.append((children[node['yes']], left_id, depth + 1))
+            queue.append((children[node['no']], right_id, depth + 1))
+
+    return CompiledForest(feature_names=feature_names, base_score=_base_score(config),
+                          roots=roots, feature=feature, threshold=threshold, child=child,
+                          default_right=default_right, value=value, max_depth=max_depth)
@@ -3,6 +3,7 @@
 Placeholder config file for CI/CD tests.
 Replace with real configuration in development/production environments.
 """
+import os
 
 # Example dummy vars to avoid attribute errors in imports
 DATA_PATH = ""
@@ -12,7 +13,10 @@ DATA_SOURCES = {
         'file_path': '',
           'cols_to_keep': [],
           'col_date': 'date',
-          'prefix': 'stress_'
+          'prefix': 'stress_',
+          # Optional: stream the CSV in chunks of N rows (bounded memory for big exports)
+          'chunksize': None,
+          'dtypes': None
     },
     'heart_rate': {
         'file_path': '',
@@ -22,9 +26,109 @@ DATA_SOURCES = {
               'prefix': 'heart_',
               'data_type': 'heart',
               'new_name_columns': ['date', 'heart_max_rate', 'heart_min_rate','heart_rate'],
-              
+              # Daily statistics: (column name or index in cols_to_keep, statistic, new name).
+              # Statistics: min, max, sum, count, mean, std, median or percentiles as p<q> (e.g. p90)
+              'daily_stats': [(3, 'max', 'heart_max_rate'),
+                              (1, 'min', 'heart_min_rate'),
+                              (2, 'median', 'heart_rate')],
+              'chunksize': None,
+              'dtypes': None
     },
     'data_transformation': {
-        'features_to_lag': ['heart_min_rate']
+        'features_to_lag': ['heart_min_rate'],
+        # Derived features of every feature_to_lag (see src/components/feature_engine.py)
+        'lags': [1, 2, 3],
+        'rolling_windows': [],
+        'rolling_stats': ['mean', 'std'],
+        'ewm_spans': [],
+        # Parquet cache of the parsed sources (None disables it)
+        'cache_dir': 'data/cache',
+        # Where the processed dataset is persisted: 'parquet' (data/processed/data/),
+        # 'csv' (legacy data/processed/data.csv) or None (training works in memory only)
+        'sink': 'parquet',
+        # Only process the days appended since the last refresh
+        'incremental': False
+    },
+    'model_trainer': {
+        # Default training: histogram method, up to n_estimators trees, stopped when the
+        # last validation_days of the training window don't improve for early_stopping_rounds
+        'tree_method': 'hist',
+        'n_estimators': 1000,
+        'early_stopping_rounds': 50,
+        'validation_days': 60,
+        # Successive halving random search (see src/components/hyperparameter_search.py).
+        # Disabled: the default XGBRegressor is trained.
+        'tuning': False,
+        'param_grid': {
+            'n_estimators': [50, 100, 150, 200],
+            'max_depth': [2, 4, 6, 8],
+            'learning_rate': [0.05, 0.1, 0.2, 0.3],
+            'gamma': [5, 6, 7, 8],
+            'reg_alpha': [1, 3, 5, 7],
+            'reg_lambda': [0.1, 0.5, 3, 5]
+        },
+        # Budget: candidates of the first round, kept 1/factor each round with factor x more trees
+        'n_candidates': 27,
+        'halving_factor': 3,
+        'resource': 'n_estimators',
+        'max_resources': 'auto',    # 'auto' => largest n_estimators of the grid
+        'min_resources': 'exhaust',
+        'n_splits': 5,
+        # Search processes (-1 = one per core); XGBoost gets cores // processes threads each
+        'n_jobs': -1,
+        # Incremental retrain (see src/components/incremental_training.py): the latest model
+        # learns the new days ('boost': extra trees, 'refresh': leaf values refitted)
+        'warm_start': False,
+        'warm_start_mode': 'boost',
+        'warm_start_rounds': 20,
+        # Days already seen that the added trees also learn from (None = only the new days)
+        'warm_start_window': 365,
+        'warm_start_learning_rate': 0.1,
+        # Fall back to a full fit if the holdout RMSE gets worse than the previous model by more than 2%
+        'warm_start_tolerance': 0.02,
+        'max_warm_starts': 8
     }
-}
\ No newline at end of file
+}
+
+
+def section_config(section: str, defaults: dict, config: dict = None) -> dict:
+    """ Settings of a DATA_SOURCES section completed with the defaults of its module.
+
+    Args:
+        section (str): key of DATA_SOURCES, e.g. 'model_trainer'.
+        defaults (dict): every setting the module reads, with its default value.
+        config (dict): settings to complete instead of DATA_SOURCES[section].
+    """
+    config = DATA_SOURCES.get(section, {}) if config is None else config
+    return {key: config.get(key, default) for key, default in defaults.items()}
+
+# Serving settings. Every value can be overridden through environment variables
+# so the same image can be tuned from docker-compose without rebuilding it.
+SERVING = {
+    # Seconds between two scans of the models/ directory looking for a newer model.
+    'model_poll_interval': float(os.getenv('MODEL_POLL_INTERVAL', '30')),
+    # Serve the NumPy compiled forest of the model bundle (or xgb_model_*.npz next to a legacy pickle)
+    # instead of loading the booster with xgboost.
+    'compiled_inference': os.getenv('COMPILED_INFERENCE', '1') == '1',
+    # Dtype of the feature rows built from the requests (XGBoost works in float32 anyway).
+    'feature_dtype': os.getenv('FEATURE_DTYPE', 'float32'),
+    # Maximum number of rows accepted by /predict/batch in a single request.
+    'max_batch_size': int(os.getenv('MAX_BATCH_SIZE', '1000')),
+    # Dynamic batching of concurrent /predict calls (disabled by default).
+    'micro_batching': os.getenv('MICRO_BATCHING', '0') == '1',
+    'batch_window_ms': float(os.getenv('BATCH_WINDOW_MS', '2')),
+    'batch_max_rows': int(os.getenv('BATCH_MAX_ROWS', '64')),
+    'batch_queue_size': int(os.getenv('BATCH_QUEUE_SIZE', '1024')),
+    # Seconds a request waits for its micro-batched prediction before answering 503.
+    'batch_timeout_s': float(os.getenv('BATCH_TIMEOUT_S', '5')),
+    # LRU/TTL cache of /predict results keyed by model version + feature row.
+    'prediction_cache': os.getenv('PREDICTION_CACHE', '1') == '1',
+    'cache_max_entries': int(os.getenv('CACHE_MAX_ENTRIES', '4096')),
+    'cache_ttl_seconds': float(os.getenv('CACHE_TTL_SECONDS', '300')),
+    # Online feature store of /predict/online (recent daily metrics per user, SQLite file).
+    'online_store_path': os.getenv('ONLINE_STORE_PATH', 'data/online_store.sqlite'),
+    # Per-user models (tenants/<id>/models/): the least recently used are evicted beyond
+    # this many models or this much estimated memory (0 disables a limit).
+    'tenant_max_models': int(os.getenv('TENANT_MAX_MODELS', '1000')),
+    'tenant_max_memory_mb': float(os.getenv('TENANT_MAX_MEMORY_MB', '1024')),
+}
@@ -0,0 +1,101 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Statistics understood by aggregate_daily, plus percentiles written as p<q> (e.g. p90).
+STATS = {'min', 'max', 'sum', 'count', 'mean', 'std', 'median'}
+PERCENTILE = re.compile(r'^p(\d{1,2}(\.\d+)?)$')
+
+
+def _quantile(values: np.ndarray, starts: np.ndarray, n: np.ndarray, q: float) -> np.ndarray:
+    """ Linear interpolated quantile (same as pandas) of every group of pre-sorted values. """
+    position = (n - 1) * q
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    # Groups without any valid value read a dummy position and become NaN below.
+    lower_value = values[np.minimum(starts + lower, len(values) - 1)]
+    upper_value = values[np.minimum(starts + upper, len(values) - 1)]
+    result = lower_value + (upper_value - lower_value) * (position - lower)
+    return np.where(n > 0, result, np.nan)
+
+
+def _within_day_order(values: np.ndarray, valid: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """ Order which sorts the values inside every day (NaN last) while keeping the days in order.
+
+    Each day gets its own band of a single float key (day * band + value), so one
+    argsort replaces a much slower lexsort over (day, value).
+    """
+    if not valid.any():
+        return np.arange(len(values))
+    low, high = values[valid].min(), values[valid].max()
+    span = high - low + 1
+    # Valid values fall in [0, span - 1] of the band and missing ones right after them.
+    key = np.where(valid, values - low, span) + codes * (span + 1)
+    return np.argsort(key, kind='stable')
+
+
+def aggregate_daily(data: pd.DataFrame, col_date: str, stats: list) -> pd.DataFrame:
+    """ Computes every configured per-day statistic with a single grouping of the data.
+
+    The rows are ordered by day once; after that every statistic is a NumPy
+    reduction over contiguous day segments (`reduceat`), and order statistics
+    (median, percentiles) only sort the values inside each day. Missing values
+    are skipped like pandas does.
+
+    Args:
+        data (pd.DataFrame): samples with a day column.
+        col_date (str): name of the day column.
+        stats (list): (column, statistic, new column name) tuples. Statistics:
+                      min, max, sum, count, mean, std, median or p<q> (e.g. p90).
+
+    Returns:
+        pd.DataFrame: one row per day (sorted) with `col_date` and one column per statistic.
+    """
+    for _, stat, _ in stats:
+        if stat not in STATS and not PERCENTILE.match(stat):
+            raise ValueError(f'Unknown statistic {stat}')
+
+    # Single grouping pass: integer day codes in calendar order and a stable sort by them.
+    codes, days = pd.factorize(data[col_date], sort=True)
+    if (codes < 0).any():
+        # Rows without a date are dropped, like groupby does.
+        data, codes = data[codes >= 0], codes[codes >= 0]
+    if len(codes) == 0:
+        return pd.DataFrame(columns=[col_date] + [name for _, _, name in stats])
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+
+    result = {col_date: days}
+    cache = {}
+    for column, stat, name in stats:
+        if column not in cache:
+            values = data[column].to_numpy(dtype=np.float64)[order]
+            valid = ~np.isnan(values)
+            n = np.add.reduceat(valid.astype(np.int64), starts)
+            total = np.add.reduceat(np.where(valid, values, 0.0), starts)
+            cache[column] = {'values': values, 'valid': valid, 'n': n, 'total': total}
+        c = cache[column]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if stat == 'count':
+                result[name] = c['n']
+            elif stat == 'sum':
+                result[name] = c['total']
+            elif stat == 'mean':
+                result[name] = c['total'] / c['n']
+            elif stat == 'min':
+                result[name] = np.fmin.reduceat(c['values'], starts)
+            elif stat == 'max':
+                result[name] = np.fmax.reduceat(c['values'], starts)
+            elif stat == 'std':
+                mean = c['total'] / c['n']
+                deviation = np.where(c['valid'], c['values'] - np.repeat(mean, np.diff(np.r_[starts, len(c['values'])])), 0.0)
+                result[name] = np.sqrt(np.add.reduceat(deviation ** 2, starts) / (c['n'] - 1))
+            else:
+                if 'within_day' not in c:
+                    c['within_day'] = c['values'][_within_day_order(c['values'], c['valid'], sorted_codes)]
+                q = 0.5 if stat == 'median' else float(PERCENTILE.match(stat).group(1)) / 100
+                result[name] = _quantile(c['within_day'], starts, c['n'], q)
+
+    return pd.DataFrame(result)
@@ -0,0 +1,112 @@
+import os
+import json
+import hashlib
+import pandas as pd
+
+# Bump it whenever the parsing/aggregation logic changes so old entries are ignored.
+CACHE_VERSION = 1
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_fingerprint(path: str, with_hash: bool = True) -> dict:
+    """ Size, modification time and (optionally) content hash of a file.
+
+    Args:
+        path (str): file to fingerprint.
+        with_hash (bool): also hash the content (blake2b), the expensive part.
+
+    Returns:
+        dict: {'size', 'mtime_ns'} plus 'hash' when requested.
+    """
+    stat = os.stat(path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        fingerprint['hash'] = digest.hexdigest()
+    return fingerprint
+
+
+def config_fingerprint(config: dict) -> str:
+    """ Short hash of the source config that produced a parsed dataset. """
+    payload = json.dumps({'version': CACHE_VERSION, 'config': config}, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+def _write_atomic(path: str, write):
+    tmp_path = f'{path}.tmp'
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_json(path: str, content: dict):
+    with open(path, 'w') as f:
+        json.dump(content, f)
+
+
+def source_fingerprint(file_path: str, stored: dict = None) -> dict:
+    """ Fingerprint of a raw export, reusing the stored hash when size and mtime didn't change.
+
+    Args:
+        file_path (str): raw export.
+        stored (dict): fingerprint recorded the last time (if any).
+
+    Returns:
+        dict: {'size', 'mtime_ns', 'hash'}
+    """
+    current = file_fingerprint(file_path, with_hash=False)
+    if stored and stored.get('size') == current['size'] and stored.get('mtime_ns') == current['mtime_ns']:
+        return {**current, 'hash': stored['hash']}
+    return file_fingerprint(file_path)
+
+
+def cached_source(source_key: str, config: dict, loader, cache_dir: str = 'data/cache') -> pd.DataFrame:
+    """ Returns the parsed and daily aggregated dataset of a source, from the cache when possible.
+
+    The entry is keyed by the source name plus the hash of its config, and it
+    remembers the fingerprint of the raw file it was built from:
+    - same size and mtime => hit without reading the raw file at all
+    - different size/mtime => the file is hashed; same content is still a hit
+    - anything else (or a config change) => `loader()` runs and the entry is rewritten
+
+    Args:
+        source_key (str): key of the source in DATA_SOURCES (e.g. 'stress').
+        config (dict): DATA_SOURCES[source_key].
+        loader: function without arguments which parses the raw file (e.g. a load_data call).
+        cache_dir (str): folder of the Parquet files. None disables the cache.
+
+    Returns:
+        pd.DataFrame: same output as `loader()`.
+    """
+    file_path = config.get('file_path')
+    if not cache_dir or not file_path or not os.path.isfile(file_path):
+        return loader()
+
+    entry = os.path.join(cache_dir, f'{source_key}-{config_fingerprint(config)}')
+    data_path, meta_path = f'{entry}.parquet', f'{entry}.json'
+
+    stored = None
+    if os.path.exists(meta_path) and os.path.exists(data_path):
+        with open(meta_path) as f:
+            stored = json.load(f)['fingerprint']
+
+    fingerprint = source_fingerprint(file_path, stored)
+    if stored is not None and stored['hash'] == fingerprint['hash']:
+        data = pd.read_parquet(data_path)
+        if stored != fingerprint:
+            # Same content with a new mtime (e.g. copied again): refresh it to skip the hash next time.
+            _write_atomic(meta_path, lambda p: _write_json(p, {'fingerprint': fingerprint}))
+        print(f'⚡ {source_key} loaded from cache ({len(data)} days)')
+        return data
+
+    data = loader()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_atomic(data_path, lambda p: data.to_parquet(p, index=False))
+        _write_atomic(meta_path, lambda p: _write_json(p, {'fingerprint': fingerprint}))
+    except Exception as e:
+        # The cache is an optimization: a failure to write it must not break the pipeline.
+        print(f'⚠️ Parsed {source_key} data could not be cached => {e}')
+    return data
@@ -1,5 +1,30 @@
+import numpy as np
 import pandas as pd
 from src.components.config import DATA_SOURCES
+from src.components.daily_aggregation import aggregate_daily
+
+# Same parsing options for the full and the streaming readers.
+CSV_OPTIONS = dict(sep=",",
+                   header=1,
+                   index_col=False,
+                   encoding="latin-1",
+                   na_values=["", " ", "NaN", "nan"],
+                   keep_default_na=True)
+
+def heart_daily_stats() -> list:
+    """ (column, statistic, new name) tuples of the heart dataset.
+
+    Taken from DATA_SOURCES['heart_rate']['daily_stats'] where the column can be
+    a name or its index in `cols_to_keep`. Configs without that key keep the
+    original max / min / median of cols_to_keep[3] / [1] / [2].
+    """
+    config = DATA_SOURCES['heart_rate']
+    cols = config['cols_to_keep']
+    stats = config.get('daily_stats') or [(3, 'max', config['new_name_columns'][1]),
+                                          (1, 'min', config['new_name_columns'][2]),
+                                          (2, 'median', config['new_name_columns'][3])]
+    return [(cols[column] if isinstance(column, int) else column, stat, name) for column, stat, name in stats]
+
 
 def process_heart_data(data: pd.DataFrame) -> pd.DataFrame:
     """
@@ -10,22 +35,123 @@ def process_heart_data(data: pd.DataFrame) -> pd.DataFrame:
         data (pd.DataFrame): Handled Heart Dataset.
     """
     try:
-        df1 = data.groupby(DATA_SOURCES['heart_rate']['col_date']['mod'])[DATA_SOURCES['heart_rate']['cols_to_keep'][3]].max().reset_index()
-        df2 = data.groupby(DATA_SOURCES['heart_rate']['col_date']['mod'])[DATA_SOURCES['heart_rate']['cols_to_keep'][1]].min().reset_index()
-        df3 = data.groupby(DATA_SOURCES['heart_rate']['col_date']['mod'])[DATA_SOURCES['heart_rate']['cols_to_keep'][2]].median().reset_index()
+        # All the daily statistics come out of one grouping of the data instead of
+        # one groupby per statistic plus the merges to stitch them back together.
+        data = aggregate_daily(data, DATA_SOURCES['heart_rate']['col_date']['mod'], heart_daily_stats())
 
-        data = pd.merge(df1, df2, on= DATA_SOURCES['heart_rate']['col_date']['mod'], how='outer')
-        data = pd.merge(data, df3, on= DATA_SOURCES['heart_rate']['col_date']['mod'], how='outer')
-
-        data.columns = DATA_SOURCES['heart_rate']['new_name_columns']
+        data = data.rename(columns={DATA_SOURCES['heart_rate']['col_date']['mod']: DATA_SOURCES['heart_rate']['new_name_columns'][0]})
         return data
     
     except Exception as e:
         raise RuntimeError(f'Error happened handling heart dataset => {e}') from e
         
 
+def _value_counts_by_day(chunk: pd.DataFrame, col_date: str, column: str) -> pd.Series:
+    """ Exact sketch of one column of a chunk: number of samples per (day, value). """
+    return chunk.groupby([col_date, column]).size()
+
+
+def _stat_from_counts(counts: pd.Series, stat: str) -> pd.Series:
+    """ Computes an exact per-day statistic from a (day, value) => count sketch.
+
+    Args:
+        counts (pd.Series): counts indexed by (day, value), sorted by day and value.
+        stat (str): median, mean, min, max or count.
+
+    Returns:
+        pd.Series: statistic indexed by day.
+    """
+    days = counts.index.get_level_values(0)
+    values = counts.index.get_level_values(1).to_numpy(dtype=np.float64)
+    c = counts.to_numpy()
+
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    ends = np.r_[starts[1:], len(c)]
+    n = np.add.reduceat(c, starts)
+
+    if stat == 'count':
+        result = n
+    elif stat == 'min':
+        result = values[starts]
+    elif stat == 'max':
+        result = values[ends - 1]
+    elif stat == 'mean':
+        result = np.add.reduceat(values * c, starts) / n
+    elif stat == 'median':
+        # Position of the two middle samples of each day inside the global cumulative counts.
+        cum = np.cumsum(c)
+        before = (cum - c)[starts]
+        lower = values[np.searchsorted(cum, before + (n - 1) // 2, side='right')]
+        upper = values[np.searchsorted(cum, before + n // 2, side='right')]
+        result = (lower + upper) / 2
+    else:
+        raise ValueError(f'Unknown statistic {stat}')
+    return pd.Series(result, index=days[starts])
+
+
+def _merge_counts(counts: list) -> pd.Series:
+    """ Sums (day, value) => count sketches into one. """
+    return pd.concat(counts).groupby(level=[0, 1]).sum() if len(counts) > 1 else counts[0]
+
+
+def stream_daily_aggregates(reader, col_date: str, stat: str = 'median', since=None) -> pd.DataFrame:
+    """ Aggregates a chunked CSV reader by day without holding the whole file in memory.
+
+    Every chunk is reduced to a (day, value) => count sketch per column. That keeps
+    median/min/max/mean/count exact while the memory only grows with days x distinct
+    values (heart rate and stress are integer readings, so a day of per-minute
+    samples is a couple of hundred entries), not with the samples of the file.
+
+    The chunk sketches are queued and merged into the running sketch only once
+    they hold as many entries as it: every entry is merged a bounded number of
+    times, so the cost stays linear in the file size instead of re-merging the
+    whole sketch for every chunk. Exports aren't guaranteed to be sorted, so no
+    day is final before the last chunk.
+
+    Args:
+        reader: iterable of DataFrame chunks (e.g. pd.read_csv(..., chunksize=n)).
+        col_date (str): Name of the column containing date or datetime info.
+        stat (str): statistic to compute for every column (median by default).
+        since (datetime.date): if given, only this day and the later ones are aggregated.
+
+    Returns:
+        pd.DataFrame: one row per day with the statistic of every column (NaN
+                      where a day has no value of a column, as the full load).
+    """
+    sketches = {}
+    pending = {}
+    days = set()
+    columns = []
+    for chunk in reader:
+        columns = list(chunk.columns.drop(col_date))
+        chunk[col_date] = pd.to_datetime(chunk[col_date]).dt.date
+        if since is not None:
+            chunk = chunk[chunk[col_date] >= since]
+        # Days whose readings are all missing still get their (NaN) row.
+        days.update(chunk[col_date].unique())
+        for column in columns:
+            queue = pending.setdefault(column, [])
+            queue.append(_value_counts_by_day(chunk, col_date, column))
+            merged = sketches.get(column)
+            if sum(map(len, queue)) >= (0 if merged is None else len(merged)):
+                sketches[column] = _merge_counts(queue if merged is None else [merged] + queue)
+                queue.clear()
+
+    for column, queue in pending.items():
+        if queue:
+            sketches[column] = _merge_counts([sketches[column]] + queue if column in sketches else queue)
+
+    if not days:
+        return pd.DataFrame(columns=[col_date] + columns)
+    data = pd.DataFrame({column: _stat_from_counts(counts.sort_index(), stat)
+                         for column, counts in sketches.items() if len(counts)},
+                        index=pd.Index(sorted(days), name=col_date), columns=columns)
+    return data.reset_index()
+
+
 def load_data(file_path: str, cols_to_keep: list,
-              col_date: str, prefix: str, data_type: str = '') -> pd.DataFrame:
+              col_date: str, prefix: str, data_type: str = '',
+              chunksize: int = None, dtypes: dict = None, since=None) -> pd.DataFrame:
     """
     Loads a single Samsung Health CSV, cleans and aggregates it by date.
 
@@ -35,29 +161,42 @@ def load_data(file_path: str, cols_to_keep: list,
         col_date (str): Name of the column containing date or datetime info.
         prefix (str): Prefix to apply to all columns (except date).
         data_type: Data type of the dataset (for example, heart).
+        chunksize (int): If given, the CSV is streamed in chunks of this many rows
+                         and aggregated incrementally (bounded memory for big exports).
+        dtypes (dict): Explicit dtypes of the columns for the streaming reader
+                       (float64 for every column but the date by default).
+        since (datetime.date): If given, only this day and the later ones are kept
+                               (incremental refreshes: the last processed day may have
+                               been partial). Their gaps are not filled, the previous
+                               days are needed for that (see incremental_transformation).
 
     Returns:
         pd.DataFrame: Cleaned and aggregated dataframe with daily granularity.
     """
     try:
-        data =  pd.read_csv(file_path,
-                            sep=",",
-                            usecols=cols_to_keep,
-                            header=1,
-                            index_col=False,
-                            encoding="latin-1",
-                            na_values=["", " ", "NaN", "nan"],
-                            keep_default_na=True)
-        
-        data[col_date] = pd.to_datetime(data[col_date]).dt.date
-        
-        # Here I'll take the median because it's the most suitable for this case and also more robust to outliers:
-        data = data.groupby(col_date).median().reset_index()
+        if chunksize:
+            if dtypes is None:
+                dtypes = {col: 'float64' for col in cols_to_keep if col != col_date}
+            reader = pd.read_csv(file_path, usecols=cols_to_keep, chunksize=chunksize,
+                                 dtype={**dtypes, col_date: str}, **CSV_OPTIONS)
+            # Same daily median as below, computed chunk by chunk:
+            data = stream_daily_aggregates(reader, col_date, stat='median', since=since)
+        else:
+            data =  pd.read_csv(file_path,
+                                usecols=cols_to_keep,
+                                **CSV_OPTIONS)
+            
+            data[col_date] = pd.to_datetime(data[col_date]).dt.date
+            if since is not None:
+                data = data[data[col_date] >= since]
+            
+            # Here I'll take the median because it's the most suitable for this case and also more robust to outliers:
+            data = data.groupby(col_date).median().reset_index()
         
         data = data.rename(columns={col_date: 'date'})
         
         # data.isna() => Boolean pd.Dataframe .sum() => pd.Series (per feture) .sum() Total NaN of pd.Dataframe
-        if data.isna().sum().sum() > 0:
+        if since is None and data.isna().sum().sum() > 0:
             data = data.sort_values('date')
             data = data.bfill().ffill()
             
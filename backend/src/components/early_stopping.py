@@ -0,0 +1,73 @@
+import pandas as pd
+from xgboost import XGBRegressor
+
+from src.components.config import section_config
+
+DEFAULT_TRAINING = {
+    'tree_method': 'hist',
+    'n_estimators': 1000,
+    'early_stopping_rounds': 50,
+    'validation_days': 60,
+}
+
+
+def training_config(config: dict = None) -> dict:
+    """ Training settings: DATA_SOURCES['model_trainer'] completed with DEFAULT_TRAINING. """
+    return section_config('model_trainer', DEFAULT_TRAINING, config)
+
+
+def validation_split(X: pd.DataFrame, y: pd.Series, days: int) -> tuple:
+    """ Time-aware split: the last `days` of the window validate, the days before train.
+
+    Args:
+        X (pd.DataFrame): features with a datetime index.
+        y (pd.Series): target.
+        days (int): length of the validation segment.
+
+    Returns:
+        tuple: (X_fit, y_fit, X_val, y_val). The validation part is empty when
+               the window is too short to keep enough days for training.
+    """
+    cutoff = X.index.max() - pd.Timedelta(days=days)
+    fit = X.index <= cutoff
+    if fit.sum() < days:
+        return X, y, X.iloc[:0], y.iloc[:0]
+    return X[fit], y[fit], X[~fit], y[~fit]
+
+
+def fit_with_early_stopping(X_train: pd.DataFrame, y_train: pd.Series, config: dict = None) -> XGBRegressor:
+    """ Trains an XGBRegressor with the histogram method, stopping when the validation days stop improving.
+
+    Up to `n_estimators` trees are grown on the training window minus its last
+    `validation_days`; boosting stops after `early_stopping_rounds` rounds
+    without improvement on them and `best_iteration` is kept. Short windows
+    are trained without early stopping (and the XGBRegressor default of 100 trees).
+
+    Args:
+        X_train (pd.DataFrame): training features (datetime index).
+        y_train (pd.Series): target.
+        config (dict): settings (DATA_SOURCES['model_trainer'] by default).
+
+    Returns:
+        XGBRegressor: fitted model.
+    """
+    config = training_config(config)
+    X_fit, y_fit, X_val, y_val = validation_split(X_train, y_train, config['validation_days'])
+    early_stopping = config['early_stopping_rounds'] if len(X_val) else None
+
+    model = XGBRegressor(objective='reg:squarederror', random_state=42, tree_method=config['tree_method'],
+                         n_estimators=config['n_estimators'] if early_stopping else 100,
+                         early_stopping_rounds=early_stopping)
+    if early_stopping:
+        model.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+    else:
+        model.fit(X_train, y_train)
+    return model
+
+
+def best_n_trees(model: XGBRegressor) -> int:
+    """ Trees used for predictions: up to the best iteration when early stopping was used. """
+    try:
+        return model.best_iteration + 1
+    except AttributeError:
+        return model.get_booster().num_boosted_rounds()
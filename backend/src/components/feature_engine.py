@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.components.config import DATA_SOURCES, section_config
+
+DEFAULT_FEATURES = {
+    'features_to_lag': [],
+    'lags': [1, 2, 3],
+    'rolling_windows': [],
+    'rolling_stats': ['mean', 'std'],
+    'ewm_spans': [],
+}
+
+# EWM features weight the previous 3 x span days (older days would weigh less than 0.25%),
+# so a bounded history gives the same values in training, incremental refreshes and serving.
+EWM_HISTORY_SPANS = 3
+
+
+def feature_config(config: dict = None) -> dict:
+    """ Feature engine settings: DATA_SOURCES['data_transformation'] completed with DEFAULT_FEATURES. """
+    return section_config('data_transformation', DEFAULT_FEATURES, config)
+
+
+def feature_names(config: dict = None) -> list:
+    """ Names of the derived columns, grouped by feature (lags, rolling stats, EWM). """
+    config = feature_config(config)
+    names = []
+    for feature in config['features_to_lag']:
+        names += [f'{feature}_lag{lag}' for lag in config['lags']]
+        names += [f'{feature}_roll{window}_{stat}' for window in config['rolling_windows']
+                  for stat in config['rolling_stats']]
+        names += [f'{feature}_ewm{span}' for span in config['ewm_spans']]
+    return names
+
+
+def history_days(config: dict = None) -> int:
+    """ Previous days needed to compute the features of one day (lags, rolling windows and EWM spans). """
+    config = feature_config(config)
+    ewm_days = [EWM_HISTORY_SPANS * span for span in config['ewm_spans']]
+    return max(config['lags'] + config['rolling_windows'] + ewm_days + [0])
+
+
+def _windowed_ewm(values: np.ndarray, span: int) -> np.ndarray:
+    """ Exponentially weighted mean (pandas' adjust=True weights) of the last EWM_HISTORY_SPANS x span rows.
+
+    Missing values are skipped as pandas does; a row without any known value in its window is NaN.
+    """
+    window = EWM_HISTORY_SPANS * span
+    padded = np.vstack([np.full((window - 1, values.shape[1]), np.nan), values])
+    # (rows, features, window), the oldest day first
+    windows = sliding_window_view(padded, window, axis=0)
+    weights = (1 - 2 / (span + 1)) ** np.arange(window - 1, -1, -1)
+    known = ~np.isnan(windows)
+    total = np.where(known, windows, 0) @ weights
+    norm = known @ weights
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(norm > 0, total / norm, np.nan)
+
+
+def build_features(data: pd.DataFrame, config: dict = None, dropna: bool = True) -> pd.DataFrame:
+    """ Adds lag, rolling and EWM features of the configured features in one block.
+
+    The days are placed on a calendar grid first, so a gap in the export gives
+    NaN lags (and the row is dropped) instead of silently taking an older day.
+    All derived values of all features are written into a single preallocated
+    array with vectorized NumPy operations and joined to the data at once.
+    Every derived feature only looks at previous days:
+    - lag k: value k days before
+    - roll<w>_<stat>: mean/std of the previous w days
+    - ewm<s>: exponentially weighted mean (span s) of the previous EWM_HISTORY_SPANS x s days
+
+    Args:
+        data (pd.DataFrame): daily dataset with the date column of DATA_SOURCES.
+        config (dict): feature settings (DATA_SOURCES['data_transformation'] by default).
+        dropna (bool): drop the rows with missing values, as the training set needs.
+
+    Returns:
+        pd.DataFrame: data sorted by date with the derived columns.
+    """
+    config = feature_config(config)
+    date_col = DATA_SOURCES['heart_rate']['col_date']['mod']
+    features = config['features_to_lag']
+    names = feature_names(config)
+
+    data = data.sort_values(by=date_col).drop(columns=[n for n in names if n in data.columns])
+    days = pd.to_datetime(data[date_col]).dt.normalize()
+    grid = pd.date_range(days.min(), days.max(), freq='D') if len(days) else pd.DatetimeIndex([])
+    positions = grid.get_indexer(days)
+
+    # Base values on the calendar grid (missing days stay NaN).
+    base = np.full((len(grid), len(features)), np.nan)
+    base[positions] = data[features].to_numpy(dtype=np.float64)
+    # Values known the day before (the current day never leaks into its own features).
+    past = np.vstack([np.full((1, len(features)), np.nan), base[:-1]]) if len(grid) else base
+
+    n_derived = len(names) // len(features) if features else 0
+    block = np.full((len(grid), len(features), n_derived), np.nan)
+    k = 0
+    for lag in config['lags']:
+        if lag < len(grid):
+            block[lag:, :, k] = base[:-lag]
+        k += 1
+    for window in config['rolling_windows']:
+        windows = sliding_window_view(past, window, axis=0) if window <= len(grid) else None
+        for stat in config['rolling_stats']:
+            if windows is not None:
+                block[window - 1:, :, k] = windows.std(axis=-1, ddof=1) if stat == 'std' else windows.mean(axis=-1)
+            k += 1
+    for span in config['ewm_spans']:
+        if len(grid):
+            block[:, :, k] = _windowed_ewm(past, span)
+        k += 1
+
+    derived = pd.DataFrame(block.reshape(len(grid), -1)[positions], columns=names, index=data.index)
+    data = pd.concat([data, derived], axis=1)
+    return data.dropna() if dropna else data
+
+
+def build_feature_row(history: pd.DataFrame, config: dict = None) -> pd.Series:
+    """ Serving helper: features of the last day of a short daily history.
+
+    Uses exactly the same code as the training set, so the features served
+    match the ones the model was trained with.
+
+    Args:
+        history (pd.DataFrame): recent days (date column + base features), the last one being "today".
+        config (dict): feature settings (DATA_SOURCES['data_transformation'] by default).
+
+    Returns:
+        pd.Series: base and derived features of the last day (NaN where history is missing).
+    """
+    return build_features(history, config, dropna=False).iloc[-1]
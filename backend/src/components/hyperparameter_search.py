@@ -0,0 +1,135 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables HalvingRandomSearchCV)
+from sklearn.model_selection import TimeSeriesSplit, HalvingRandomSearchCV
+from xgboost import XGBRegressor
+
+from src.components.config import section_config
+
+DEFAULT_TUNING = {
+    'tuning': False,
+    'param_grid': {},
+    'n_candidates': 27,
+    'halving_factor': 3,
+    'resource': 'n_estimators',
+    'max_resources': 'auto',
+    'min_resources': 'exhaust',
+    'n_splits': 5,
+    'n_jobs': -1,
+    'random_state': 42,
+}
+
+
+def tuning_config(config: dict = None) -> dict:
+    """ Search settings: DATA_SOURCES['model_trainer'] completed with DEFAULT_TUNING. """
+    return section_config('model_trainer', DEFAULT_TUNING, config)
+
+
+def plan_threads(n_jobs: int = -1, n_tasks: int = None, n_cores: int = None) -> tuple:
+    """ Splits the cores between search processes and XGBoost threads.
+
+    Every process trains with `cores // processes` threads, so processes x threads
+    never exceeds the cores (no oversubscription) and no core stays idle when
+    there are fewer fits than cores.
+
+    Args:
+        n_jobs (int): processes requested (-1 = one per core).
+        n_tasks (int): fits that can run at the same time (e.g. candidates x folds).
+        n_cores (int): available cores (TRAIN_CPU_THREADS when a scheduler set a budget
+                       for this training, os.cpu_count() otherwise).
+
+    Returns:
+        tuple: (processes, threads per process)
+    """
+    n_cores = n_cores or int(os.getenv('TRAIN_CPU_THREADS', '0')) or os.cpu_count() or 1
+    processes = n_cores if n_jobs is None or n_jobs < 0 else min(n_jobs, n_cores)
+    if n_tasks:
+        processes = min(processes, n_tasks)
+    processes = max(1, processes)
+    return processes, max(1, n_cores // processes)
+
+
+def _share(array: np.ndarray, folder: str, name: str) -> np.ndarray:
+    # A read-only memmap is sent to the workers as a file reference: every fold
+    # is a view of the same pages instead of a pickled copy per task.
+    path = os.path.join(folder, f'{name}.joblib')
+    joblib.dump(np.ascontiguousarray(array), path)
+    return joblib.load(path, mmap_mode='r')
+
+
+def tune_model(X_train: pd.DataFrame, y_train: pd.Series, config: dict = None):
+    """ Successive halving random search of the XGBRegressor hyperparameters.
+
+    - Candidates are sampled from `param_grid` and evaluated on TimeSeriesSplit folds.
+    - Every round only the best 1/`halving_factor` candidates survive, and they get
+      `halving_factor` times more resources (trees by default): bad candidates are
+      pruned after a few cheap fits instead of being trained to the end.
+    - The training data is memory-mapped once and shared by all worker processes.
+    - XGBoost threads per fit = cores // processes (see plan_threads).
+
+    The best parameters are refitted on the DataFrame (full resources and all the
+    cores), so the model keeps its feature names.
+
+    Args:
+        X_train (pd.DataFrame): training features.
+        y_train (pd.Series): training target.
+        config (dict): search settings (DATA_SOURCES['model_trainer'] by default).
+
+    Returns:
+        tuple: (fitted XGBRegressor, fitted HalvingRandomSearchCV)
+    """
+    config = tuning_config(config)
+    param_grid = dict(config['param_grid'])
+    resource = config['resource']
+    max_resources = config['max_resources']
+    if resource != 'n_samples':
+        # The resource is what halving grows, it can't be searched as well.
+        values = param_grid.pop(resource, None)
+        if max_resources == 'auto':
+            # Largest value of the grid, or the XGBRegressor default (100 trees).
+            max_resources = max(values) if values else 100
+
+    tscv = TimeSeriesSplit(n_splits=config['n_splits'])
+    n_candidates = config['n_candidates']
+    # The first round is the widest one: candidates x folds fits at once.
+    n_tasks = n_candidates * config['n_splits'] if isinstance(n_candidates, int) else None
+    processes, threads = plan_threads(config['n_jobs'], n_tasks)
+
+    search = HalvingRandomSearchCV(
+        XGBRegressor(objective='reg:squarederror', random_state=config['random_state'],
+                     tree_method='hist', n_jobs=threads),
+        param_distributions=param_grid,
+        n_candidates=n_candidates,
+        factor=config['halving_factor'],
+        resource=resource,
+        max_resources=max_resources,
+        min_resources=config['min_resources'],
+        scoring='neg_root_mean_squared_error',
+        cv=tscv,
+        refit=False,
+        n_jobs=processes,
+        random_state=config['random_state'],
+    )
+
+    with tempfile.TemporaryDirectory(prefix='tuning-') as folder:
+        X_shared = _share(X_train.to_numpy(dtype=np.float32), folder, 'X')
+        y_shared = _share(np.asarray(y_train, dtype=np.float32), folder, 'y')
+        # inner_max_num_threads caps OpenMP/BLAS inside the loky workers as well.
+        with joblib.parallel_config(backend='loky', inner_max_num_threads=threads):
+            search.fit(X_shared, y_shared)
+
+    best_params = dict(search.best_params_)
+    if resource != 'n_samples':
+        # Refit with the full resources, not the ones of the last round.
+        best_params[resource] = max_resources if isinstance(max_resources, int) else search.n_resources_[-1]
+    print(f'🔎 {len(search.cv_results_["params"])} candidate evaluations in {search.n_iterations_} rounds '
+          f'({processes} processes x {threads} threads). Best: {best_params}')
+
+    # Single fit left: XGBoost gets all the cores.
+    best = XGBRegressor(objective='reg:squarederror', random_state=config['random_state'],
+                        tree_method='hist', **best_params)
+    best.fit(X_train, y_train)
+    return best, search
@@ -0,0 +1,126 @@
+import os
+import warnings
+import numpy as np
+import pandas as pd
+import xgboost
+from xgboost import XGBRegressor
+from sklearn.metrics import root_mean_squared_error
+
+from src.components.config import section_config
+from src.components.early_stopping import best_n_trees
+from src.components.model_artifact import load_trained_model
+
+DEFAULT_WARM_START = {
+    'warm_start': False,
+    'warm_start_mode': 'boost',
+    'warm_start_rounds': 20,
+    'warm_start_window': 365,
+    'warm_start_learning_rate': 0.1,
+    'warm_start_tolerance': 0.02,
+    'max_warm_starts': 8,
+}
+
+
+def warm_start_config(config: dict = None) -> dict:
+    """ Warm start settings: DATA_SOURCES['model_trainer'] completed with DEFAULT_WARM_START. """
+    return section_config('model_trainer', DEFAULT_WARM_START, config)
+
+
+def continue_training(previous: XGBRegressor, X: pd.DataFrame, y: pd.Series,
+                      mode: str = 'boost', rounds: int = 20, learning_rate: float = None) -> XGBRegressor:
+    """ Updates a trained model with new data instead of fitting it from scratch.
+
+    Args:
+        previous (XGBRegressor): latest trained model.
+        X (pd.DataFrame): data to learn from.
+        y (pd.Series): target.
+        mode (str): 'boost' adds `rounds` trees fitted on X (xgb_model continuation),
+                    'refresh' keeps the trees and refits their leaf values on X.
+        rounds (int): trees added by 'boost'.
+        learning_rate (float): shrinkage of the added trees (the previous one by default).
+
+    Returns:
+        XGBRegressor: new model (the previous one is not modified).
+    """
+    # Trees after the best iteration are dropped: they were never used to predict, and a
+    # sliced booster loses the best_iteration attribute which would hide the new trees.
+    booster = previous.get_booster()[:best_n_trees(previous)]
+    if mode == 'boost':
+        params = {**previous.get_params(), 'n_estimators': rounds, 'early_stopping_rounds': None}
+        if learning_rate is not None:
+            params['learning_rate'] = learning_rate
+        return XGBRegressor(**params).fit(X, y, xgb_model=booster)
+    if mode == 'refresh':
+        # The refresh updater needs a plain DMatrix, which the sklearn wrapper doesn't use.
+        params = {**booster_params(previous), 'process_type': 'update', 'updater': 'refresh', 'refresh_leaf': True}
+        with warnings.catch_warnings():
+            # xgboost warns that `updater` overrides tree_method, which is the point here.
+            warnings.simplefilter('ignore', UserWarning)
+            refreshed = xgboost.train(params, xgboost.DMatrix(X, y), num_boost_round=booster.num_boosted_rounds(),
+                                      xgb_model=booster)
+        model = XGBRegressor(**{**previous.get_params(), 'early_stopping_rounds': None})
+        model.load_model(bytearray(refreshed.save_raw()))
+        return model
+    raise ValueError(f'Unknown warm start mode {mode}')
+
+
+def booster_params(model: XGBRegressor) -> dict:
+    """ Training parameters of an XGBRegressor in the native xgboost.train format. """
+    params = model.get_xgb_params()
+    return {key: value for key, value in params.items() if value is not None}
+
+
+def warm_start_model(X_train: pd.DataFrame, y_train: pd.Series, X_test: pd.DataFrame, y_test: pd.Series,
+                     previous_model: dict, config: dict = None):
+    """ Incremental retrain: the latest model learns the days it hasn't seen yet.
+
+    'boost' continues the previous booster with `warm_start_rounds` trees fitted
+    on a recent window (the new days plus `warm_start_window` days before them);
+    'refresh' refits the leaf values of the existing trees on that window.
+
+    Falls back (returns None) when the previous model can't be used:
+    - no previous model, different features or no new training days
+    - `max_warm_starts` warm starts in a row (a full refit resets the drift)
+    - the guard: the updated model is worse than the previous one on the
+      holdout by more than `warm_start_tolerance` (relative RMSE)
+
+    Args:
+        X_train, y_train: training set (datetime index).
+        X_test, y_test: holdout set.
+        previous_model (dict): 'model' section of the manifest (path, train_end, warm_starts).
+        config (dict): settings (DATA_SOURCES['model_trainer'] by default).
+
+    Returns:
+        tuple: (XGBRegressor, info dict) or (None, reason) when a full refit is needed.
+    """
+    config = warm_start_config(config)
+    if not previous_model or not previous_model.get('train_end') or not os.path.exists(previous_model.get('path', '')):
+        return None, 'no previous model'
+    if previous_model.get('warm_starts', 0) >= config['max_warm_starts']:
+        return None, f"{config['max_warm_starts']} warm starts in a row"
+
+    previous = load_trained_model(previous_model['path'])
+    if list(previous.get_booster().feature_names or []) != list(X_train.columns):
+        return None, 'the features changed'
+
+    mode = config['warm_start_mode']
+    train_end = pd.Timestamp(previous_model['train_end'])
+    new_days = int((X_train.index > train_end).sum())
+    if mode == 'boost' and not new_days:
+        return None, 'no new training days'
+    # The new days plus the last `warm_start_window` days already seen: boosting on the
+    # new days alone overfits them when they are only a week or two.
+    window = config['warm_start_window']
+    recent = X_train.index > train_end - pd.Timedelta(days=window) if window else X_train.index > train_end
+    X_new, y_new = X_train[recent], y_train[recent]
+
+    model = continue_training(previous, X_new, y_new, mode, config['warm_start_rounds'],
+                              config['warm_start_learning_rate'])
+
+    previous_rmse = root_mean_squared_error(y_test, previous.predict(X_test))
+    rmse = root_mean_squared_error(y_test, model.predict(X_test))
+    if not np.isfinite(rmse) or rmse > previous_rmse * (1 + config['warm_start_tolerance']):
+        return None, f'holdout RMSE degraded ({previous_rmse:.2f} => {rmse:.2f})'
+
+    return model, {'mode': mode, 'rows': len(X_new), 'new_days': new_days, 'previous_rmse': float(previous_rmse),
+                   'warm_starts': previous_model.get('warm_starts', 0) + 1}
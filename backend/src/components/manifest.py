@@ -0,0 +1,104 @@
+import os
+import json
+from datetime import date
+
+from src.components.config import DATA_SOURCES
+from src.components.data_cache import file_fingerprint, source_fingerprint
+
+# Small JSON file written by the transformation and training stages so the
+# retrain decision doesn't need to read the datasets, the logs or the models folder.
+MANIFEST_PATH = 'data/manifest.json'
+SOURCE_KEYS = ('stress', 'heart_rate')
+
+
+def read_manifest(path: str = MANIFEST_PATH) -> dict:
+    """ Returns the manifest, or an empty dict when it doesn't exist (or can't be read).
+
+    Layout:
+        {'data': {'last_date', 'rows', 'sink', 'updated_at', 'sources': {key: fingerprint}},
+         'model': {'path', 'date', 'rmse', 'trained_at'}}
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def update_manifest(section: str, values: dict, path: str = MANIFEST_PATH) -> dict:
+    """ Replaces one section of the manifest (atomic write, the other sections are kept).
+
+    Args:
+        section (str): 'data' or 'model'.
+        values (dict): content of the section (dates are stored in ISO format).
+        path (str): manifest file.
+
+    Returns:
+        dict: the whole manifest.
+    """
+    manifest = read_manifest(path)
+    manifest[section] = json.loads(json.dumps(values, default=lambda v: v.isoformat()))
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+    return manifest
+
+
+def source_fingerprints(previous: dict = None) -> dict:
+    """ Fingerprints of the raw exports of DATA_SOURCES (the stored hashes are reused for untouched files).
+
+    Args:
+        previous (dict): source key => fingerprint recorded in the manifest.
+
+    Returns:
+        dict: source key => {'size', 'mtime_ns', 'hash'} (None when the file doesn't exist).
+    """
+    previous = previous or {}
+    fingerprints = {}
+    for key in SOURCE_KEYS:
+        file_path = DATA_SOURCES[key].get('file_path')
+        exists = bool(file_path) and os.path.isfile(file_path)
+        fingerprints[key] = source_fingerprint(file_path, previous.get(key)) if exists else None
+    return fingerprints
+
+
+def sources_changed(manifest: dict = None, path: str = MANIFEST_PATH) -> bool:
+    """ Did the raw exports change since the last transformation? Nothing is parsed.
+
+    A file whose size and mtime match the manifest is unchanged (one stat call).
+    Only a touched file is hashed, so copying the same export again is not a change.
+
+    Args:
+        manifest (dict): already read manifest (read from `path` otherwise).
+        path (str): manifest file.
+
+    Returns:
+        bool: True if a source changed or was never processed.
+    """
+    manifest = read_manifest(path) if manifest is None else manifest
+    recorded = manifest.get('data', {}).get('sources')
+    if not recorded:
+        return True
+    for key in SOURCE_KEYS:
+        file_path = DATA_SOURCES[key].get('file_path')
+        stored = recorded.get(key)
+        if not file_path or not os.path.isfile(file_path):
+            if stored is not None:
+                return True
+            continue
+        if stored is None:
+            return True
+        current = file_fingerprint(file_path, with_hash=False)
+        if current['size'] == stored['size'] and current['mtime_ns'] == stored['mtime_ns']:
+            continue
+        if current['size'] != stored['size'] or file_fingerprint(file_path)['hash'] != stored['hash']:
+            return True
+    return False
+
+
+def manifest_date(section: dict, key: str):
+    """ Date stored in a manifest section, or None. """
+    value = (section or {}).get(key)
+    return date.fromisoformat(value[:10]) if value else None
@@ -0,0 +1,158 @@
+import os
+import json
+import shutil
+import hashlib
+import secrets
+from datetime import datetime
+import numpy as np
+
+from src.components.compiled_forest import CompiledForest, compile_booster
+
+# xgboost and pandas are NOT imported at module level: the serving workers load
+# bundles through this module and must stay free of them (see ModelRegistry).
+
+ARTIFACT_FORMAT = 1
+BOOSTER_FILE = 'model.ubj'
+FOREST_FILE = 'forest'
+FEATURES_FILE = 'features.json'
+METADATA_FILE = 'metadata.json'
+
+
+def new_version() -> str:
+    """ Unique, sortable version id: YYYYMMDDTHHMMSS_<6 hex>. Two runs on the same day never collide. """
+    return f"{datetime.now().strftime('%Y%m%dT%H%M%S')}_{secrets.token_hex(3)}"
+
+
+def dataset_fingerprint(data) -> str:
+    """ Content hash of the training dataset (index and values). """
+    import pandas as pd
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    digest.update(json.dumps(list(map(str, data.columns))).encode())
+    return digest.hexdigest()
+
+
+def _write_json(path: str, content):
+    with open(path, 'w') as f:
+        json.dump(content, f, indent=2, default=str)
+
+
+def save_artifact(model, features: list, metrics: dict, model_dir: str = 'models',
+                  data_fingerprint: str = None, n_trees: int = None, extra: dict = None) -> str:
+    """ Writes a versioned model bundle and publishes it with an atomic directory rename.
+
+    models/xgb_model_<version>/
+        model.ubj      booster in xgboost's native UBJSON format (no pickle)
+        forest/        compiled NumPy forest for serving, one .npy per array (when the objective allows it)
+        features.json  feature order and dtype expected by the model
+        metadata.json  version, metrics, trees used, training data fingerprint...
+
+    Everything is written in a hidden temporary folder first, so a reader (e.g.
+    the registry watcher) sees either no bundle or a complete one.
+
+    Args:
+        model (XGBRegressor): trained model.
+        features (list): feature order.
+        metrics (dict): e.g. {'rmse': 123.4}.
+        model_dir (str): models folder.
+        data_fingerprint (str): hash of the training data (see dataset_fingerprint).
+        n_trees (int): trees used to predict (best iteration + 1 by default).
+        extra (dict): more metadata (e.g. training mode).
+
+    Returns:
+        str: path of the published bundle.
+    """
+    from src.components.early_stopping import best_n_trees
+
+    version = new_version()
+    final_path = os.path.join(model_dir, f'xgb_model_{version}')
+    tmp_path = os.path.join(model_dir, f'.tmp-{version}')
+    os.makedirs(tmp_path)
+    try:
+        booster = model.get_booster()
+        n_trees = n_trees or best_n_trees(model)
+        model.save_model(os.path.join(tmp_path, BOOSTER_FILE))
+        compiled = True
+        try:
+            compile_booster(booster, n_trees=n_trees).save(os.path.join(tmp_path, FOREST_FILE))
+        except Exception as e:
+            compiled = False
+            print(f"⚠️ Model could not be compiled for serving => {e}")
+
+        _write_json(os.path.join(tmp_path, FEATURES_FILE), {'features': list(features), 'dtype': 'float32'})
+        _write_json(os.path.join(tmp_path, METADATA_FILE), {
+            'format': ARTIFACT_FORMAT,
+            'version': version,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'n_trees': n_trees,
+            'compiled': compiled,
+            'metrics': metrics,
+            'data_fingerprint': data_fingerprint,
+            **(extra or {})})
+        os.rename(tmp_path, final_path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    return final_path
+
+
+def is_artifact(path: str) -> bool:
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, METADATA_FILE))
+
+
+def read_metadata(path: str) -> dict:
+    with open(os.path.join(path, METADATA_FILE)) as f:
+        return json.load(f)
+
+
+def read_features(path: str) -> list:
+    with open(os.path.join(path, FEATURES_FILE)) as f:
+        return json.load(f)['features']
+
+
+class BoosterModel:
+    """ Native xgboost Booster loaded from UBJSON, predicting with the first `n_trees` trees only. """
+
+    def __init__(self, booster, feature_names: list, n_trees: int):
+        self.booster = booster
+        self.feature_names = list(feature_names)
+        self.n_trees = int(n_trees)
+
+    def predict(self, X) -> np.ndarray:
+        if hasattr(X, 'columns'):
+            X = X[self.feature_names]
+        return self.booster.inplace_predict(X, iteration_range=(0, self.n_trees))
+
+
+def load_artifact(path: str, compiled: bool = True):
+    """ Loads a bundle without unpickling anything.
+
+    Args:
+        path (str): bundle folder.
+        compiled (bool): serve the compiled forest (NumPy only, memory-mapped) when the bundle has one.
+
+    Returns:
+        tuple: (model with a predict method, feature list, metadata dict)
+    """
+    metadata = read_metadata(path)
+    features = read_features(path)
+    forest_path = os.path.join(path, FOREST_FILE)
+    if compiled and os.path.exists(forest_path):
+        return CompiledForest.load(forest_path, mmap_mode='r'), features, metadata
+
+    # Lazy import: only paid when the compiled forest isn't served.
+    import xgboost
+    booster = xgboost.Booster()
+    booster.load_model(os.path.join(path, BOOSTER_FILE))
+    return BoosterModel(booster, features, metadata['n_trees']), features, metadata
+
+
+def load_trained_model(path: str):
+    """ XGBRegressor of a bundle (or of a legacy .pkl), e.g. to continue its training. """
+    if is_artifact(path):
+        from xgboost import XGBRegressor
+        model = XGBRegressor()
+        model.load_model(os.path.join(path, BOOSTER_FILE))
+        return model
+    import joblib
+    return joblib.load(path)
@@ -3,12 +3,15 @@ import pandas as pd
 import numpy as np
 import json
 from datetime import datetime
-from sklearn.model_selection import TimeSeriesSplit, RandomizedSearchCV
 from sklearn.metrics import root_mean_squared_error
-from xgboost import XGBRegressor
-import joblib  # For saving model
 
-from src.components.data_transformation import data_transformation
+from src.components.data_transformation import training_dataset
+from src.components.model_artifact import save_artifact, dataset_fingerprint
+from src.components.hyperparameter_search import tuning_config, tune_model
+from src.components.manifest import read_manifest, update_manifest
+from src.components.incremental_training import warm_start_config, warm_start_model
+from src.components.early_stopping import fit_with_early_stopping, best_n_trees
+from src.monitoring import timed_stage
 
 #Ignore warnings in order to have a cleaner output
 import warnings
@@ -17,6 +20,7 @@ warnings.filterwarnings('ignore')
 np.set_printoptions(suppress=True)
 
 
+@timed_stage('train_selected_model')
 def train_selected_model():
     """
     Trains and evaluates an XGBoost Regressor on the prepared dataset.
@@ -25,9 +29,10 @@ def train_selected_model():
 
     - Loading and transforming the raw data.
     - Splitting the data into training and test sets using a time-aware strategy.
-    - Training an XGBRegressor using TimeSeriesSplit cross-validation.
+    - Training an XGBRegressor with the histogram method and early stopping on the
+      last days of the training window (or a tuning search / a warm start when enabled).
     - Evaluating model performance on the test set.
-    - Saving the trained model for future use.
+    - Saving the trained model for future use (versioned bundle, see model_artifact).
     - Logging the RMSE every time the script is executed.
 
     Raises:
@@ -35,83 +40,68 @@ def train_selected_model():
     """
 
     try:
-        #Load transform raw data and return the data as csv file:
-        data_transformation()
-        
-        #Load transformed Dataset:
-        data = pd.read_csv('data/processed/data.csv', sep=',')
+        #Load and transform raw data: the typed dataset (datetime index, float32 columns)
+        #is handed over in memory, no CSV round-trip:
+        data = training_dataset()
         
         #Train-Test Split:
-        data['date'] = pd.to_datetime(data['date'])
-        
         #Always keep the last 90 days as Test Set:
-        cutoff_date = data['date'].max() - pd.Timedelta(days=90)
+        cutoff_date = data.index.max() - pd.Timedelta(days=90)
 
-        X_train = data[data['date'] < cutoff_date]
+        X_train = data[data.index < cutoff_date]
         y_train = X_train['stress_score']
         X_train = X_train.drop(columns=['stress_score'])
 
-        X_test = data[data['date'] >= cutoff_date]
+        X_test = data[data.index >= cutoff_date]
         y_test = X_test['stress_score']
         X_test = X_test.drop(columns=['stress_score'])
         
-        # Drop the date becuase it's not necessary:
-        #So we can safety drop it:
-        X_train = X_train.drop(columns='date')
-        X_test = X_test.drop(columns='date')
-        
-        # Use a rolling windows strategy as cross-validation
-        tscv = TimeSeriesSplit()
-        
-        # Since cv it's not a param of XGBRegressor I need to wrapped into RandomSearch first
-        xgb = XGBRegressor(objective='reg:squarederror', random_state=42)
-        
-        # At the beginning, we use an empty dict in order to use the default params from XGBRegressor
-        # In nearly future, we can use this dict to tuning model.
-        # HINT: You can play with the param_grid of models_trained.ipynb here.
-        param_grid = {}
-        
-        xgbs = RandomizedSearchCV(
-            xgb,
-            param_distributions=param_grid,
-            n_iter=1, # 1 because it's only the default XGBRegressor. If you modify param_grid then modify n_iter too. 
-            scoring='neg_root_mean_squared_error',
-            cv=tscv,
-            n_jobs=-1,
-            random_state=42
-        )
-        
-        # Train different XGBRegressors (Only one (the default) in this case)
-        xgbs.fit(X_train, y_train)
-        
-        # Keep the best of them
-        bestXGB = xgbs.best_estimator_
+        bestXGB, warm = None, None
+        if warm_start_config()['warm_start']:
+            # Incremental retrain: the latest model continues on the new days, guarded by the holdout RMSE.
+            bestXGB, warm = warm_start_model(X_train, y_train, X_test, y_test, read_manifest().get('model'))
+            if bestXGB is None:
+                print(f"⚠️ Warm start not used ({warm}). Training from scratch...")
+                warm = None
+            else:
+                print(f"♻️ Latest model updated with {warm['new_days']} new days ({warm['mode']}, warm start #{warm['warm_starts']})")
+        
+        tuning = tuning_config()['tuning'] and warm is None
+        if tuning:
+            # Successive halving search over DATA_SOURCES['model_trainer']['param_grid']
+            bestXGB, _ = tune_model(X_train, y_train)
+        elif warm is None:
+            # Histogram method and early stopping on the last days of the training window
+            bestXGB = fit_with_early_stopping(X_train, y_train)
         
         # Use it to predict on Test-set data:
         preds = bestXGB.predict(X_test)
         
         rmse = np.round(root_mean_squared_error(y_test,preds), 2)
+        n_trees = best_n_trees(bestXGB)
         
         # Check the RMSE of the model:
-        print(f'🗒️ RMSE of XGB Regressor (Default): {rmse}')
+        print(f"🗒️ RMSE of XGB Regressor ({'Warm start' if warm else 'Tuned' if tuning else 'Default'}): {rmse} ({n_trees} trees)")
         
-        # Save model
-        os.makedirs("models", exist_ok=True)
-        model_filename = f"models/xgb_model_{datetime.today().strftime('%Y%m%d')}.pkl"
-        joblib.dump(bestXGB, model_filename)
+        # Save model: versioned bundle (UBJSON booster, compiled forest, feature schema, metadata)
+        # published with an atomic rename. No pickle, and two runs on the same day never collide.
+        feature_order = list(X_train.columns)
+        model_filename = save_artifact(bestXGB, feature_order,
+                                       metrics={'rmse': float(rmse)},
+                                       model_dir="models",
+                                       data_fingerprint=dataset_fingerprint(data),
+                                       n_trees=n_trees,
+                                       extra={'training': 'warm_start' if warm else 'tuned' if tuning else 'default',
+                                              'train_end': X_train.index.max().date().isoformat()})
         print(f"✅ Model saved to {model_filename}")
         
-        # Save the feature order
-        feature_order = list(X_train.columns)
-
-        # Save it only if it doesn't already exist
+        # The bundle has its own feature schema; model_features.json is kept for older readers
+        # and always rewritten, so it never describes the features of an older model.
         feature_order_file = "models/model_features.json"
-        if not os.path.exists(feature_order_file):
-            with open(feature_order_file, "w") as f:
-                json.dump(feature_order, f)
-            print(f"✅ Feature order saved to {feature_order_file}")
-        else:
-            print(f"⚠️ Feature order file already exists. Skipping overwrite.")
+        with open(f"{feature_order_file}.tmp", "w") as f:
+            json.dump(feature_order, f)
+        os.replace(f"{feature_order_file}.tmp", feature_order_file)
+        print(f"✅ Feature order saved to {feature_order_file}")
 
         # Log metrics
         os.makedirs("logs", exist_ok=True)
@@ -127,6 +117,16 @@ def train_selected_model():
             f.write(f"{datetime.today().strftime('%Y-%m-%d')},XGBRegressor,{rmse},{model_filename}\n")
         print(f"📝 Metrics logged to {log_path}")
         
+        # Last model in the manifest: the retrain check reads it instead of the logs and models/
+        update_manifest('model', {'path': model_filename,
+                                  'date': datetime.today().date(),
+                                  'rmse': float(rmse),
+                                  # Warm starts continue from the day after train_end
+                                  'train_end': X_train.index.max().date(),
+                                  'warm_starts': warm['warm_starts'] if warm else 0,
+                                  'n_trees': n_trees,
+                                  'trained_at': datetime.now().replace(microsecond=0)})
+        
         return bestXGB
         
     except Exception as e:
@@ -0,0 +1,270 @@
+"""
+In-process metrics exposed in the Prometheus text exposition format.
+
+No client library or external service is needed: counters, gauges and
+histograms live in memory and `MetricsRegistry.render` writes them in the
+format a Prometheus server (or a plain curl) scrapes from /metrics.
+
+Each gunicorn worker keeps its own values (a scrape is answered by one
+worker), so add `instance`/`pod` labels on the Prometheus side and aggregate
+with sum()/rate() across workers, as for any pre-fork server.
+
+Training runs in another process: its stage timings are kept in the separate
+`training_metrics` registry and written to a text file at the end of the run
+(node_exporter "textfile collector" style), which /metrics appends.
+"""
+import os
+import time
+import math
+import threading
+from contextlib import contextmanager
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds: from a cached prediction (sub-millisecond) to a full training stage.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+TRAINING_METRICS_PATH = os.getenv('TRAINING_METRICS_PATH', 'logs/training_metrics.prom')
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _labels(names: tuple, values: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    """ Base of the metric types: a name, a help text and one value per label set. """
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects the labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def _samples(self) -> list:
+        with self._lock:
+            return [(key, value) for key, value in self._values.items()]
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {_escape(self.documentation)}', f'# TYPE {self.name} {self.kind}']
+        for key, value in sorted(self._samples()):
+            lines.append(f'{self.name}{_labels(self.labelnames, key)} {_format_value(value)}')
+        return lines
+
+
+class Counter(_Metric):
+    """ Monotonic count (requests, errors, model loads...). """
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """ Value which goes up and down (requests in flight, resident model...). """
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """ Distribution of observations in cumulative buckets, plus their sum and count. """
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            # Last slot = +Inf bucket. Counts are per bucket here and made cumulative on render.
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """ Observes the seconds spent in the `with` block (also when it raises). """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        counts, _ = self._values.get(self._key(labels), ([0], 0.0))
+        return sum(counts)
+
+    def _samples(self) -> list:
+        with self._lock:
+            return [(key, (list(counts), total)) for key, (counts, total) in self._values.items()]
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {_escape(self.documentation)}', f'# TYPE {self.name} {self.kind}']
+        for key, (counts, total) in sorted(self._samples()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """ Set of metrics rendered together. """
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f'Metric {metric.name} is already registered')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (),
+                  buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """ Every metric in the text exposition format. """
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path: str):
+        """ Writes the rendered metrics to a file atomically (readers never see half a file). """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+# --- Serving (Flask app) ---
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter('stress_http_requests_total', 'HTTP requests answered.',
+                                ('route', 'method', 'status'))
+http_errors = metrics.counter('stress_http_errors_total', 'HTTP requests answered with an error status.',
+                              ('route', 'status_class'))
+http_in_flight = metrics.gauge('stress_http_requests_in_flight', 'HTTP requests being served.')
+http_latency = metrics.histogram('stress_http_request_seconds', 'Latency of the HTTP requests.', ('route',))
+# parse => JSON body, validate => schema/feature assembly, model_lookup => registry snapshot,
+# predict => cache, micro-batcher queue and model call.
+stage_latency = metrics.histogram('stress_request_stage_seconds', 'Latency of each stage of a prediction request.',
+                                  ('route', 'stage'))
+model_predict_latency = metrics.histogram('stress_model_predict_seconds', 'Time spent in model.predict.')
+model_predict_rows = metrics.counter('stress_model_predict_rows_total', 'Rows scored by model.predict.')
+model_info = metrics.gauge('stress_model_info', 'Model currently served (always 1, see the version label).',
+                           ('version',))
+model_load_seconds = metrics.gauge('stress_model_load_seconds', 'Seconds taken to load the resident model.')
+model_loaded_timestamp = metrics.gauge('stress_model_loaded_timestamp_seconds',
+                                       'Unix time at which the resident model was loaded.')
+model_loads = metrics.counter('stress_model_loads_total', 'Models loaded (first load and hot swaps).')
+tenant_lookups = metrics.counter('stress_tenant_model_lookups_total',
+                                 'Per-tenant model lookups (hit, miss or coalesced into a load in flight).', ('result',))
+tenant_loads = metrics.counter('stress_tenant_model_loads_total', 'Per-tenant models loaded.')
+tenant_load_latency = metrics.histogram('stress_tenant_model_load_seconds', 'Time taken to load a tenant model.')
+tenant_evictions = metrics.counter('stress_tenant_model_evictions_total', 'Tenant models evicted by the LRU.')
+tenant_resident = metrics.gauge('stress_tenant_models_resident', 'Tenant models resident in memory.')
+tenant_resident_bytes = metrics.gauge('stress_tenant_models_resident_bytes',
+                                      'Estimated memory of the resident tenant models.')
+
+# --- Training (train_pipeline process) ---
+training_metrics = MetricsRegistry()
+
+training_stage_latency = training_metrics.histogram('stress_training_stage_seconds',
+                                                    'Duration of each training pipeline stage.',
+                                                    ('stage',), STAGE_BUCKETS)
+training_stage_last = training_metrics.gauge('stress_training_stage_last_seconds',
+                                             'Duration of the last run of each training stage.', ('stage',))
+training_last_run = training_metrics.gauge('stress_training_last_run_timestamp_seconds',
+                                           'Unix time at which the last training run finished.')
+
+
+@contextmanager
+def timed_stage(stage: str):
+    """ Times a training stage; usable as a `with` block or as a function decorator.
+
+    Args:
+        stage (str): stage name, e.g. 'load_data' or 'train_selected_model'.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        training_stage_latency.observe(seconds, stage=stage)
+        training_stage_last.set(seconds, stage=stage)
+        print(f'⏱️ {stage} took {seconds:.2f}s')
+
+
+def save_training_metrics(path: str = TRAINING_METRICS_PATH):
+    """ Publishes the stage timings of this training run for the /metrics endpoint. """
+    training_last_run.set(time.time())
+    training_metrics.write_textfile(path)
+
+
+def render_metrics(training_path: str = TRAINING_METRICS_PATH) -> str:
+    """ Serving metrics followed by the ones of the last training run (if any). """
+    text = metrics.render()
+    if training_path and os.path.exists(training_path):
+        with open(training_path) as f:
+            text += f.read()
+    return text
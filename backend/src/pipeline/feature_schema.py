@@ -0,0 +1,144 @@
+import json
+import math
+from operator import itemgetter
+import numpy as np
+
+from src.components.config import SERVING
+
+
+class FeatureValidationError(ValueError):
+    """ Raised when a payload can't be turned into a feature row.
+
+    Attributes:
+        errors (dict): feature name => reason why its value was rejected.
+    """
+    def __init__(self, errors: dict):
+        self.errors = errors
+        super().__init__(f'Invalid values for: {", ".join(errors)}')
+
+
+class FeatureSchema:
+    """ Feature order of a trained model compiled into a fast validator.
+
+    The order comes from `model_features.json` and is resolved once, so the
+    request path only has to pick the values out of the payload and write them
+    into a contiguous NumPy row (no pandas involved).
+    """
+
+    def __init__(self, features: list, dtype: str = SERVING['feature_dtype']):
+        if not features:
+            raise ValueError('The feature schema needs at least one feature')
+        self.features = tuple(features)
+        self.dtype = np.dtype(dtype)
+        # itemgetter with several keys always returns a tuple in the schema order.
+        self._getter = itemgetter(*self.features) if len(self.features) > 1 else (lambda d: (d[self.features[0]],))
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> 'FeatureSchema':
+        with open(path) as f:
+            return cls(json.load(f), **kwargs)
+
+    def __len__(self):
+        return len(self.features)
+
+    def _field_errors(self, payload: dict) -> dict:
+        """ Slow path: explains, field by field, why the payload was rejected. """
+        errors = {}
+        for name in self.features:
+            if name not in payload or payload[name] is None or payload[name] == '':
+                errors[name] = 'This field is required'
+                continue
+            value = payload[name]
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                errors[name] = f'Expected a number but got {value!r}'
+                continue
+            with np.errstate(over='ignore'):
+                # The value also has to fit in the dtype of the row (e.g. float32).
+                finite = math.isfinite(number) and np.isfinite(self.dtype.type(number))
+            if not finite:
+                errors[name] = f'Expected a finite number but got {value!r}'
+        return errors
+
+    def to_row(self, payload: dict) -> np.ndarray:
+        """ Converts one JSON payload into a (1, n_features) row in the schema order.
+
+        Args:
+            payload (dict): feature name => value (numbers or numeric strings,
+                            the frontend sends the form values as strings).
+
+        Returns:
+            np.ndarray: C-contiguous row with `self.dtype` values.
+
+        Raises:
+            FeatureValidationError: If any feature is missing or isn't a finite number.
+        """
+        if not isinstance(payload, dict):
+            raise FeatureValidationError({'payload': 'Expected a JSON object'})
+        try:
+            # Fast path: one C-level lookup of every key plus one conversion.
+            with np.errstate(over='ignore'):
+                row = np.array([self._getter(payload)], dtype=self.dtype)
+            if np.isfinite(row).all():
+                return row
+        except (KeyError, TypeError, ValueError):
+            pass
+        raise FeatureValidationError(self._field_errors(payload) or {'payload': 'Invalid values'})
+
+    def _records_from_columns(self, payload: dict) -> list:
+        """ Columnar payload ({feature: [values]}) => list of records. """
+        lengths = {len(values) for values in payload.values() if isinstance(values, list)}
+        if len(lengths) != 1 or not all(isinstance(v, list) for v in payload.values()):
+            raise FeatureValidationError({'payload': 'Every column must be a list with the same length'})
+        n_rows = lengths.pop()
+        return [{name: values[i] for name, values in payload.items()} for i in range(n_rows)]
+
+    def to_matrix(self, payload) -> tuple:
+        """ Converts a batch of payloads into one (n_rows, n_features) matrix in the schema order.
+
+        Args:
+            payload (list | dict): list of records ([{feature: value}, ...]) or a
+                                   columnar payload ({feature: [value, ...]}).
+
+        Returns:
+            tuple: (matrix with the valid rows, positions of those rows in the
+                    batch, {row position: {feature: reason}} for the rejected rows)
+
+        Raises:
+            FeatureValidationError: If the payload isn't a list of records or a columnar dict.
+        """
+        if isinstance(payload, dict):
+            # Fast path for columnar payloads: one conversion per column.
+            try:
+                with np.errstate(over='ignore'):
+                    matrix = np.ascontiguousarray(
+                        np.array([payload[name] for name in self.features], dtype=self.dtype).T)
+                if matrix.ndim == 2 and np.isfinite(matrix).all():
+                    return matrix, np.arange(len(matrix)), {}
+            except (KeyError, TypeError, ValueError):
+                pass
+            payload = self._records_from_columns(payload)
+
+        if not isinstance(payload, list):
+            raise FeatureValidationError({'payload': 'Expected a list of records or a columnar object'})
+
+        # Fast path for records: every row is valid.
+        try:
+            with np.errstate(over='ignore'):
+                matrix = np.array([self._getter(record) for record in payload], dtype=self.dtype)
+            if matrix.ndim == 2 and np.isfinite(matrix).all():
+                return matrix, np.arange(len(matrix)), {}
+        except (KeyError, TypeError, ValueError):
+            pass
+
+        # Slow path: validate row by row to report which rows (and fields) are wrong.
+        rows, valid, errors = [], [], {}
+        for position, record in enumerate(payload):
+            try:
+                rows.append(self.to_row(record)[0])
+                valid.append(position)
+            except FeatureValidationError as e:
+                errors[position] = e.errors
+        matrix = np.array(rows, dtype=self.dtype).reshape(len(rows), len(self.features))
+        return matrix, np.array(valid, dtype=np.int64), errors
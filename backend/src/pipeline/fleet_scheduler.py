@@ -0,0 +1,270 @@
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import subprocess
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, asdict
+
+from src.components.hyperparameter_search import plan_threads
+from src.components.manifest import MANIFEST_PATH, read_manifest
+from src.pipeline.train_pipeline import retrain_reason
+from src.pipeline.tenant_registry import TENANT_ROOT
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(CURRENT_DIR, '..', '..'))
+
+# Threads of the numeric libraries of a training process (XGBoost uses OpenMP).
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'TRAIN_CPU_THREADS')
+
+
+@dataclass
+class FleetJob:
+    """ Training of one user folder and how it went. """
+    user: str
+    root: str
+    reason: str
+    # Date of the model being replaced (None without model): the most outdated are trained first.
+    model_date: str = None
+    status: str = 'queued'
+    attempts: int = 0
+    seconds: float = 0.0
+    errors: list = field(default_factory=list)
+
+
+@contextmanager
+def _inside(folder: str):
+    """ The pipeline reads relative paths (data/, models/, logs/): evaluate a user folder from inside it. """
+    previous = os.getcwd()
+    os.chdir(folder)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def discover_users(roots: list) -> list:
+    """ User folders of the given roots: every sub folder with a data/ folder (sorted by name).
+
+    Returns:
+        list: [(user id, absolute folder path), ...]
+    """
+    users = []
+    for root in roots:
+        if not os.path.isdir(root):
+            continue
+        for name in sorted(os.listdir(root)):
+            folder = os.path.abspath(os.path.join(root, name))
+            if os.path.isdir(os.path.join(folder, 'data')):
+                users.append((name, folder))
+    return users
+
+
+def stale_jobs(users: list, force: bool = False) -> list:
+    """ Applies the retrain rule of train_pipeline to every user folder.
+
+    Only stat calls and the small manifest are read per user (the legacy
+    fallback without manifest reads the dataset dates and the metrics log).
+    A folder whose state can't be read is retrained.
+
+    Args:
+        users (list): [(user id, folder), ...] as returned by discover_users.
+        force (bool): queue every user whatever the dates say.
+
+    Returns:
+        list: FleetJob of the users to retrain, the most outdated model first.
+    """
+    jobs = []
+    for user, folder in users:
+        # Sequential on purpose: the current directory is process-wide.
+        with _inside(folder):
+            try:
+                reason = retrain_reason(MANIFEST_PATH, 'models')
+            except Exception as e:
+                reason = f'unreadable state ({e})'
+            model_date = read_manifest(MANIFEST_PATH).get('model', {}).get('date')
+        if reason is None and force:
+            reason = 'forced'
+        if reason is not None:
+            jobs.append(FleetJob(user, folder, reason, model_date))
+    # No model first, then the oldest models.
+    jobs.sort(key=lambda job: (job.model_date is not None, job.model_date or ''))
+    return jobs
+
+
+def training_command(reason: str = None) -> list:
+    """ Training of the current folder: the usual pipeline, with its models/ folder inside the user folder.
+
+    train_pipeline applies its own rule to the 'no model' and 'fresh data' jobs
+    (--force_retrain on top of it would train them twice); only the jobs which
+    the rule wouldn't train on its own are forced.
+
+    Args:
+        reason (str): why the job was queued (see stale_jobs).
+    """
+    command = [sys.executable, '-m', 'src.pipeline.train_pipeline', '--models_dir', 'models']
+    if reason is not None and reason.startswith(('forced', 'unreadable state')):
+        command.append('--force_retrain')
+    return command
+
+
+class FleetScheduler:
+    """ Trains many user folders concurrently within a CPU thread budget.
+
+    Every job is a separate training process (started in the user folder),
+    at most `processes` at a time. The thread budget is split between them:
+    each process gets `max_threads // processes` threads for XGBoost/OpenMP
+    (and for the tuning search, see plan_threads), so processes x threads
+    never oversubscribes the cores.
+
+    A job is killed (with its child processes) after `timeout` seconds and
+    retried up to `retries` times. With a `deadline` (maintenance window),
+    jobs are not started once it has passed and a running job never gets
+    more time than what is left of the window.
+    """
+
+    def __init__(self, processes: int = None, max_threads: int = None, timeout: float = 3600,
+                 retries: int = 1, retry_delay: float = 5, deadline: float = None,
+                 command: list = None, log_file: str = 'logs/fleet_train.log'):
+        """
+        Args:
+            processes (int): trainings running at the same time (as many as the thread budget allows by default).
+            max_threads (int): total CPU threads of all the trainings (os.cpu_count() by default).
+            timeout (float): seconds a training may run (0 = no limit).
+            retries (int): extra attempts of a failed or timed out training.
+            retry_delay (float): seconds before a retry (x the attempt number).
+            deadline (float): time.time() at which the maintenance window closes.
+            command (list): training command run in the user folder (training_command() of the job by default).
+            log_file (str): output of the trainings, relative to the user folder.
+        """
+        self.max_threads = max_threads or os.cpu_count() or 1
+        self.processes = processes or self.max_threads
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.deadline = deadline
+        self.command = command
+        self.log_file = log_file
+
+    def _env(self, threads: int) -> dict:
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [BACKEND_DIR, os.getenv('PYTHONPATH')])))
+        env.update({name: str(threads) for name in THREAD_ENV_VARS})
+        return env
+
+    def _time_left(self):
+        return None if self.deadline is None else self.deadline - time.time()
+
+    def _attempt(self, job: FleetJob, threads: int) -> str:
+        """ Runs the training once. Returns None on success, or the error. """
+        timeout = self.timeout or None
+        left = self._time_left()
+        if left is not None:
+            if left <= 0:
+                return 'maintenance window over'
+            timeout = min(timeout, left) if timeout else left
+
+        log_path = os.path.join(job.root, self.log_file)
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        with open(log_path, 'a') as log:
+            log.write(f'\n===== {time.strftime("%Y-%m-%d %H:%M:%S")} attempt {job.attempts} ({job.reason}) =====\n')
+            log.flush()
+            # Own process group: a timeout also kills the workers of the training (e.g. the tuning search).
+            process = subprocess.Popen(self.command or training_command(job.reason), cwd=job.root, env=self._env(threads),
+                                       stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+            try:
+                code = process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+                process.wait()
+                return f'timed out after {timeout:.0f}s'
+        return None if code == 0 else f'exit code {code} (see {log_path})'
+
+    def _run(self, job: FleetJob, threads: int) -> FleetJob:
+        start = time.perf_counter()
+        for attempt in range(1, self.retries + 2):
+            job.attempts = attempt
+            error = self._attempt(job, threads)
+            if error is None:
+                job.status = 'trained'
+                break
+            job.errors.append(error)
+            if error == 'maintenance window over':
+                job.status = 'skipped'
+                break
+            job.status = 'failed'
+            if attempt <= self.retries:
+                time.sleep(self.retry_delay * attempt)
+        job.seconds = round(time.perf_counter() - start, 3)
+        return job
+
+    def run(self, jobs: list) -> dict:
+        """ Trains the queued jobs and reports the progress as they finish.
+
+        Returns:
+            dict: counts per status, the process/thread plan, elapsed seconds and every job.
+        """
+        processes, threads = plan_threads(self.processes, len(jobs) or None, self.max_threads)
+        print(f"🗂️ {len(jobs)} models to train: {processes} processes x {threads} threads")
+        start = time.perf_counter()
+        done = 0
+        with ThreadPoolExecutor(max_workers=processes, thread_name_prefix='fleet') as pool:
+            futures = [pool.submit(self._run, job, threads) for job in jobs]
+            for future in as_completed(futures):
+                job = future.result()
+                done += 1
+                icon = {'trained': '✅', 'skipped': '⏭️'}.get(job.status, '❌')
+                detail = f' => {job.errors[-1]}' if job.status != 'trained' else ''
+                print(f'{icon} [{done}/{len(jobs)}] {job.user} {job.status} in {job.seconds:.1f}s '
+                      f'({job.reason}, {job.attempts} attempt(s)){detail}')
+
+        summary = {status: sum(job.status == status for job in jobs) for status in ('trained', 'failed', 'skipped')}
+        return {**summary, 'processes': processes, 'threads_per_process': threads,
+                'elapsed_s': round(time.perf_counter() - start, 3), 'jobs': [asdict(job) for job in jobs]}
+
+
+def fleet_training(roots: list = None, force: bool = False, **scheduler_args) -> dict:
+    """ Finds the stale user models of the roots and retrains them (see FleetScheduler).
+
+    Args:
+        roots (list): folders holding one folder per user (TENANT_ROOT by default).
+        force (bool): retrain every user.
+        scheduler_args: FleetScheduler settings.
+
+    Raises:
+        RuntimeError: If the fleet couldn't be scanned or scheduled.
+    """
+    try:
+        users = discover_users(roots or [TENANT_ROOT])
+        jobs = stale_jobs(users, force)
+        print(f"🔎 {len(users)} users found, {len(jobs)} need a retrain.")
+        return FleetScheduler(**scheduler_args).run(jobs)
+    except Exception as e:
+        raise RuntimeError(f'Error happened when was scheduling the fleet training => {e}') from e
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('roots', nargs='*', default=[TENANT_ROOT], help='Folders holding one folder per user')
+    parser.add_argument('--force_retrain', action='store_true', help='Retrain every user whatever the dates say')
+    parser.add_argument('--processes', type=int, default=None, help='Trainings at the same time')
+    parser.add_argument('--max_threads', type=int, default=None, help='CPU threads of all the trainings together')
+    parser.add_argument('--timeout', type=float, default=3600, help='Seconds per training (0 = no limit)')
+    parser.add_argument('--retries', type=int, default=1)
+    parser.add_argument('--window_minutes', type=float, default=None, help='Length of the maintenance window')
+    parser.add_argument('--report', default=None, help='Where the JSON report is saved')
+    args = parser.parse_args()
+
+    deadline = time.time() + 60 * args.window_minutes if args.window_minutes else None
+    report = fleet_training(args.roots, args.force_retrain, processes=args.processes, max_threads=args.max_threads,
+                            timeout=args.timeout, retries=args.retries, deadline=deadline)
+    print(f"📊 {report['trained']} trained, {report['failed']} failed, {report['skipped']} skipped "
+          f"in {report['elapsed_s']:.1f}s")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if report['failed'] else 0)
+    
+    # On bash => from backend/ => PYTHONPATH=. python -m src.pipeline.fleet_scheduler tenants --max_threads 16 --window_minutes 240
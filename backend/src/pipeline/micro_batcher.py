@@ -0,0 +1,141 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+import numpy as np
+
+from src.components.config import SERVING
+
+
+class QueueFullError(RuntimeError):
+    """ Raised when the batching queue is full and the request must be rejected (backpressure). """
+
+
+class MicroBatcher:
+    """ Coalesces concurrent single-row predictions into one model call.
+
+    Every request puts its row in a bounded queue and waits. A worker thread
+    takes the first waiting row, keeps collecting rows for `window_ms` (or
+    until `max_rows` are collected), stacks them into one matrix, scores them
+    with a single call and hands every request its own prediction back.
+    """
+
+    def __init__(self, predict_fn, window_ms: float = SERVING['batch_window_ms'],
+                 max_rows: int = SERVING['batch_max_rows'],
+                 max_queue: int = SERVING['batch_queue_size']):
+        """
+        Args:
+            predict_fn: function(matrix, loaded=snapshot) => predictions (e.g. predict_input).
+            window_ms (float): how long the first row of a batch waits for company.
+            max_rows (int): the batch is scored as soon as it has this many rows.
+            max_queue (int): rows allowed to wait; beyond that `submit` raises QueueFullError.
+        """
+        self.predict_fn = predict_fn
+        self.window = window_ms / 1000
+        self.max_rows = max_rows
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._worker = None
+        self._pid = None
+        # Metrics
+        self._batch_sizes = {}
+        self._batches = 0
+        self._rows = 0
+        self._rejected = 0
+        self._delay_sum = 0.0
+        self._delay_max = 0.0
+
+    def _ensure_worker(self):
+        # Threads don't survive a fork, so a pre-forked worker process starts its own.
+        if self._worker is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                self._worker.start()
+
+    def submit(self, row: np.ndarray, loaded=None, timeout: float = None) -> np.ndarray:
+        """ Queues one (1, n_features) row and waits for its prediction.
+
+        Args:
+            row (np.ndarray): validated feature row.
+            loaded (LoadedModel): snapshot whose schema validated the row. Rows of
+                                  different snapshots are never scored together.
+            timeout (float): seconds to wait for the prediction.
+
+        Returns:
+            np.ndarray: (1,) array with the prediction of the row.
+
+        Raises:
+            QueueFullError: If the queue is full.
+        """
+        self._ensure_worker()
+        future = Future()
+        try:
+            self._queue.put_nowait((row, loaded, time.perf_counter(), future))
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise QueueFullError('⏳ The server is busy, too many predictions are waiting') from None
+        return future.result(timeout=timeout)
+
+    def _collect(self) -> list:
+        first = self._queue.get()
+        batch = [first]
+        deadline = first[2] + self.window
+        while len(batch) < self.max_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _score(self, batch: list):
+        started = time.perf_counter()
+        # Group by model snapshot: a hot swap in the middle of a window splits the batch.
+        groups = {}
+        for item in batch:
+            groups.setdefault(id(item[1]), []).append(item)
+
+        for items in groups.values():
+            try:
+                matrix = np.vstack([item[0] for item in items])
+                preds = np.asarray(self.predict_fn(matrix, loaded=items[0][1]))
+                for i, item in enumerate(items):
+                    item[3].set_result(preds[i:i + 1])
+            except Exception as e:
+                for item in items:
+                    item[3].set_exception(e)
+
+        with self._lock:
+            size = len(batch)
+            self._batches += 1
+            self._rows += size
+            # Power of two buckets: 1, 2, 4, 8, ...
+            bucket = 1 << (size - 1).bit_length()
+            self._batch_sizes[bucket] = self._batch_sizes.get(bucket, 0) + 1
+            for item in batch:
+                delay = started - item[2]
+                self._delay_sum += delay
+                self._delay_max = max(self._delay_max, delay)
+
+    def _run(self):
+        while True:
+            self._score(self._collect())
+
+    def stats(self) -> dict:
+        """ Batch size distribution and queueing delay since the process started. """
+        with self._lock:
+            return {'Batches': self._batches,
+                    'Rows': self._rows,
+                    'Rejected': self._rejected,
+                    'Queued': self._queue.qsize(),
+                    'Batch_size_buckets': {f'<={k}': v for k, v in sorted(self._batch_sizes.items())},
+                    'Mean_batch_size': round(self._rows / self._batches, 2) if self._batches else 0,
+                    'Mean_queue_delay_ms': round(1000 * self._delay_sum / self._rows, 3) if self._rows else 0,
+                    'Max_queue_delay_ms': round(1000 * self._delay_max, 3)}
@@ -0,0 +1,200 @@
+import os
+import glob
+import time
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+
+from src.components.config import SERVING
+from src.components.compiled_forest import CompiledForest
+from src.components.model_artifact import is_artifact, load_artifact
+from src.pipeline.feature_schema import FeatureSchema
+from src import monitoring
+
+CURRENT_PATH = os.path.dirname(os.path.abspath(__file__))
+# Models dir it's at the same level of backend so I need to move backward two times
+# (MODEL_DIR overrides it, e.g. for benchmarks or a mounted volume):
+MODEL_PATH = os.getenv('MODEL_DIR', os.path.join(CURRENT_PATH, '..', '..', 'models'))
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """ Immutable snapshot of the model that is currently serving requests.
+    A hot swap replaces the whole snapshot at once, so a request never sees
+    the model of one version mixed with the metadata of another.
+    """
+    model: object
+    version: str
+    path: str
+    mtime: float
+    loaded_at: datetime
+    load_seconds: float
+    # Feature order the model was trained with (None if model_features.json is missing).
+    schema: FeatureSchema = None
+    # metadata.json of a model bundle (empty for legacy .pkl models).
+    metadata: dict = None
+
+
+class ModelRegistry:
+    """ Keeps the newest model resident in memory.
+
+    Models are versioned bundles (`xgb_model_<version>/`, see model_artifact)
+    or legacy `xgb_model_*.pkl` files. A bundle is loaded without unpickling:
+    its compiled forest is evaluated with NumPy only (xgboost and sklearn are
+    never imported by the workers), or its UBJSON booster is loaded by xgboost.
+    For a legacy pickle the compiled forest next to it (`xgb_model_*.npz`) is
+    preferred as well.
+
+    The model is loaded once (on the first request or when `refresh` is called)
+    and reused by every prediction. A background watcher can poll the models
+    directory and swap in a newer model without blocking the requests that are
+    being served with the previous one.
+    """
+
+    def __init__(self, model_dir: str = MODEL_PATH, pattern: str = 'xgb_model_*',
+                 poll_interval: float = SERVING['model_poll_interval'],
+                 features_file: str = 'model_features.json',
+                 compiled: bool = SERVING['compiled_inference'], report_metrics: bool = True):
+        self.model_dir = model_dir
+        # Only the global registry reports its model on /metrics (not the per-tenant ones).
+        self.report_metrics = report_metrics
+        self.compiled = compiled
+        self.pattern = pattern
+        self.features_file = features_file
+        self.poll_interval = poll_interval
+        self._current = None
+        # The lock only serializes loads, readers never wait for it.
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def _latest_path(self):
+        model_paths = [path for path in glob.glob(os.path.join(str(self.model_dir), self.pattern))
+                       if path.endswith('.pkl') or is_artifact(path)]
+        # xgb_model_YYYYMMDD.pkl / xgb_model_YYYYMMDDTHHMMSS_<hex> => descending order gives the most updated model first
+        model_paths.sort(reverse=True)
+        return model_paths[0] if model_paths else None
+
+    def _load(self, path: str) -> tuple:
+        """ (model, schema, metadata) of a bundle or of a legacy pickle. """
+        if is_artifact(path):
+            model, features, metadata = load_artifact(path, compiled=self.compiled)
+            return model, FeatureSchema(features, SERVING['feature_dtype']), metadata
+        # The feature order is loaded together with the model, so both are swapped as a pair.
+        return self._load_model(path), self._load_schema(), {}
+
+    def _load_model(self, path: str):
+        compiled_path = os.path.splitext(path)[0] + '.npz'
+        if self.compiled and os.path.exists(compiled_path):
+            return CompiledForest.load(compiled_path)
+        # Lazy import: unpickling the XGBRegressor drags in xgboost and sklearn,
+        # which is only paid when there is no compiled forest to serve.
+        import joblib
+        return joblib.load(path)
+
+    def _load_schema(self):
+        features_path = os.path.join(str(self.model_dir), self.features_file)
+        if not os.path.exists(features_path):
+            return None
+        return FeatureSchema.from_file(features_path)
+
+    @staticmethod
+    def _version_from_path(path: str) -> str:
+        name = os.path.splitext(os.path.basename(path))[0]
+        return name.replace('xgb_model_', '', 1)
+
+    def refresh(self, force: bool = False) -> bool:
+        """ Scans the models directory and loads the newest model if it's not resident yet.
+
+        Args:
+            force (bool): Reload the newest model even if it's already resident.
+
+        Returns:
+            bool: True if a new model was swapped in.
+
+        Raises:
+            FileNotFoundError: If there is no model at all to serve.
+        """
+        with self._lock:
+            path = self._latest_path()
+            current = self._current
+
+            if path is None:
+                if current is None:
+                    raise FileNotFoundError('👎 No model have been found to predict the request.')
+                # Keep serving the resident model if the directory was emptied.
+                return False
+
+            mtime = os.path.getmtime(path)
+            if not force and current is not None and current.path == path and current.mtime == mtime:
+                return False
+
+            start = time.perf_counter()
+            model, schema, metadata = self._load(path)
+            load_seconds = time.perf_counter() - start
+
+            # Single reference assignment => the swap is atomic for the readers.
+            self._current = LoadedModel(model=model,
+                                        version=metadata.get('version') or self._version_from_path(path),
+                                        path=path,
+                                        mtime=mtime,
+                                        loaded_at=datetime.now(),
+                                        load_seconds=load_seconds,
+                                        schema=schema,
+                                        metadata=metadata)
+            if self.report_metrics:
+                monitoring.model_loads.inc()
+                monitoring.model_load_seconds.set(load_seconds)
+                monitoring.model_loaded_timestamp.set(time.time())
+                monitoring.model_info.clear()
+                monitoring.model_info.set(1, version=self._current.version)
+            print(f'✅ Model {self._current.version} loaded in {load_seconds:.3f}s')
+            return True
+
+    def get(self) -> LoadedModel:
+        """ Returns the resident model, loading it on the first call. """
+        current = self._current
+        if current is None:
+            self.refresh()
+            current = self._current
+        return current
+
+    def info(self) -> dict:
+        """ Version and load statistics of the resident model (empty if none was loaded). """
+        current = self._current
+        if current is None:
+            return {}
+        return {'Version': current.version,
+                'Path': os.path.basename(current.path),
+                'Loaded_at': current.loaded_at.isoformat(timespec='seconds'),
+                'Load_seconds': round(current.load_seconds, 4),
+                'Compiled': isinstance(current.model, CompiledForest),
+                'Features': list(current.schema.features) if current.schema else [],
+                'Metrics': (current.metadata or {}).get('metrics', {})}
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # A half-written or broken file must not take the service down:
+                # keep serving the resident model and try again on the next poll.
+                print(f'⚠️ Model watcher could not refresh the model => {e}')
+
+    def start_watcher(self):
+        """ Starts a daemon thread which polls the models directory every `poll_interval` seconds. """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name='model-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+
+# Process-wide registry used by the prediction pipeline and the Flask app.
+registry = ModelRegistry()
@@ -0,0 +1,126 @@
+import os
+import json
+import sqlite3
+import threading
+from datetime import date, timedelta
+
+from src.components.config import SERVING
+
+
+class OnlineFeatureStore:
+    """ Per-user window of recent daily values, persisted in an embedded SQLite file.
+
+    Clients only send the metrics of one day; the days before it are read from
+    here to build the lag/rolling features server side. Every user keeps at
+    most `window_days` days (older ones are deleted on write), so the storage
+    per user is bounded. SQLite (WAL mode) is shared by the pre-forked workers
+    and survives restarts; each process opens its own connection after the fork.
+    """
+
+    def __init__(self, path: str = SERVING['online_store_path'], window_days: int = None):
+        """
+        Args:
+            path (str): SQLite file (':memory:' for tests).
+            window_days (int): days kept per user (history_days() of the feature engine + today by default).
+        """
+        self.path = path
+        self._window_days = window_days
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    @property
+    def window_days(self) -> int:
+        if self._window_days is None:
+            # Lazy import: pandas is only needed once the first online request arrives.
+            from src.components.feature_engine import history_days
+            self._window_days = history_days() + 1
+        return self._window_days
+
+    def _connection(self) -> sqlite3.Connection:
+        # Called with the lock held. A connection must not cross a fork.
+        if self._conn is None or self._pid != os.getpid():
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS daily ('
+                               'user_id TEXT NOT NULL, day TEXT NOT NULL, metrics TEXT NOT NULL, '
+                               'PRIMARY KEY (user_id, day)) WITHOUT ROWID')
+            self._pid = os.getpid()
+        return self._conn
+
+    def put(self, user_id: str, day: date, metrics: dict):
+        """ Stores (or replaces) the metrics of one day and drops the days out of the window. """
+        oldest = (day - timedelta(days=self.window_days - 1)).isoformat()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute('INSERT OR REPLACE INTO daily (user_id, day, metrics) VALUES (?, ?, ?)',
+                             (user_id, day.isoformat(), json.dumps(metrics)))
+                conn.execute('DELETE FROM daily WHERE user_id = ? AND day < ?', (user_id, oldest))
+
+    def history(self, user_id: str, until: date) -> list:
+        """ Days of the window ending at `until` (included), oldest first.
+
+        Returns:
+            list: [(date, metrics dict), ...]
+        """
+        oldest = (until - timedelta(days=self.window_days - 1)).isoformat()
+        with self._lock:
+            rows = self._connection().execute(
+                'SELECT day, metrics FROM daily WHERE user_id = ? AND day BETWEEN ? AND ? ORDER BY day',
+                (user_id, oldest, until.isoformat())).fetchall()
+        return [(date.fromisoformat(day), json.loads(metrics)) for day, metrics in rows]
+
+    def stats(self) -> dict:
+        with self._lock:
+            users, days = self._connection().execute(
+                'SELECT COUNT(DISTINCT user_id), COUNT(*) FROM daily').fetchone()
+        return {'Users': users, 'Days': days, 'Window_days': self.window_days}
+
+
+def split_features(features: list) -> tuple:
+    """ Splits the model features into raw daily metrics and features derived by the feature engine.
+
+    Returns:
+        tuple: (base features, derived features), both in the model order.
+    """
+    # Lazy import: feature_engine needs pandas, which the other routes never load.
+    from src.components.feature_engine import feature_names
+    derived = set(feature_names())
+    return [f for f in features if f not in derived], [f for f in features if f in derived]
+
+
+def assemble_features(history: list, base_features: list, config: dict = None) -> dict:
+    """ Features of the last day of `history`, built with the training feature engine.
+
+    Uses `build_feature_row`, i.e. the same code as `lag_features` in
+    data_transformation, so the online features can't drift from the training ones.
+    An EWM feature is NaN until the user has at least `span` previous days: an
+    average of a couple of days would be served as if it were a long-term trend.
+
+    Args:
+        history (list): [(date, metrics dict), ...] oldest first, the last one being the day to predict.
+        base_features (list): raw daily features stored for each day.
+        config (dict): feature settings (DATA_SOURCES['data_transformation'] by default).
+
+    Returns:
+        dict: feature name => value (NaN where the history is too short).
+    """
+    import pandas as pd
+    from src.components.config import DATA_SOURCES
+    from src.components.feature_engine import build_feature_row, feature_config
+
+    date_col = DATA_SOURCES['heart_rate']['col_date']['mod']
+    frame = pd.DataFrame([{date_col: day, **{f: metrics.get(f) for f in base_features}} for day, metrics in history])
+    features = build_feature_row(frame, config).to_dict()
+
+    config = feature_config(config)
+    previous_days = len(history) - 1
+    for feature in config['features_to_lag']:
+        for span in config['ewm_spans']:
+            if previous_days < span:
+                features[f'{feature}_ewm{span}'] = float('nan')
+    return features
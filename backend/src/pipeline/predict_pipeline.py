@@ -1,44 +1,49 @@
-import pandas as pd
 import numpy as np
-import glob
-import joblib
-import os
+from src.pipeline import model_registry, tenant_registry
+from src import monitoring
 
-def predict_input(X: pd.DataFrame) -> np.array:
+# pandas is NOT imported here: the serving path works on NumPy rows and this
+# module is imported by every worker at startup. DataFrames are still accepted.
+
+def predict_input(X: 'pd.DataFrame', registry: model_registry.ModelRegistry = None,
+                  loaded: model_registry.LoadedModel = None, tenant: str = None) -> np.array:
     """ Take rows as input and return its predictions.
 
+    The model is not read from disk here: it's taken from the resident model
+    registry, which loads the newest model once and hot-swaps newer ones.
+
     Args:
-        X (pd.DataFrame): input values for each feature
+        X (pd.DataFrame | np.ndarray): input values for each feature (arrays must follow the model feature order)
+        registry (ModelRegistry): registry to take the model from (process-wide one by default)
+        loaded (LoadedModel): snapshot already taken from the registry, e.g. the one whose
+                              schema validated X. If given, the registry isn't consulted.
+        tenant (str): user/tenant id: its own latest model is used (see TenantRegistry)
+                      instead of the global one.
 
     Returns:
         np.array : with the corresponded predictions
     """
-    if X.isna().any().any():
+    missing = np.isnan(X).any() if isinstance(X, np.ndarray) else X.isna().any().any()
+    if missing:
         raise ValueError('You have to provide all the values to predict your Stress Score')
     
+    registry = registry or model_registry.registry
+    
     try:
-        CURRENT_PATH = os.path.dirname(os.path.abspath(__file__))
-        # Absolute path => C:\Users\..\..\..\Samsung Health Project\backend\src\pipeline
-        # Models dir it's at the same level of backend so I need to move backward two times:
-        MODEL_PATH = os.path.join(CURRENT_PATH, '..','..','models')
-        
-        model_paths = glob.glob(f'{str(MODEL_PATH)}/xgb_model_*.pkl')
-        model_paths.sort(reverse=True)
-        
-        if not model_paths:
-            raise FileNotFoundError('👎 No model have been found to predict the request.')
+        if loaded is None:
+            loaded = tenant_registry.tenants.get(tenant) if tenant else registry.get()
+        model = loaded.model # Get the most updated model
     
-    # Here we are wrapping the FileNotFoundError from the if statement and returning a RunTimeError
+    # Here we are wrapping the FileNotFoundError from the registry and returning a RunTimeError
     except FileNotFoundError as e:
         raise RuntimeError("📄 Model file not found") from e
-    
-    try:       
-        model = joblib.load(model_paths[0]) # Get the most updated model
     except Exception as e:
         raise RuntimeError(f"📤 Could not load model: {e}") from e
 
     try:
-        pred = model.predict(X)
+        with monitoring.model_predict_latency.time():
+            pred = model.predict(X)
+        monitoring.model_predict_rows.inc(len(X))
         return pred
     
     except Exception as e:
@@ -0,0 +1,91 @@
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+
+from src.components.config import SERVING
+
+
+class PredictionCache:
+    """ Bounded LRU cache of predictions with a time to live.
+
+    The key is the model version plus the bytes of the validated feature row
+    (already in the model feature order and dtype), so two payloads with the
+    same values in a different key order or as strings hit the same entry.
+    When a request comes with a new model version (hot swap) every entry of
+    the previous version is dropped at once.
+    """
+
+    def __init__(self, max_entries: int = SERVING['cache_max_entries'],
+                 ttl_seconds: float = SERVING['cache_ttl_seconds']):
+        """
+        Args:
+            max_entries (int): entries kept; the least recently used one is evicted beyond it.
+            ttl_seconds (float): age after which an entry is a miss (0 = no expiration).
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def _use_version(self, version):
+        # Called with the lock held.
+        if version != self._version:
+            if self._entries:
+                self._invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, version, row: np.ndarray):
+        """ Cached prediction of the row for this model version, or None. """
+        key = row.tobytes()
+        with self._lock:
+            self._use_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, version, row: np.ndarray, prediction: np.ndarray):
+        """ Stores the prediction of the row (ignored if the model changed meanwhile). """
+        key = row.tobytes()
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[key] = (prediction, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """ Hit/miss/eviction counters since the process started. """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {'Entries': len(self._entries),
+                    'Max_entries': self.max_entries,
+                    'Ttl_seconds': self.ttl,
+                    'Hits': self._hits,
+                    'Misses': self._misses,
+                    'Hit_rate': round(self._hits / lookups, 4) if lookups else 0,
+                    'Evictions': self._evictions,
+                    'Expirations': self._expirations,
+                    'Invalidations': self._invalidations}
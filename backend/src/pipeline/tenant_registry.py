@@ -0,0 +1,223 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+
+from src.components.config import SERVING
+from src.pipeline.model_registry import ModelRegistry, LoadedModel
+from src import monitoring
+
+CURRENT_PATH = os.path.dirname(os.path.abspath(__file__))
+# One folder per user/tenant, laid out like the project itself: <tenant>/models/xgb_model_*
+# (TENANT_ROOT overrides it, e.g. for a mounted volume shared with the training fleet):
+TENANT_ROOT = os.getenv('TENANT_ROOT', os.path.join(CURRENT_PATH, '..', '..', 'tenants'))
+
+# A tenant id becomes a folder name: no separators, no '..'.
+TENANT_ID = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$')
+
+
+class UnknownTenantError(LookupError):
+    """ Raised when a tenant id is invalid or has no model to serve. """
+
+
+def _disk_bytes(path: str) -> int:
+    """ Size of a model bundle (folder) or of a legacy model file. """
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(folder, name))
+               for folder, _, names in os.walk(path) for name in names)
+
+
+class _Resident:
+    """ LRU entry: the tenant's own ModelRegistry plus its accounting. """
+    __slots__ = ('registry', 'nbytes', 'checked_at')
+
+    def __init__(self, registry: ModelRegistry):
+        self.registry = registry
+        self.nbytes = 0
+        self.checked_at = 0.0
+
+
+class TenantRegistry:
+    """ Serves the latest model of each user/tenant from a bounded set of resident models.
+
+    Every tenant has its own models folder (`<root>/<tenant>/models/`) handled by
+    a ModelRegistry, so bundles, legacy pickles, compiled forests and hot swaps
+    work as for the global model. Only the recently used tenants stay resident:
+
+    - a miss loads the tenant's model lazily; concurrent requests for the same
+      tenant wait for that single load instead of loading it once each
+    - the least recently used tenants are evicted beyond `max_models` models or
+      `max_memory_mb` (estimated from the size of the loaded files)
+    - a resident tenant looks for a newer model at most every `refresh_interval` seconds
+    """
+
+    def __init__(self, root: str = TENANT_ROOT, max_models: int = SERVING['tenant_max_models'],
+                 max_memory_mb: float = SERVING['tenant_max_memory_mb'],
+                 refresh_interval: float = SERVING['model_poll_interval'],
+                 compiled: bool = SERVING['compiled_inference']):
+        """
+        Args:
+            root (str): folder holding one folder per tenant.
+            max_models (int): resident models kept (0 = no count limit).
+            max_memory_mb (float): estimated memory of the resident models (0 = no memory limit).
+            refresh_interval (float): seconds between two scans of a resident tenant's models folder.
+            compiled (bool): serve the compiled forests (see ModelRegistry).
+        """
+        self.root = root
+        self.max_models = max_models
+        self.max_bytes = max_memory_mb * 2**20
+        self.refresh_interval = refresh_interval
+        self.compiled = compiled
+        self._resident = OrderedDict()
+        self._loading = {}
+        self._bytes = 0
+        # The lock guards the LRU and the in-flight loads; the loads themselves run outside of it.
+        self._lock = threading.Lock()
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._loads = 0
+        self._load_seconds = 0.0
+        self._load_errors = 0
+        self._evictions = 0
+
+    def _models_dir(self, tenant: str) -> str:
+        if not isinstance(tenant, str) or not TENANT_ID.match(tenant) or '..' in tenant:
+            raise UnknownTenantError(f'Invalid tenant id {tenant!r}')
+        return os.path.join(str(self.root), tenant, 'models')
+
+    def get(self, tenant: str) -> LoadedModel:
+        """ Latest model of the tenant, loading it on a miss.
+
+        Raises:
+            UnknownTenantError: If the tenant id is invalid or the tenant has no model.
+        """
+        models_dir = self._models_dir(tenant)
+        with self._lock:
+            entry = self._resident.get(tenant)
+            if entry is not None:
+                self._resident.move_to_end(tenant)
+                self._hits += 1
+                monitoring.tenant_lookups.inc(result='hit')
+            else:
+                self._misses += 1
+                loading = self._loading.get(tenant)
+                if loading is None:
+                    # This request loads the model; the ones arriving meanwhile wait for it.
+                    loading = self._loading[tenant] = [threading.Event(), None]
+                    owner = True
+                    monitoring.tenant_lookups.inc(result='miss')
+                else:
+                    self._coalesced += 1
+                    owner = False
+                    monitoring.tenant_lookups.inc(result='coalesced')
+
+        if entry is not None:
+            if time.monotonic() - entry.checked_at >= self.refresh_interval:
+                self._refresh(tenant, entry)
+            return entry.registry.get()
+
+        if not owner:
+            loading[0].wait()
+            if isinstance(loading[1], Exception):
+                raise loading[1]
+            return loading[1]
+        return self._load(tenant, models_dir, loading)
+
+    def _load(self, tenant: str, models_dir: str, loading: list) -> LoadedModel:
+        start = time.perf_counter()
+        try:
+            if not os.path.isdir(models_dir):
+                raise UnknownTenantError(f'No model found for tenant {tenant}')
+            entry = _Resident(ModelRegistry(model_dir=models_dir, compiled=self.compiled, report_metrics=False))
+            try:
+                loaded = entry.registry.get()
+            except FileNotFoundError as e:
+                raise UnknownTenantError(f'No model found for tenant {tenant}') from e
+            entry.nbytes = _disk_bytes(loaded.path)
+            entry.checked_at = time.monotonic()
+            loading[1] = loaded
+        except Exception as e:
+            loading[1] = e
+            with self._lock:
+                self._load_errors += 1
+            raise
+        finally:
+            with self._lock:
+                if isinstance(loading[1], LoadedModel):
+                    self._resident[tenant] = entry
+                    self._bytes += entry.nbytes
+                    seconds = time.perf_counter() - start
+                    self._loads += 1
+                    self._load_seconds += seconds
+                    monitoring.tenant_loads.inc()
+                    monitoring.tenant_load_latency.observe(seconds)
+                    self._evict()
+                del self._loading[tenant]
+            loading[0].set()
+        return loaded
+
+    def _refresh(self, tenant: str, entry: _Resident):
+        """ Swaps in a newer model of a resident tenant (a broken one keeps the resident model). """
+        entry.checked_at = time.monotonic()
+        try:
+            if not entry.registry.refresh():
+                return
+        except Exception as e:
+            print(f'⚠️ Model of tenant {tenant} could not be refreshed => {e}')
+            return
+        nbytes = _disk_bytes(entry.registry.get().path)
+        with self._lock:
+            if self._resident.get(tenant) is entry:
+                self._bytes += nbytes - entry.nbytes
+                self._evict()
+            entry.nbytes = nbytes
+
+    def _evict(self):
+        # Called with the lock held. The newest tenant is always kept, even if it alone exceeds the budget.
+        while len(self._resident) > 1 and ((self.max_models and len(self._resident) > self.max_models) or
+                                           (self.max_bytes and self._bytes > self.max_bytes)):
+            _, evicted = self._resident.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self._evictions += 1
+            monitoring.tenant_evictions.inc()
+        self._report()
+
+    def _report(self):
+        # Called with the lock held.
+        monitoring.tenant_resident.set(len(self._resident))
+        monitoring.tenant_resident_bytes.set(self._bytes)
+
+    def evict(self, tenant: str) -> bool:
+        """ Drops a tenant's model (e.g. the tenant was deleted). Requests in flight keep their snapshot. """
+        with self._lock:
+            entry = self._resident.pop(tenant, None)
+            if entry is None:
+                return False
+            self._bytes -= entry.nbytes
+            self._report()
+            return True
+
+    def stats(self) -> dict:
+        """ Residency, hit/miss and eviction counters since the process started. """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {'Resident': len(self._resident),
+                    'Max_models': self.max_models,
+                    'Resident_mb': round(self._bytes / 2**20, 3),
+                    'Max_memory_mb': round(self.max_bytes / 2**20, 3),
+                    'Hits': self._hits,
+                    'Misses': self._misses,
+                    'Hit_rate': round(self._hits / lookups, 4) if lookups else 0,
+                    'Coalesced_loads': self._coalesced,
+                    'Loads': self._loads,
+                    'Mean_load_ms': round(1000 * self._load_seconds / self._loads, 3) if self._loads else 0,
+                    'Load_errors': self._load_errors,
+                    'Evictions': self._evictions}
+
+
+# Process-wide tenant registry used by the prediction pipeline and the Flask app.
+tenants = TenantRegistry()
@@ -4,49 +4,113 @@ import argparse
 from datetime import date
 import pandas as pd
 from src.components.model_trainer import train_selected_model
+from src.components.data_transformation import read_processed
+from src.components.manifest import MANIFEST_PATH, read_manifest, sources_changed, manifest_date
+from src.monitoring import training_stage_latency, save_training_metrics
 
-def train_execution_pipeline(force_retrain=False):
+# Where are you?
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Where do you need to go?
+MODELS_DIR = os.path.join(CURRENT_DIR, '..','..','models')
+
+# Models older than this are retrained when fresh data arrived.
+RETRAIN_AFTER_DAYS = 7
+
+def _legacy_last_dates() -> tuple:
+    """ Last data and model dates without a manifest (runs made before it existed). """
+    # Load the dates of the transformed Dataset (index of the stored dataset):
+    data = read_processed(columns=[])
+    last_date_data = data.index.max().date()
+    
+    # Check the last time that the model was trained.
+    model_metrics = pd.read_csv('logs/metrics_log.csv', sep=',')
+    last_date_model = pd.to_datetime(model_metrics['date']).dt.date.max()
+    return last_date_data, last_date_model
+
+
+def _models_paths(manifest: dict, models_dir: str = MODELS_DIR) -> list:
+    """ Latest model of the manifest, or every model of the models folder (newest first). """
+    model = manifest.get('model')
+    if model and os.path.exists(model['path']):
+        return [model['path']]
+    # Where are the models?
+    models_paths = glob.glob(f'{str(models_dir)}/xgb_model_*') #This returns a list (bundles and legacy .pkl)
+    models_paths.sort(reverse=True) # Order the model paths in descending order
+    return models_paths
+
+
+def _fresh_data_is_due(manifest: dict) -> bool:
+    """ Fresh data (newer days or changed raw exports) and a model older than RETRAIN_AFTER_DAYS. """
+    last_date_data = manifest_date(manifest.get('data'), 'last_date')
+    last_date_model = manifest_date(manifest.get('model'), 'date')
+    if last_date_data is None or last_date_model is None:
+        last_date_data, last_date_model = _legacy_last_dates()
+    
+    # Raw exports changed after the last transformation => they bring data newer than the model.
+    fresh_data = last_date_model < last_date_data
+    if not fresh_data and manifest.get('data') and sources_changed(manifest):
+        print("🆕 Raw sources changed since the last transformation.")
+        fresh_data = True
+    
+    return fresh_data and last_date_model + pd.Timedelta(days=RETRAIN_AFTER_DAYS) < date.today()
+
+
+def retrain_reason(manifest_path: str = MANIFEST_PATH, models_dir: str = MODELS_DIR):
+    """ Why the model of the current project folder should be retrained, without training it.
+
+    Same rule as train_execution_pipeline, e.g. for a scheduler which decides
+    for many user folders before queueing their trainings.
+
+    Returns:
+        str: 'no model', 'fresh data' or None when the model is up-to-date.
+    """
+    manifest = read_manifest(manifest_path)
+    if not _models_paths(manifest, models_dir):
+        return 'no model'
+    if _fresh_data_is_due(manifest):
+        return 'fresh data'
+    return None
+
+
+def train_execution_pipeline(force_retrain=False, manifest_path=MANIFEST_PATH, models_dir=MODELS_DIR):
     """
     Decide if the model should be retrained based on:
     - If no model exists (initial training)
     - If the data is newer than the model (fresh data)
     - If force retrain is manually triggered
 
+    The decision reads the small manifest written by the transformation and
+    training stages (last data date, raw source fingerprints, last model), so
+    it costs a few stat calls instead of reading the dataset, the metrics log
+    and the models folder. Without a manifest it falls back to reading them.
+
+    Args:
+        force_retrain (bool): retrain whatever the dates say.
+        manifest_path (str): manifest of the dataset to check.
+        models_dir (str): models folder looked at when the manifest has no model.
+
     Raises:
         RuntimeError: In case of error during retraining.
     """
+    trainings = training_stage_latency.count(stage='train_selected_model')
     try:
-        # 1️⃣ First time training:
-        # Where are you?
-        CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+        manifest = read_manifest(manifest_path)
         
-        # Where do you need to go?
-        MODEL_PATH = os.path.join(CURRENT_DIR, '..','..','models')
-        
-        # Where are the models?
-        models_paths = glob.glob(f'{str(MODEL_PATH)}/xgb_model_*.pkl') #This returns a list
-        models_paths.sort(reverse=True) # Order the model paths in descending order
+        # 1️⃣ First time training:
+        models_paths = _models_paths(manifest, models_dir)
         
         if len(models_paths) == 0:
             print("📦 No model found. Training from scratch...")
             train_selected_model()
+            manifest = read_manifest(manifest_path)
         
         # 2️⃣ Check if we have fresh new data an a model updated:
-        # Load transformed Dataset:
-        data = pd.read_csv('data/processed/data.csv', sep=',')
-        
-        # Check the last date from the last registers:
-        data['date'] = pd.to_datetime(data['date'])
-        last_date_data = data['date'].dt.date.max()
-        
-        # Check the last time that the model was trained.
-        model_metrics = pd.read_csv('logs/metrics_log.csv', sep=',')
-        last_date_model = pd.to_datetime(model_metrics['date']).dt.date.max()
-        
-        if last_date_model < last_date_data and last_date_model + pd.Timedelta(days=7) < date.today():
+        if _fresh_data_is_due(manifest):
             train_selected_model()
         
-        elif force_retrain:
+        # (a model trained from scratch just now is not trained a second time)
+        elif force_retrain and models_paths:
             print("🚨 Manual retraining triggered by CLI.")
             train_selected_model()
             
@@ -55,16 +119,22 @@ def train_execution_pipeline(force_retrain=False):
                    
     except Exception as e:
         raise RuntimeError(f'Error happened when was re-training the model => {e}') from e
+    
+    finally:
+        # Publish the stage timings (also of a failed run) for the /metrics endpoint of the backend.
+        if training_stage_latency.count(stage='train_selected_model') > trainings:
+            save_training_metrics()
 
 
 if __name__ == '__main__':    
     # 3️⃣ If we need to force the re-training model for some reason we can do it through:
     parser = argparse.ArgumentParser()
     parser.add_argument('--force_retrain', action='store_true', help='Force retraining even if model exists')
+    parser.add_argument('--models_dir', default=MODELS_DIR, help='Models folder (e.g. "models" inside a user folder)')
     args = parser.parse_args()
     
     # If the user force the re training then force_retrain comes True:
-    train_execution_pipeline(force_retrain=args.force_retrain)
+    train_execution_pipeline(force_retrain=args.force_retrain, models_dir=args.models_dir)
     
     # On bash => from the root of the project => python backend/src/pipeline/train_pipeline.py --force_retrain
 
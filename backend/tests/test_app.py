@@ -1,8 +1,10 @@
 # tests/test_app.py
-import json
 import numpy as np
-from unittest.mock import patch, mock_open
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from unittest.mock import patch, MagicMock
 from app import app
+from src.pipeline.feature_schema import FeatureSchema
+from src.pipeline.micro_batcher import QueueFullError
 
 mock_features = [
     "heart_max_rate","heart_min_rate","heart_rate",
@@ -14,11 +16,11 @@ def test_predict_route_success():
     client = app.test_client()
     fake_prediction = np.array([123.45])
 
-    # mock_open provides a fake file with JSON content
-    m = mock_open(read_data=json.dumps(mock_features))
+    # The resident model comes with its compiled feature schema
+    loaded = MagicMock(schema=FeatureSchema(mock_features))
 
-    with patch("builtins.open", m), \
-         patch("app.predict_input", return_value=fake_prediction):
+    with patch("app.registry.get", return_value=loaded), \
+         patch("app.predict_input", return_value=fake_prediction) as mock_predict:
         response = client.post("/predict", json={
             "heart_max_rate": 102,
             "heart_min_rate": 102,
@@ -34,6 +36,204 @@ def test_predict_route_success():
     data = response.get_json()
     assert "Prediction" in data and isinstance(data["Prediction"], (float, int))
 
+    # The row reaches the model already ordered and as floats, no DataFrame involved
+    row = mock_predict.call_args.args[0]
+    assert isinstance(row, np.ndarray) and row.shape == (1, len(mock_features))
+
+def test_predict_route_invalid_fields():
+    client = app.test_client()
+    loaded = MagicMock(schema=FeatureSchema(mock_features))
+    payload = {feature: "70" for feature in mock_features}
+    payload["heart_rate"] = "abc"
+    del payload["stress_min"]
+
+    with patch("app.registry.get", return_value=loaded), \
+         patch("app.predict_input") as mock_predict:
+        response = client.post("/predict", json=payload)
+
+    assert response.status_code == 400
+    assert set(response.get_json()["Fields"]) == {"heart_rate", "stress_min"}
+    mock_predict.assert_not_called()
+
 
     
     
+def test_model_info_route():
+    client = app.test_client()
+    info = {'Version': '20240720', 'Path': 'xgb_model_20240720.pkl',
+            'Loaded_at': '2024-07-20T10:00:00', 'Load_seconds': 0.01}
+
+    with patch("app.registry.info", return_value=info):
+        response = client.get("/model")
+
+    assert response.status_code == 200
+    assert response.get_json()["Version"] == "20240720"
+
+def test_predict_batch_route():
+    client = app.test_client()
+    loaded = MagicMock(schema=FeatureSchema(mock_features))
+    records = [dict.fromkeys(mock_features, 70), {"heart_rate": "abc"}, dict.fromkeys(mock_features, 80)]
+
+    with patch("app.registry.get", return_value=loaded), \
+         patch("app.predict_input", return_value=np.array([1.234, 5.678])) as mock_predict:
+        response = client.post("/predict/batch", json=records)
+
+    assert response.status_code == 200, response.data.decode()
+    data = response.get_json()
+    # One single model call for the valid rows, predictions keep the batch order
+    mock_predict.assert_called_once()
+    assert mock_predict.call_args.args[0].shape == (2, len(mock_features))
+    assert data["Predictions"] == [1.23, None, 5.68]
+    assert list(data["Errors"]) == ["1"]
+
+def test_predict_batch_route_rejects_scalars():
+    client = app.test_client()
+
+    for body in (5, "abc"):
+        response = client.post("/predict/batch", json=body)
+        assert response.status_code == 400, response.data.decode()
+
+def test_predict_batch_route_too_large():
+    client = app.test_client()
+    records = [dict.fromkeys(mock_features, 70)] * 3
+
+    with patch.dict("app.SERVING", {"max_batch_size": 2}):
+        response = client.post("/predict/batch", json=records)
+
+    assert response.status_code == 413
+
+def test_predict_route_busy_returns_503():
+    client = app.test_client()
+    loaded = MagicMock(schema=FeatureSchema(mock_features))
+    batcher = MagicMock()
+    batcher.submit.side_effect = QueueFullError("busy")
+
+    with patch("app.registry.get", return_value=loaded), patch("app.batcher", batcher):
+        response = client.post("/predict", json=dict.fromkeys(mock_features, 70))
+
+    assert response.status_code == 503
+
+def test_predict_route_stalled_batcher_returns_503():
+    client = app.test_client()
+    loaded = MagicMock(schema=FeatureSchema(mock_features))
+    batcher = MagicMock()
+    batcher.submit.side_effect = FuturesTimeoutError()
+
+    with patch("app.registry.get", return_value=loaded), patch("app.batcher", batcher), \
+         patch.dict("app.SERVING", {"batch_timeout_s": 0.5}):
+        response = client.post("/predict", json=dict.fromkeys(mock_features, 71))
+
+    assert response.status_code == 503 and response.headers["Retry-After"] == "1"
+    assert batcher.submit.call_args.kwargs["timeout"] == 0.5
+
+def test_health_and_readiness_routes():
+    client = app.test_client()
+    assert client.get("/health").status_code == 200
+
+    with patch("app.registry.info", return_value={}):
+        assert client.get("/ready").status_code == 503
+
+    with patch("app.registry.info", return_value={"Version": "20240720"}):
+        response = client.get("/ready")
+    assert response.status_code == 200 and response.get_json()["Ready"] is True
+
+def test_importing_app_does_not_import_heavy_modules():
+    # Fresh interpreter: pytest itself has already imported pandas in this one.
+    import sys, subprocess
+    code = "import sys, app; print([m for m in ('pandas', 'sklearn', 'xgboost') if m in sys.modules])"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+def test_repeated_payload_is_served_from_the_cache():
+    client = app.test_client()
+    payload = {feature: 80 for feature in mock_features}
+    loaded = MagicMock(schema=FeatureSchema(mock_features), version="20240720")
+    new_model = MagicMock(schema=FeatureSchema(mock_features), version="20240801")
+
+    with patch("app.registry.get", return_value=loaded), \
+         patch("app.predict_input", return_value=np.array([321.0])) as mock_predict:
+        first = client.post("/predict", json=payload)
+        # Same values sent as strings: same validated row => cache hit
+        second = client.post("/predict", json={k: str(v) for k, v in payload.items()})
+    assert first.get_json() == second.get_json() == {"Prediction": 321.0}
+    assert mock_predict.call_count == 1
+
+    # A hot-loaded model invalidates the cached predictions
+    with patch("app.registry.get", return_value=new_model), \
+         patch("app.predict_input", return_value=np.array([111.0])) as mock_predict:
+        assert client.post("/predict", json=payload).get_json() == {"Prediction": 111.0}
+    mock_predict.assert_called_once()
+
+    stats = client.get("/predict/cache").get_json()
+    assert stats["Enabled"] and stats["Hits"] >= 1 and stats["Invalidations"] >= 1
+
+def test_predict_online_builds_the_lags_server_side(tmp_path):
+    from src.pipeline.online_store import OnlineFeatureStore
+    client = app.test_client()
+    loaded = MagicMock(schema=FeatureSchema(mock_features), version="20240720")
+    today = {"heart_max_rate": 102, "heart_min_rate": 60, "heart_rate": 86, "stress_max": 99, "stress_min": 1}
+
+    with patch("app.registry.get", return_value=loaded), \
+         patch("app.online_store", OnlineFeatureStore(str(tmp_path / "online.sqlite"))), \
+         patch("app.predict_input", return_value=np.array([456.0])) as mock_predict:
+        # Not enough history yet for the lags
+        first = client.post("/predict/online", json={"user_id": "u1", "date": "2024-07-01", **today})
+        assert first.status_code == 422 and "heart_min_rate_lag1" in first.get_json()["Fields"]
+
+        for day, value in (("2024-07-02", 61), ("2024-07-03", 62)):
+            client.post("/predict/online", json={"user_id": "u1", "date": day, **today, "heart_min_rate": value})
+        response = client.post("/predict/online", json={"user_id": "u1", "date": "2024-07-04", **today})
+
+    assert response.status_code == 200, response.data.decode()
+    assert response.get_json() == {"Prediction": 456.0}
+    row = dict(zip(mock_features, mock_predict.call_args.args[0][0]))
+    assert [row[f"heart_min_rate_lag{k}"] for k in (1, 2, 3)] == [62, 61, 60]
+
+def test_predict_online_rejects_bodies_which_are_not_objects():
+    client = app.test_client()
+
+    for body in ([{"user_id": "u1"}], 5, "abc"):
+        response = client.post("/predict/online", json=body)
+        assert response.status_code == 400, response.data.decode()
+
+def test_metrics_endpoint_exposes_request_and_stage_metrics():
+    client = app.test_client()
+    loaded = MagicMock(schema=FeatureSchema(mock_features), version="20240720")
+
+    with patch("app.registry.get", return_value=loaded), \
+         patch("app.predict_input", return_value=np.array([321.0])):
+        client.post("/predict/batch", json=[{feature: 80 for feature in mock_features}])
+        client.post("/predict", json={})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    text = response.get_data(as_text=True)
+    assert 'stress_http_requests_total{route="/predict/batch",method="POST",status="200"}' in text
+    assert 'stress_http_errors_total{route="/predict",status_class="4xx"}' in text
+    for stage in ("parse", "model_lookup", "validate", "predict"):
+        assert f'stress_request_stage_seconds_count{{route="/predict/batch",stage="{stage}"}} ' in text
+    # Only the /metrics request itself is in flight while it's rendered
+    assert "stress_http_requests_in_flight 1" in text
+
+def test_predict_routes_to_the_tenant_model():
+    client = app.test_client()
+    payload = {feature: 80 for feature in mock_features}
+    tenant_model = MagicMock(schema=FeatureSchema(mock_features), version="20240801")
+
+    with patch("app.tenants.get", return_value=tenant_model) as mock_tenant, \
+         patch("app.registry.get") as mock_global, \
+         patch("app.predict_input", return_value=np.array([222.0])) as mock_predict:
+        response = client.post("/predict", json=payload, headers={"X-Tenant-Id": "alice"})
+
+    assert response.get_json() == {"Prediction": 222.0}
+    mock_tenant.assert_called_once_with("alice")
+    mock_global.assert_not_called()
+    assert mock_predict.call_args.kwargs["loaded"] is tenant_model
+
+def test_predict_unknown_tenant_returns_404(tmp_path):
+    from src.pipeline.tenant_registry import TenantRegistry
+    client = app.test_client()
+    with patch("app.tenants", TenantRegistry(root=tmp_path)):
+        response = client.post("/predict?tenant=nobody", json={feature: 80 for feature in mock_features})
+    assert response.status_code == 404
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from xgboost import XGBRegressor
+
+from src.components.compiled_forest import CompiledForest, compile_booster
+
+# Helper which trains a small model on data shaped like data/processed/data.csv
+def train_model(n=300, with_nan=False):
+    rng = np.random.default_rng(42)
+    X = pd.DataFrame({
+        "heart_max_rate": rng.integers(90, 180, n),
+        "heart_min_rate": rng.integers(45, 70, n),
+        "heart_rate": rng.integers(60, 100, n),
+        "stress_max": rng.integers(30, 100, n),
+    }).astype(float)
+    y = X["heart_rate"] * 8 + X["stress_max"] * 3 + rng.normal(0, 20, n)
+    if with_nan:
+        X.iloc[::5, 1] = np.nan
+    model = XGBRegressor(objective='reg:squarederror', random_state=42, n_estimators=50)
+    return model.fit(X, y), X
+
+@pytest.mark.parametrize("with_nan", [False, True])
+def test_parity_with_xgboost(with_nan):
+    model, X = train_model(with_nan=with_nan)
+    forest = compile_booster(model.get_booster())
+
+    np.testing.assert_allclose(forest.predict(X), model.predict(X), rtol=1e-5, atol=1e-3)
+    # Arrays in the feature order and single rows work too
+    np.testing.assert_allclose(forest.predict(X.to_numpy()[:1]), model.predict(X.iloc[:1]), rtol=1e-5, atol=1e-3)
+
+def test_parity_with_continuous_features():
+    # Real valued thresholds (e.g. daily medians and rolling means), not only integer readings
+    rng = np.random.default_rng(7)
+    X = pd.DataFrame(rng.normal(70, 12, (400, 5)), columns=[f"f{i}" for i in range(5)])
+    y = np.sin(X["f0"] / 5) * 40 + X["f1"] * X["f2"] / 50 + rng.normal(0, 1, len(X))
+    model = XGBRegressor(objective="reg:squarederror", random_state=42, n_estimators=80, max_depth=6).fit(X, y)
+    forest = compile_booster(model.get_booster())
+
+    X_new = pd.DataFrame(rng.normal(70, 12, (500, 5)), columns=X.columns)
+    np.testing.assert_allclose(forest.predict(X_new), model.predict(X_new), rtol=1e-5, atol=1e-3)
+
+@pytest.mark.parametrize("booster", ["dart", "gblinear"])
+def test_non_tree_boosters_are_rejected(booster):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(100, 3))
+    model = XGBRegressor(booster=booster, n_estimators=5).fit(X, X[:, 0] * 2)
+
+    with pytest.raises(ValueError, match=booster):
+        compile_booster(model.get_booster())
+
+def test_save_and_load_roundtrip(tmp_path):
+    model, X = train_model()
+    path = tmp_path / "xgb_model_20240720.npz"
+    compile_booster(model.get_booster()).save(path)
+
+    forest = CompiledForest.load(path)
+
+    assert forest.feature_names == list(X.columns)
+    np.testing.assert_allclose(forest.predict(X), model.predict(X), rtol=1e-5, atol=1e-3)
+
+def test_folder_is_memory_mapped(tmp_path):
+    model, X = train_model()
+    compile_booster(model.get_booster()).save(str(tmp_path / "forest"))
+
+    forest = CompiledForest.load(str(tmp_path / "forest"), mmap_mode="r")
+
+    assert isinstance(forest.threshold.base, np.memmap) or isinstance(forest.threshold, np.memmap)
+    np.testing.assert_allclose(forest.predict(X), model.predict(X), rtol=1e-5, atol=1e-3)
+
+def test_first_trees_only():
+    model, X = train_model()
+    forest = compile_booster(model.get_booster(), n_trees=10)
+
+    assert forest.n_trees == 10
+    np.testing.assert_allclose(forest.predict(X), model.predict(X, iteration_range=(0, 10)), rtol=1e-5, atol=1e-3)
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.components.daily_aggregation import aggregate_daily
+
+# Helper with unsorted per-minute samples and some missing readings
+def make_samples(n_days=6, per_day=120, seed=1):
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2024-01-01", periods=n_days).date
+    df = pd.DataFrame({
+        "date": np.repeat(days, per_day),
+        "min": rng.integers(45, 70, n_days * per_day).astype(float),
+        "heart_rate": rng.normal(80, 10, n_days * per_day),
+        "max": rng.integers(90, 180, n_days * per_day).astype(float),
+    })
+    df.loc[df.sample(frac=0.1, random_state=seed).index, "heart_rate"] = np.nan
+    return df.sample(frac=1, random_state=seed)
+
+def test_matches_pandas_groupby():
+    df = make_samples()
+    stats = [("max", "max", "heart_max_rate"), ("min", "min", "heart_min_rate"),
+             ("heart_rate", "median", "heart_rate"), ("heart_rate", "mean", "mean"),
+             ("heart_rate", "std", "std"), ("heart_rate", "count", "count"),
+             ("heart_rate", "p90", "p90"), ("heart_rate", "sum", "sum")]
+
+    out = aggregate_daily(df, "date", stats)
+
+    grouped = df.groupby("date")
+    expected = pd.DataFrame({
+        "heart_max_rate": grouped["max"].max(), "heart_min_rate": grouped["min"].min(),
+        "heart_rate": grouped["heart_rate"].median(), "mean": grouped["heart_rate"].mean(),
+        "std": grouped["heart_rate"].std(), "count": grouped["heart_rate"].count(),
+        "p90": grouped["heart_rate"].quantile(0.9), "sum": grouped["heart_rate"].sum(),
+    }).reset_index()
+    pd.testing.assert_frame_equal(out, expected, check_dtype=False)
+
+def test_unknown_stat():
+    with pytest.raises(ValueError, match="Unknown statistic"):
+        aggregate_daily(make_samples(), "date", [("min", "mode", "x")])
@@ -0,0 +1,53 @@
+import os
+import datetime
+import pandas as pd
+from unittest.mock import MagicMock
+
+from src.components.data_cache import cached_source
+
+def make_source(tmp_path, content="a,b\n1,2\n"):
+    raw = tmp_path / "export.csv"
+    raw.write_text(content)
+    return {"file_path": str(raw), "col_date": "date", "prefix": "stress_"}
+
+def make_loader():
+    return MagicMock(return_value=pd.DataFrame({"date": [datetime.date(2024, 1, 1)], "stress_score": [500.0]}))
+
+def test_unchanged_source_is_loaded_from_cache(tmp_path):
+    config, loader = make_source(tmp_path), make_loader()
+    cache_dir = tmp_path / "cache"
+
+    first = cached_source("stress", config, loader, cache_dir)
+    second = cached_source("stress", config, loader, cache_dir)
+
+    loader.assert_called_once()
+    pd.testing.assert_frame_equal(first, second)
+
+def test_touched_file_with_same_content_is_still_a_hit(tmp_path):
+    config, loader = make_source(tmp_path), make_loader()
+    cached_source("stress", config, loader, tmp_path / "cache")
+
+    os.utime(config["file_path"], (1, 1))
+    cached_source("stress", config, loader, tmp_path / "cache")
+
+    loader.assert_called_once()
+
+def test_changed_file_or_config_invalidates(tmp_path):
+    config, loader = make_source(tmp_path), make_loader()
+    cached_source("stress", config, loader, tmp_path / "cache")
+
+    # New content
+    make_source(tmp_path, "a,b\n1,2\n3,4\n")
+    cached_source("stress", config, loader, tmp_path / "cache")
+    # New config
+    cached_source("stress", {**config, "prefix": "s_"}, loader, tmp_path / "cache")
+
+    assert loader.call_count == 3
+
+def test_missing_file_or_disabled_cache_calls_loader(tmp_path):
+    loader = make_loader()
+    cached_source("stress", {"file_path": ""}, loader, tmp_path / "cache")
+    cached_source("stress", make_source(tmp_path), loader, None)
+
+    assert loader.call_count == 2
+    assert not (tmp_path / "cache").exists()
@@ -1,3 +1,4 @@
+import numpy as np
 from unittest.mock import patch, MagicMock
 import pandas as pd
 from src.components.data_ingestion import load_data
@@ -27,4 +28,65 @@ def test_load_data_returns_dataframe(mock_read_csv):
 # To run this from root (Bash): 
 # choco install make (CMD as admin) or 
 # sudo apt update sudo apt install make (Ubuntu) and then 
-# run the Markfile directly through the command => make test from the root
\ No newline at end of file
+# run the Markfile directly through the command => make test from the root
+
+# Helper which writes a Samsung Health like export: one metadata line, then the header.
+def write_export(path, n_days=5, samples_per_day=50, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2024-01-01", periods=n_days * samples_per_day, freq=f"{24*60//samples_per_day}min")
+    df = pd.DataFrame({
+        "start_time": times.strftime("%Y-%m-%d %H:%M:%S.000"),
+        "min": rng.integers(45, 70, len(times)).astype(float),
+        "score": rng.integers(1, 100, len(times)).astype(float),
+        "max": rng.integers(90, 180, len(times)).astype(float),
+    })
+    # Some missing readings and a shuffled file (exports aren't guaranteed to be sorted)
+    df.loc[df.sample(frac=0.05, random_state=seed).index, "score"] = np.nan
+    df = df.sample(frac=1, random_state=seed)
+    with open(path, "w", encoding="latin-1") as f:
+        f.write("com.samsung.health.stress,6312002,6\n")
+        df.to_csv(f, index=False)
+    return path
+
+def test_streaming_matches_full_load(tmp_path):
+    path = write_export(tmp_path / "stress.csv")
+    kwargs = dict(file_path=path, cols_to_keep=["start_time", "min", "score", "max"],
+                  col_date="start_time", prefix="stress_")
+
+    full = load_data(**kwargs)
+    streamed = load_data(**kwargs, chunksize=37)
+
+    pd.testing.assert_frame_equal(full.reset_index(drop=True), streamed.reset_index(drop=True))
+
+def test_stream_daily_aggregates_exact_stats():
+    from src.components.data_ingestion import stream_daily_aggregates
+    df = pd.DataFrame({"t": ["2024-01-01 10:00"] * 4 + ["2024-01-02 10:00"] * 3,
+                       "v": [1.0, 5.0, 2.0, 10.0, 7.0, 7.0, 3.0]})
+    chunks = [df.iloc[:3].copy(), df.iloc[3:].copy()]
+
+    for stat, expected in [("median", [3.5, 7.0]), ("mean", [4.5, 17 / 3]),
+                           ("min", [1.0, 3.0]), ("max", [10.0, 7.0]), ("count", [4, 3])]:
+        out = stream_daily_aggregates([c.copy() for c in chunks], "t", stat=stat)
+        np.testing.assert_allclose(out["v"], expected)
+
+def test_streaming_keeps_days_without_readings(tmp_path):
+    from src.components.data_ingestion import stream_daily_aggregates
+    df = pd.DataFrame({"t": ["2024-01-01 10:00", "2024-01-02 10:00", "2024-01-02 11:00", "2024-01-03 10:00"],
+                       "v": [1.0, np.nan, np.nan, 3.0], "w": [np.nan, np.nan, np.nan, 4.0]})
+    # Many small chunks: the chunk sketches are queued and merged along the way
+    out = stream_daily_aggregates([df.iloc[[i]].copy() for i in range(len(df))], "t")
+
+    full = df.assign(t=pd.to_datetime(df["t"]).dt.date).groupby("t").median().reset_index()
+    pd.testing.assert_frame_equal(out, full, check_dtype=False)
+
+def test_process_heart_data_single_pass(monkeypatch):
+    from src.components import data_ingestion
+    config = {**data_ingestion.DATA_SOURCES["heart_rate"], "cols_to_keep": ["date", "min", "heart_rate", "max"]}
+    monkeypatch.setitem(data_ingestion.DATA_SOURCES, "heart_rate", config)
+    df = pd.DataFrame({"date": ["d1", "d1", "d2"], "min": [50.0, 55, 60],
+                       "heart_rate": [70.0, 80, 90], "max": [100.0, 120, 110]})
+
+    out = data_ingestion.process_heart_data(df)
+
+    assert list(out.columns) == ["date", "heart_max_rate", "heart_min_rate", "heart_rate"]
+    assert out.values.tolist() == [["d1", 120, 50, 75], ["d2", 110, 60, 90]]
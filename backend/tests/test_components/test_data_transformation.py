@@ -63,13 +63,20 @@ def test_data_transformation_returns_dataframe(mock_load_data, tmp_path, monkeyp
 
     df_out = data_transformation()
     
-    assert (tmp_path / "data" / "processed" / "data.csv").exists()
+    # Default sink: Parquet part files
+    assert list((tmp_path / "data" / "processed" / "data").glob("part-*.parquet"))
 
     # Assert
     assert isinstance(df_out, pd.DataFrame)
     assert not df_out.empty
-    # check that merged column exists (merge on 'date')
-    assert "date" in df_out.columns
+    # check that the merge key became a datetime index and the features are float32
+    assert df_out.index.name == "date"
+    assert isinstance(df_out.index, pd.DatetimeIndex)
+    assert (df_out.dtypes == np.float32).all()
+
+    # The sink returns exactly what the trainer got in memory
+    from src.components.data_transformation import read_processed
+    pd.testing.assert_frame_equal(read_processed(), df_out, check_freq=False)
     
 #------------------------------------------------------------------------------------------------------------
 @patch("src.components.data_transformation.load_data")
@@ -108,8 +115,8 @@ def test_data_transformation_saves_csv(mock_load_data, tmp_path, monkeypatch):
     # create target dir so the function can save there
     (tmp_path / "data" / "processed").mkdir(parents=True, exist_ok=True)
 
-    # Act
-    data_transformation()
+    # Act: the legacy CSV sink is still available
+    data_transformation(sink='csv')
 
     # Assert file exists at data/processed/data.csv under tmp_path
     out_path = tmp_path / "data" / "processed" / "data.csv"
@@ -118,3 +125,117 @@ def test_data_transformation_saves_csv(mock_load_data, tmp_path, monkeypatch):
     df_read = pd.read_csv(out_path)
     assert not df_read.empty
     assert "date" in df_read.columns
+
+#------------------------------------------------------------------------------------------------------------
+# Helper which writes both raw exports (metadata line + header) with the first n_days of the samples
+def write_exports(folder, heart, stress, n_days):
+    for df, name in ((heart, "heart.csv"), (stress, "stress.csv")):
+        df = df[df["time"] < pd.Timestamp("2024-01-01") + pd.Timedelta(days=n_days)].copy()
+        df["time"] = df["time"].dt.strftime("%Y-%m-%d %H:%M:%S")
+        with open(folder / name, "w") as f:
+            f.write("com.samsung.health,1,1\n")
+            df.to_csv(f, index=False)
+
+# Hourly samples of both exports over 40 days, and DATA_SOURCES pointing at them (in tmp_path)
+def incremental_setup(tmp_path, monkeypatch, **features):
+    from src.components import data_transformation as dt
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2024-01-01", periods=40 * 24, freq="h")
+    heart = pd.DataFrame({"time": times, "min": rng.integers(45, 60, len(times)),
+                          "rate": rng.integers(60, 90, len(times)), "max": rng.integers(90, 150, len(times))})
+    stress = pd.DataFrame({"time": times, "score": rng.integers(1, 100, len(times))})
+
+    monkeypatch.setitem(dt.DATA_SOURCES, "stress", {
+        "file_path": "stress.csv", "cols_to_keep": ["time", "score"], "col_date": "time", "prefix": "stress_"})
+    monkeypatch.setitem(dt.DATA_SOURCES, "heart_rate", {
+        "file_path": "heart.csv", "cols_to_keep": ["time", "min", "rate", "max"],
+        "col_date": {"oem": "time", "mod": "date"}, "prefix": "heart_", "data_type": "heart",
+        "new_name_columns": ["date", "heart_max_rate", "heart_min_rate", "heart_rate"]})
+    monkeypatch.setitem(dt.DATA_SOURCES, "data_transformation",
+                        {"features_to_lag": ["heart_min_rate"], "cache_dir": None, **features})
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data" / "processed").mkdir(parents=True)
+    return dt, heart, stress
+
+def test_incremental_matches_full_rebuild(tmp_path, monkeypatch):
+    dt, heart, stress = incremental_setup(tmp_path, monkeypatch)
+
+    # First refresh: nothing stored yet => full transformation
+    write_exports(tmp_path, heart, stress, n_days=30)
+    first = dt.data_transformation(incremental=True)
+    assert len(first) == 27  # 30 days minus the 3 without lags
+
+    # The export gains 10 days: only those (and the last stored day, reloaded) are processed
+    write_exports(tmp_path, heart, stress, n_days=40)
+    appended = dt.data_transformation(incremental=True)
+    assert len(appended) == 11
+
+    assert dt.verify_incremental()
+    assert len(dt.read_processed()) == 37
+    assert len(list((tmp_path / "data" / "processed" / "data").glob("part-*.parquet"))) == 2
+
+    # Nothing new => nothing appended
+    assert dt.data_transformation(incremental=True).empty
+
+def test_incremental_ewm_matches_full_rebuild(tmp_path, monkeypatch):
+    dt, heart, stress = incremental_setup(tmp_path, monkeypatch, ewm_spans=[3, 7])
+
+    write_exports(tmp_path, heart, stress, n_days=30)
+    dt.data_transformation(incremental=True)
+    write_exports(tmp_path, heart, stress, n_days=40)
+    dt.data_transformation(incremental=True)
+
+    # The context kept between the refreshes covers the EWM history (3 x 7 days)
+    full = dt.data_transformation(incremental=False, sink=None)
+    pd.testing.assert_frame_equal(dt.read_processed(), full, check_exact=False, rtol=1e-6)
+
+def test_incremental_reads_the_state_of_its_own_sink(tmp_path, monkeypatch):
+    dt, heart, stress = incremental_setup(tmp_path, monkeypatch)  # default sink: parquet
+
+    write_exports(tmp_path, heart, stress, n_days=30)
+    assert len(dt.data_transformation(incremental=True, sink="csv")) == 27
+    write_exports(tmp_path, heart, stress, n_days=40)
+    # The CSV written by the first refresh is found: only the new days (and the last stored one) are written
+    assert len(dt.data_transformation(incremental=True, sink="csv")) == 11
+    assert len(pd.read_csv(tmp_path / "data" / "processed" / "data.csv")) == 37
+
+def test_duplicated_days_are_collapsed(tmp_path, monkeypatch):
+    dt, _, _ = incremental_setup(tmp_path, monkeypatch)
+    heart_df, stress_df = make_mock_dfs(n=10)
+    # The same day exported twice
+    heart_df, stress_df = pd.concat([heart_df, heart_df.iloc[[4]]]), pd.concat([stress_df, stress_df.iloc[[4]]])
+
+    with patch.object(dt, "_load_sources", return_value=(stress_df, heart_df)):
+        out = dt.data_transformation(incremental=False, sink=None)
+
+    assert out.index.is_unique and out.index.is_monotonic_increasing
+    assert len(out) == 7  # 10 days minus the 3 without lags
+
+def test_partial_last_day_is_completed_by_the_next_refresh(tmp_path, monkeypatch):
+    dt, heart, stress = incremental_setup(tmp_path, monkeypatch, lags=[1, 2], ewm_spans=[3])
+
+    # The first export stops at noon: the last day only has half of its readings
+    write_exports(tmp_path, heart, stress, n_days=29.5)
+    dt.data_transformation(incremental=True)
+    write_exports(tmp_path, heart, stress, n_days=40)
+    dt.data_transformation(incremental=True)
+
+    full = dt.data_transformation(incremental=False, sink=None)
+    stored = dt.read_processed()
+    pd.testing.assert_frame_equal(stored, full, check_exact=False, rtol=1e-6)
+    assert stored.index.is_unique and len(list((tmp_path / "data" / "processed" / "data").glob("*.parquet"))) == 2
+    # The replaced day isn't counted twice
+    assert dt.read_manifest()["data"]["rows"] == len(stored)
+
+def test_column_missing_on_every_new_day_is_filled_from_history(tmp_path, monkeypatch):
+    dt, heart, stress = incremental_setup(tmp_path, monkeypatch)
+    # The stress export keeps its days but loses its scores after the first refresh
+    stress.loc[stress["time"] >= pd.Timestamp("2024-01-31"), "score"] = np.nan
+
+    write_exports(tmp_path, heart, stress, n_days=30)
+    dt.data_transformation(incremental=True)
+    write_exports(tmp_path, heart, stress, n_days=40)
+    assert len(dt.data_transformation(incremental=True)) == 11
+
+    assert dt.verify_incremental()
+    assert dt.read_processed()["stress_score"].notna().all()
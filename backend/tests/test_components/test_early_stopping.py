@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from src.components.early_stopping import validation_split, fit_with_early_stopping, best_n_trees
+
+# Helper which builds a daily training window (datetime index) with a learnable target
+def make_window(n_days=300, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=n_days, freq="D", name="date")
+    X = pd.DataFrame(rng.normal(70, 10, (n_days, 3)), index=index,
+                     columns=["heart_min_rate", "heart_rate", "heart_max_rate"])
+    y = pd.Series(8 * X["heart_rate"] + rng.normal(0, 20, n_days), index=index)
+    return X, y
+
+# 1️⃣ The last days validate, in time order, and never overlap the training days:
+def test_validation_split_holds_out_the_last_days():
+    X, y = make_window()
+
+    X_fit, y_fit, X_val, y_val = validation_split(X, y, days=60)
+
+    assert len(X_val) == 60 and len(X_fit) == 240
+    assert X_fit.index.max() < X_val.index.min()
+    assert X_val.index.max() == X.index.max()
+    pd.testing.assert_index_equal(y_val.index, X_val.index)
+
+# 2️⃣ A window too short to keep enough training days trains on everything without early stopping:
+def test_short_window_falls_back_to_plain_training():
+    X, y = make_window(n_days=90)
+
+    X_fit, _, X_val, _ = validation_split(X, y, days=60)
+    assert len(X_fit) == 90 and X_val.empty
+
+    model = fit_with_early_stopping(X, y, {"validation_days": 60, "n_estimators": 500})
+    assert model.early_stopping_rounds is None
+    assert best_n_trees(model) == 100
+
+# 3️⃣ A stopped model keeps the trees up to its best iteration:
+def test_best_n_trees_of_a_stopped_model():
+    X, y = make_window()
+
+    model = fit_with_early_stopping(X, y, {"validation_days": 60, "n_estimators": 1000, "early_stopping_rounds": 10})
+
+    assert model.get_booster().num_boosted_rounds() < 1000
+    assert best_n_trees(model) == model.best_iteration + 1
+    assert best_n_trees(model) <= model.get_booster().num_boosted_rounds() - 10
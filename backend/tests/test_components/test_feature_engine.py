@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from src.components.feature_engine import build_features, build_feature_row, feature_names, history_days
+
+def make_daily(n=15, seed=3):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"date": pd.date_range("2024-01-01", periods=n).date,
+                         "heart_min_rate": rng.integers(45, 70, n).astype(float),
+                         "stress_score": rng.integers(300, 1200, n).astype(float)})
+
+def test_lags_match_previous_shift_loop():
+    data = make_daily()
+    out = build_features(data, {"features_to_lag": ["heart_min_rate"]})
+
+    expected = data.copy()
+    for i in range(1, 4):
+        expected[f"heart_min_rate_lag{i}"] = expected["heart_min_rate"].shift(i)
+    pd.testing.assert_frame_equal(out, expected.dropna())
+
+def test_gap_in_export_is_not_shifted_in():
+    data = make_daily().drop(index=7)  # 2024-01-08 is missing
+    out = build_features(data, {"features_to_lag": ["heart_min_rate"]})
+
+    # The 3 days after the gap need the missing day for one of their lags
+    assert pd.Timestamp("2024-01-09").date() not in set(out["date"])
+    row = out[out["date"] == pd.Timestamp("2024-01-12").date()].iloc[0]
+    assert row["heart_min_rate_lag1"] == data.loc[10, "heart_min_rate"]
+
+def test_rolling_and_ewm_use_previous_days_only():
+    data = make_daily()
+    config = {"features_to_lag": ["heart_min_rate"], "lags": [1], "rolling_windows": [3],
+              "rolling_stats": ["mean", "std"], "ewm_spans": [5]}
+    out = build_features(data, config, dropna=False)
+
+    past = data["heart_min_rate"].shift(1)
+    assert feature_names(config) == ["heart_min_rate_lag1", "heart_min_rate_roll3_mean",
+                                     "heart_min_rate_roll3_std", "heart_min_rate_ewm5"]
+    np.testing.assert_allclose(out["heart_min_rate_roll3_mean"], past.rolling(3).mean())
+    np.testing.assert_allclose(out["heart_min_rate_roll3_std"], past.rolling(3).std())
+    np.testing.assert_allclose(out["heart_min_rate_ewm5"], past.ewm(span=5).mean())
+
+def test_serving_row_matches_training_features():
+    data = make_daily()
+    training = build_features(data, {"features_to_lag": ["heart_min_rate"]})
+
+    row = build_feature_row(data.tail(4), {"features_to_lag": ["heart_min_rate"]})
+
+    pd.testing.assert_series_equal(row, training.iloc[-1], check_names=False)
+
+def test_serving_row_with_ewm_needs_only_history_days():
+    data = make_daily(n=60)
+    config = {"features_to_lag": ["heart_min_rate"], "lags": [1], "ewm_spans": [4]}
+    training = build_features(data, config)
+
+    assert history_days(config) == 12
+    row = build_feature_row(data.tail(history_days(config) + 1), config)
+
+    pd.testing.assert_series_equal(row, training.iloc[-1], check_names=False)
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from src.components.hyperparameter_search import plan_threads, tune_model
+
+def test_processes_times_threads_never_exceed_the_cores():
+    assert plan_threads(-1, n_cores=8) == (8, 1)
+    assert plan_threads(2, n_cores=8) == (2, 4)
+    # Fewer fits than cores: the spare cores become XGBoost threads
+    assert plan_threads(-1, n_tasks=3, n_cores=8) == (3, 2)
+    assert plan_threads(16, n_cores=4) == (4, 1)
+
+def test_halving_prunes_candidates_and_refits_with_full_resources():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, 3)), columns=["heart_min_rate", "heart_rate", "heart_max_rate"])
+    y = pd.Series(3 * X["heart_rate"] + rng.normal(size=200))
+    config = {"param_grid": {"n_estimators": [10, 30], "max_depth": [2, 3, 4], "learning_rate": [0.1, 0.3]},
+              "n_candidates": 6, "halving_factor": 3, "n_splits": 2, "n_jobs": 1}
+
+    model, search = tune_model(X, y, config)
+
+    assert list(search.n_candidates_) == [6, 2]
+    assert list(search.n_resources_) == [10, 30]
+    assert model.n_estimators == 30
+    assert list(model.get_booster().feature_names) == list(X.columns)
@@ -0,0 +1,64 @@
+import joblib
+import numpy as np
+import pandas as pd
+from xgboost import XGBRegressor
+
+from src.components.incremental_training import continue_training, warm_start_model
+
+def make_dataset(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2023-01-01", periods=n, name="date")
+    X = pd.DataFrame(rng.normal(size=(n, 3)), columns=["heart_min_rate", "heart_rate", "heart_max_rate"], index=index)
+    y = 3 * X["heart_rate"] + X["heart_min_rate"] + rng.normal(scale=0.1, size=n)
+    return X.astype(np.float32), y.astype(np.float32)
+
+def save_previous(tmp_path, X, y, train_end, **section):
+    model = XGBRegressor(n_estimators=50).fit(X[X.index <= train_end], y[X.index <= train_end])
+    path = tmp_path / "xgb_model_20240101.pkl"
+    joblib.dump(model, path)
+    return model, {"path": str(path), "train_end": train_end.date().isoformat(), **section}
+
+def test_boost_adds_trees_learned_on_the_new_days(tmp_path):
+    X, y = make_dataset()
+    X_train, y_train, X_test, y_test = X[:300], y[:300], X[300:], y[300:]
+    previous, section = save_previous(tmp_path, X_train, y_train, X.index[250])
+
+    model, info = warm_start_model(X_train, y_train, X_test, y_test, section, {"warm_start_rounds": 10})
+
+    assert info["new_days"] == 49 and info["warm_starts"] == 1
+    assert info["rows"] == 300  # the window covers the whole training set
+    assert model.get_booster().num_boosted_rounds() == 60
+
+def test_refresh_keeps_the_trees(tmp_path):
+    X, y = make_dataset()
+    previous, _ = save_previous(tmp_path, X, y, X.index[200])
+
+    model = continue_training(previous, X, y, mode="refresh")
+
+    assert model.get_booster().num_boosted_rounds() == 50
+    assert not np.allclose(model.predict(X), previous.predict(X))
+
+def test_falls_back_to_a_full_fit(tmp_path):
+    X, y = make_dataset()
+    X_train, y_train, X_test, y_test = X[:300], y[:300], X[300:], y[300:]
+
+    assert warm_start_model(X_train, y_train, X_test, y_test, None)[0] is None
+
+    _, section = save_previous(tmp_path, X_train, y_train, X.index[250], warm_starts=8)
+    assert warm_start_model(X_train, y_train, X_test, y_test, section)[1] == "8 warm starts in a row"
+
+    # Guard: new days with a broken target make the holdout RMSE worse
+    _, section = save_previous(tmp_path, X_train, y_train, X.index[250])
+    model, reason = warm_start_model(X_train, y_train * -5, X_test, y_test, section)
+    assert model is None and reason.startswith("holdout RMSE degraded")
+
+def test_continuation_starts_from_the_best_iteration():
+    X, y = make_dataset()
+    previous = XGBRegressor(n_estimators=500, early_stopping_rounds=10).fit(
+        X[:250], y[:250], eval_set=[(X[250:300], y[250:300])], verbose=False)
+
+    model = continue_training(previous, X[:300], y[:300], rounds=5)
+
+    # The extra trees of the early stopped model are gone and the new ones are used to predict
+    assert model.get_booster().num_boosted_rounds() == previous.best_iteration + 1 + 5
+    assert "best_iteration" not in model.get_booster().attributes()
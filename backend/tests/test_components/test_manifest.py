@@ -0,0 +1,40 @@
+import os
+import datetime
+
+from src.components import manifest as mf
+
+def use_sources(monkeypatch, tmp_path):
+    for key in mf.SOURCE_KEYS:
+        raw = tmp_path / f"{key}.csv"
+        raw.write_text("a,b\n1,2\n")
+        monkeypatch.setitem(mf.DATA_SOURCES, key, {**mf.DATA_SOURCES[key], "file_path": str(raw)})
+    return tmp_path / "stress.csv"
+
+def test_update_keeps_the_other_sections(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    mf.update_manifest("data", {"last_date": datetime.date(2024, 1, 31), "rows": 31}, path)
+    mf.update_manifest("model", {"path": "models/xgb_model_20240201.pkl", "rmse": 12.5}, path)
+
+    manifest = mf.read_manifest(path)
+    assert mf.manifest_date(manifest["data"], "last_date") == datetime.date(2024, 1, 31)
+    assert manifest["model"]["rmse"] == 12.5
+
+def test_missing_or_broken_manifest_is_empty(tmp_path):
+    assert mf.read_manifest(str(tmp_path / "missing.json")) == {}
+    (tmp_path / "broken.json").write_text("{")
+    assert mf.read_manifest(str(tmp_path / "broken.json")) == {}
+
+def test_sources_changed_without_parsing(tmp_path, monkeypatch):
+    raw = use_sources(monkeypatch, tmp_path)
+    path = str(tmp_path / "manifest.json")
+    assert mf.sources_changed(path=path)  # never processed
+
+    mf.update_manifest("data", {"sources": mf.source_fingerprints()}, path)
+    assert not mf.sources_changed(path=path)
+
+    # Same content copied again: new mtime, same hash
+    os.utime(raw, (1, 1))
+    assert not mf.sources_changed(path=path)
+
+    raw.write_text("a,b\n1,2\n3,4\n")
+    assert mf.sources_changed(path=path)
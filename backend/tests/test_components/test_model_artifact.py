@@ -0,0 +1,48 @@
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from xgboost import XGBRegressor
+
+from src.components.compiled_forest import CompiledForest
+from src.components.model_artifact import save_artifact, load_artifact, load_trained_model, dataset_fingerprint
+from src.pipeline.model_registry import ModelRegistry
+
+def train_model(n=300):
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.normal(size=(n, 3)), columns=["heart_min_rate", "heart_rate", "stress_max"])
+    y = 3 * X["heart_rate"] + rng.normal(size=n)
+    model = XGBRegressor(n_estimators=300, early_stopping_rounds=5)
+    return model.fit(X[:200], y[:200], eval_set=[(X[200:], y[200:])], verbose=False), X
+
+def test_bundle_is_published_complete_and_versioned(tmp_path):
+    model, X = train_model()
+    first = save_artifact(model, list(X.columns), {"rmse": 1.0}, str(tmp_path), dataset_fingerprint(X))
+    second = save_artifact(model, list(X.columns), {"rmse": 1.0}, str(tmp_path))
+
+    # Same second, same day: still two versions, and no temporary folder left behind
+    assert first != second
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(first), os.path.basename(second)])
+    assert sorted(os.listdir(first)) == ["features.json", "forest", "metadata.json", "model.ubj"]
+
+    forest, features, metadata = load_artifact(first)
+    assert isinstance(forest, CompiledForest)
+    assert metadata["n_trees"] == model.best_iteration + 1 == forest.n_trees
+    assert metadata["metrics"] == {"rmse": 1.0} and len(metadata["data_fingerprint"]) == 32
+
+    # The XGBRegressor (for warm starts) comes back from UBJSON, not from a pickle
+    restored = load_trained_model(first)
+    assert restored.best_iteration == model.best_iteration
+    np.testing.assert_allclose(restored.predict(X), model.predict(X))
+
+def test_registry_serves_newest_bundle_with_its_own_schema(tmp_path):
+    model, X = train_model()
+    joblib.dump(model, tmp_path / "xgb_model_20240720.pkl")
+    bundle = save_artifact(model, list(X.columns), {"rmse": 1.0}, str(tmp_path))
+
+    loaded = ModelRegistry(model_dir=str(tmp_path)).get()
+
+    assert loaded.path == bundle
+    assert loaded.version == os.path.basename(bundle).replace("xgb_model_", "")
+    assert list(loaded.schema.features) == list(X.columns)
+    np.testing.assert_allclose(loaded.model.predict(X.to_numpy()), model.predict(X), rtol=1e-5, atol=1e-3)
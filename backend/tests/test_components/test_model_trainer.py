@@ -14,45 +14,73 @@ class FakeEstimator:
         import numpy as np
         return np.zeros(len(X))
 
-@patch("src.components.model_trainer.RandomizedSearchCV")
-def test_train_selected_model_mocked_random_search(mock_random_search, tmp_path, monkeypatch):
+@patch("src.components.model_trainer.fit_with_early_stopping")
+def test_train_selected_model_mocked_training(mock_fit, tmp_path, monkeypatch):
     # 1) isolate FS
     monkeypatch.chdir(tmp_path)
 
-    # 2) write the processed CSV that trainer reads
+    # 2) build the typed dataset that data transformation hands over in memory
     n = 120
-    dates = pd.date_range("2020-01-01", periods=n)
     df = pd.DataFrame({
-        "date": dates,
         "feat_a": np.linspace(0, 1, n),
         "feat_b": np.linspace(1, 0, n),
         "stress_score": np.random.randint(300, 1200, size=n)
-    })
-    (tmp_path / "data" / "processed").mkdir(parents=True, exist_ok=True)
-    df.to_csv(tmp_path / "data" / "processed" / "data.csv", index=False)
+    }, index=pd.date_range("2020-01-01", periods=n, name="date")).astype(np.float32)
 
-    # 3) monkeypatch data_transformation to be noop
-    monkeypatch.setattr("src.components.model_trainer.data_transformation", lambda: None)
+    # 3) monkeypatch the data transformation: nothing is read from disk
+    monkeypatch.setattr("src.components.model_trainer.training_dataset", lambda: df)
 
-    # 4) configure the RandomizedSearchCV mock to expose a .best_estimator_
-    fake_search = MagicMock()
-    fake_search.fit.return_value = None
-    fake_search.best_estimator_ = FakeEstimator()
-    mock_random_search.return_value = fake_search
+    # 4) the mocked training returns a fake estimator, which the mocked bundle writer accepts
+    mock_fit.return_value = FakeEstimator()
+    monkeypatch.setattr("src.components.model_trainer.best_n_trees", lambda model: 1)
+    mock_save = MagicMock(return_value="models/xgb_model_20240720T120000_abcdef")
+    monkeypatch.setattr("src.components.model_trainer.save_artifact", mock_save)
+    (tmp_path / "models").mkdir()
 
-    # 5) run; should use the patched RandomizedSearchCV
+    # 5) run; should use the patched training
     train_selected_model()
 
-    # 6) assertions: files created
-    assert (tmp_path / "models").exists()
-    models = list((tmp_path / "models").glob("xgb_model_*.pkl"))
-    assert len(models) >= 1
+    # 6) assertions: bundle saved with its features, and model_features.json written
+    assert mock_save.call_args.args[1] == ["feat_a", "feat_b"]
+    assert json.loads((tmp_path / "models" / "model_features.json").read_text()) == ["feat_a", "feat_b"]
+
+    # A new feature set rewrites model_features.json
+    monkeypatch.setattr("src.components.model_trainer.training_dataset", lambda: df.rename(columns={"feat_b": "feat_c"}))
+    train_selected_model()
+    assert json.loads((tmp_path / "models" / "model_features.json").read_text()) == ["feat_a", "feat_c"]
 
     # check logs
     assert (tmp_path / "logs" / "metrics_log.csv").exists()
     log_df = pd.read_csv(tmp_path / "logs" / "metrics_log.csv")
     assert not log_df.empty
 
-    # ensure the mocked RandomizedSearchCV was instantiated
-    mock_random_search.assert_called_once()
+    # ensure the mocked training was called (once per run)
+    assert mock_fit.call_count == 2
+
+#------------------------------------------------------------------------------------------------------------
+def test_early_stopping_model_is_served_up_to_its_best_iteration(tmp_path, monkeypatch):
+    from src.components.model_artifact import load_artifact
+    from src.components.manifest import read_manifest
+    monkeypatch.chdir(tmp_path)
+
+    n = 500
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"feat_a": rng.normal(size=n), "feat_b": rng.normal(size=n)},
+                      index=pd.date_range("2020-01-01", periods=n, name="date"))
+    df["stress_score"] = 600 + 100 * df["feat_a"] + rng.normal(scale=50, size=n)
+    monkeypatch.setattr("src.components.model_trainer.training_dataset", lambda: df.astype(np.float32))
+
+    model = train_selected_model()
+
+    # Stopped long before the 1000 trees, and the best iteration is recorded
+    n_trees = read_manifest()["model"]["n_trees"]
+    assert n_trees == model.best_iteration + 1 < 1000
 
+    bundle = read_manifest()["model"]["path"]
+    compiled, features, metadata = load_artifact(bundle)
+    booster, _, _ = load_artifact(bundle, compiled=False)
+    assert compiled.n_trees == booster.n_trees == metadata["n_trees"] == n_trees
+    assert features == ["feat_a", "feat_b"]
+    X = df[["feat_a", "feat_b"]].astype(np.float32)
+    np.testing.assert_allclose(compiled.predict(X), model.predict(X), rtol=1e-4, atol=1e-2)
+    np.testing.assert_allclose(booster.predict(X), model.predict(X), rtol=1e-5)
@@ -0,0 +1,52 @@
+from unittest.mock import patch
+
+from src.monitoring import MetricsRegistry, timed_stage, training_stage_latency, save_training_metrics, render_metrics
+
+def test_text_exposition_format():
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requests.', ('route', 'status'))
+    in_flight = registry.gauge('in_flight', 'In flight.')
+    latency = registry.histogram('latency_seconds', 'Latency.', ('route',), buckets=(0.1, 1))
+
+    requests.inc(route='/predict', status=200)
+    requests.inc(route='/predict', status=200)
+    in_flight.inc(); in_flight.inc(); in_flight.dec()
+    for seconds in (0.05, 0.5, 5):
+        latency.observe(seconds, route='/predict')
+
+    text = registry.render()
+    assert '# TYPE requests_total counter' in text
+    assert 'requests_total{route="/predict",status="200"} 2' in text
+    assert 'in_flight 1' in text
+    # Buckets are cumulative and end with +Inf
+    assert 'latency_seconds_bucket{route="/predict",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/predict",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/predict",le="+Inf"} 3' in text
+    assert 'latency_seconds_sum{route="/predict"} 5.55' in text
+    assert 'latency_seconds_count{route="/predict"} 3' in text
+
+def test_label_values_are_escaped_and_checked():
+    registry = MetricsRegistry()
+    info = registry.gauge('model_info', 'Model.', ('version',))
+    info.set(1, version='a"b\\c')
+    assert 'model_info{version="a\\"b\\\\c"} 1' in registry.render()
+    try:
+        info.set(1, model='x')
+        raise AssertionError('unknown labels must be rejected')
+    except ValueError:
+        pass
+
+def test_training_stage_timings_are_published(tmp_path):
+    @timed_stage('unit_test_stage')
+    def stage():
+        return 42
+
+    with patch('src.monitoring.time.perf_counter', side_effect=[10.0, 12.5]):
+        assert stage() == 42
+    assert training_stage_latency.count(stage='unit_test_stage') == 1
+
+    path = tmp_path / 'training.prom'
+    save_training_metrics(str(path))
+    text = render_metrics(str(path))
+    assert 'stress_training_stage_last_seconds{stage="unit_test_stage"} 2.5' in text
+    assert 'stress_http_requests_total' in text
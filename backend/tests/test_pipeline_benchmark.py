@@ -0,0 +1,30 @@
+from benchmarks.pipeline_benchmark import compare
+
+def results(**benchmarks):
+    return {"results": {"1y": benchmarks}}
+
+# 1️⃣ A fast benchmark timed over many calls still fails when it gets much slower:
+def test_fast_benchmark_regression_is_caught():
+    baseline = results(predict_single={"wall_s": 0.00004, "peak_mb": 1.0, "number": 200})
+    current = results(predict_single={"wall_s": 0.0008, "peak_mb": 1.0, "number": 200})
+
+    assert compare(current, baseline, threshold=0.2) == [("1y", "predict_single", "wall_s", 0.00004, 0.0008)]
+
+# 2️⃣ Timer noise of a single short call and changes within the threshold are ignored:
+def test_noise_and_small_changes_are_ignored():
+    baseline = results(load_data={"wall_s": 0.0002, "peak_mb": 10.0, "number": 1},
+                       lag_features={"wall_s": 1.0, "peak_mb": 10.0, "number": 1})
+    current = results(load_data={"wall_s": 0.0005, "peak_mb": 10.0, "number": 1},
+                      lag_features={"wall_s": 1.1, "peak_mb": 11.0, "number": 1})
+
+    assert compare(current, baseline, threshold=0.2) == []
+
+# 3️⃣ Memory regressions and skipped or new benchmarks:
+def test_memory_regression_and_missing_benchmarks():
+    baseline = results(data_transformation={"wall_s": 1.0, "peak_mb": 100.0, "number": 1},
+                       predict_batch={"skipped": "less than 180 days"})
+    current = results(data_transformation={"wall_s": 1.0, "peak_mb": 150.0, "number": 1},
+                      predict_batch={"wall_s": 0.01, "peak_mb": 1.0, "number": 10},
+                      lag_features={"wall_s": 0.5, "peak_mb": 5.0, "number": 1})
+
+    assert compare(current, baseline) == [("1y", "data_transformation", "peak_mb", 100.0, 150.0)]
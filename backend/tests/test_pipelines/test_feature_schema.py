@@ -0,0 +1,52 @@
+import json
+import numpy as np
+import pytest
+from src.pipeline.feature_schema import FeatureSchema, FeatureValidationError
+
+features = ["heart_max_rate", "heart_min_rate", "heart_rate", "stress_max"]
+
+def test_row_follows_schema_order():
+    schema = FeatureSchema(features, dtype="float64")
+    # Keys arrive in a different order and as strings (like the React form sends them)
+    row = schema.to_row({"stress_max": "99", "heart_rate": 86, "heart_min_rate": "65",
+                         "heart_max_rate": 102, "extra_field": "ignored"})
+
+    assert row.dtype == np.float64
+    assert row.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(row, [[102, 65, 86, 99]])
+
+def test_per_field_errors():
+    schema = FeatureSchema(features)
+    with pytest.raises(FeatureValidationError) as e:
+        schema.to_row({"heart_max_rate": "abc", "heart_min_rate": None, "heart_rate": "nan"})
+
+    assert set(e.value.errors) == {"heart_max_rate", "heart_min_rate", "heart_rate", "stress_max"}
+
+def test_schema_from_file(tmp_path):
+    path = tmp_path / "model_features.json"
+    path.write_text(json.dumps(features))
+    schema = FeatureSchema.from_file(path)
+
+    assert schema.features == tuple(features)
+    assert schema.to_row(dict.fromkeys(features, 1)).dtype == np.float32
+
+def test_matrix_from_records_and_columns():
+    schema = FeatureSchema(features)
+    records = [dict(zip(features, [102, 65, 86, 99])), dict(zip(features, ["90", "60", "70", "80"]))]
+    columns = {name: [record[name] for record in records] for name in features}
+
+    for payload in (records, columns):
+        matrix, valid_rows, errors = schema.to_matrix(payload)
+        assert matrix.shape == (2, len(features)) and matrix.flags["C_CONTIGUOUS"]
+        np.testing.assert_array_equal(matrix[1], [90, 60, 70, 80])
+        assert valid_rows.tolist() == [0, 1] and errors == {}
+
+def test_matrix_reports_errors_per_row():
+    schema = FeatureSchema(features)
+    records = [dict.fromkeys(features, 1), {"heart_rate": "x"}, dict.fromkeys(features, 3)]
+
+    matrix, valid_rows, errors = schema.to_matrix(records)
+
+    assert valid_rows.tolist() == [0, 2]
+    np.testing.assert_array_equal(matrix[:, 0], [1, 3])
+    assert list(errors) == [1] and "heart_rate" in errors[1]
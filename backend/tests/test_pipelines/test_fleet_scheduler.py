@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import pytest
+from unittest.mock import patch
+from src.pipeline.fleet_scheduler import FleetScheduler, FleetJob, discover_users, stale_jobs, training_command
+from src.pipeline.train_pipeline import train_execution_pipeline
+from src.components.manifest import update_manifest
+
+def make_users(root, *names):
+    for name in names:
+        (root / name / 'data').mkdir(parents=True)
+    return discover_users([str(root)])
+
+def job(folder, user='alice'):
+    return FleetJob(user, str(folder), 'fresh data')
+
+# Small scripts standing for the training process (run inside the user folder)
+def script(code):
+    return [sys.executable, '-c', code]
+
+# 1️⃣ Only the stale users are queued, the most outdated model first:
+def test_stale_users_are_queued_oldest_first(tmp_path):
+    users = make_users(tmp_path, 'alice', 'bob', 'carol', 'dave')
+    (tmp_path / 'not-a-user').mkdir()
+    assert [user for user, _ in users] == ['alice', 'bob', 'carol', 'dave']
+    update_manifest('model', {'date': '2025-07-01'}, str(tmp_path / 'alice' / 'data' / 'manifest.json'))
+    update_manifest('model', {'date': '2025-06-01'}, str(tmp_path / 'carol' / 'data' / 'manifest.json'))
+    reasons = {'alice': 'fresh data', 'bob': 'no model', 'carol': 'fresh data', 'dave': None}
+
+    with patch('src.pipeline.fleet_scheduler.retrain_reason',
+               side_effect=lambda *args: reasons[os.path.basename(os.getcwd())]):
+        jobs = stale_jobs(users)
+        assert [job.user for job in jobs] == ['bob', 'carol', 'alice']
+        forced = {job.user: job.reason for job in stale_jobs(users, force=True)}
+        assert forced['dave'] == 'forced' and len(forced) == 4
+
+# 2️⃣ Successful trainings get their share of the thread budget:
+def test_jobs_run_with_the_thread_budget(tmp_path):
+    users = make_users(tmp_path, 'alice', 'bob', 'carol', 'dave')
+    command = script("import os; open('threads.txt', 'w').write(os.environ['OMP_NUM_THREADS'])")
+    report = FleetScheduler(processes=2, max_threads=8, command=command).run([job(folder, user) for user, folder in users])
+
+    assert report['trained'] == 4 and report['failed'] == 0
+    assert (report['processes'], report['threads_per_process']) == (2, 4)
+    assert all((tmp_path / user / 'threads.txt').read_text() == '4' for user, _ in users)
+    assert (tmp_path / 'alice' / 'logs' / 'fleet_train.log').exists()
+
+# 3️⃣ A failed training is retried:
+def test_failed_training_is_retried(tmp_path):
+    folder = tmp_path / 'alice'
+    folder.mkdir()
+    # Fails the first time only
+    command = script("import os, sys; first = not os.path.exists('tried'); open('tried', 'w'); sys.exit(1 if first else 0)")
+    report = FleetScheduler(command=command, retries=1, retry_delay=0).run([job(folder)])
+
+    assert report['trained'] == 1
+    assert report['jobs'][0]['attempts'] == 2 and report['jobs'][0]['errors'][0].startswith('exit code 1')
+
+# 4️⃣ A hung training is killed after the timeout:
+def test_hung_training_times_out(tmp_path):
+    folder = tmp_path / 'alice'
+    folder.mkdir()
+    start = time.perf_counter()
+    report = FleetScheduler(command=script('import time; time.sleep(30)'), timeout=0.5, retries=0).run([job(folder)])
+
+    assert report['failed'] == 1 and report['jobs'][0]['errors'] == ['timed out after 0s']
+    assert time.perf_counter() - start < 10
+
+# 5️⃣ Nothing starts once the maintenance window is over:
+def test_nothing_starts_after_the_window(tmp_path):
+    folder = tmp_path / 'alice'
+    folder.mkdir()
+    report = FleetScheduler(command=script('open("ran", "w")'), deadline=time.time() - 1).run([job(folder)])
+
+    assert report['skipped'] == 1
+    assert not (folder / 'ran').exists()
+
+# 6️⃣ Every stale job trains exactly once (train_pipeline's own rule + --force_retrain only when needed):
+@pytest.mark.parametrize('reason, models, fresh_data', [
+    ('no model', [], False),
+    ('fresh data', ['models/xgb_model_20250701'], True),
+    ('forced', ['models/xgb_model_20250701'], False),
+    ('unreadable state (bad manifest)', [], False),
+])
+def test_each_stale_job_trains_once(reason, models, fresh_data):
+    command = training_command(reason)
+    with patch('src.pipeline.train_pipeline._models_paths', return_value=models), \
+         patch('src.pipeline.train_pipeline._fresh_data_is_due', return_value=fresh_data), \
+         patch('src.pipeline.train_pipeline.read_manifest', return_value={}), \
+         patch('src.pipeline.train_pipeline.train_selected_model') as mock_train:
+        train_execution_pipeline(force_retrain='--force_retrain' in command, models_dir='models')
+
+    mock_train.assert_called_once()
+    assert ('--force_retrain' in command) == (reason == 'forced' or reason.startswith('unreadable state'))
@@ -0,0 +1,52 @@
+import threading
+import numpy as np
+import pytest
+from src.pipeline.micro_batcher import MicroBatcher, QueueFullError
+
+# Fake predict function which records the size of every call
+def make_predict(calls):
+    def predict(matrix, loaded=None):
+        calls.append(len(matrix))
+        return matrix[:, 0] * 10
+    return predict
+
+# 1️⃣ Concurrent rows inside the same window are scored with one call:
+def test_concurrent_rows_are_coalesced():
+    calls = []
+    batcher = MicroBatcher(make_predict(calls), window_ms=200, max_rows=4, max_queue=16)
+    results = {}
+
+    def request(i):
+        results[i] = batcher.submit(np.array([[i, 0.0]]), timeout=5)
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Every request gets its own prediction back
+    assert {i: float(results[i][0]) for i in range(4)} == {i: i * 10.0 for i in range(4)}
+    assert sum(calls) == 4 and len(calls) < 4
+    stats = batcher.stats()
+    assert stats['Rows'] == 4 and stats['Batches'] == len(calls)
+
+# 2️⃣ Model errors reach the waiting request:
+def test_errors_are_propagated():
+    def failing_predict(matrix, loaded=None):
+        raise RuntimeError('boom')
+    batcher = MicroBatcher(failing_predict, window_ms=1, max_rows=2, max_queue=2)
+
+    with pytest.raises(RuntimeError, match='boom'):
+        batcher.submit(np.array([[1.0]]), timeout=5)
+
+# 3️⃣ Backpressure when the queue is full:
+def test_full_queue_is_rejected():
+    batcher = MicroBatcher(make_predict([]), window_ms=1, max_rows=1, max_queue=1)
+    # Pretend the worker is already running so nothing drains the queue
+    batcher._ensure_worker = lambda: None
+    batcher._queue.put_nowait(None)
+
+    with pytest.raises(QueueFullError):
+        batcher.submit(np.array([[1.0]]))
+    assert batcher.stats()['Rejected'] == 1
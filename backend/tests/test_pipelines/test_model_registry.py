@@ -0,0 +1,96 @@
+import os
+import pytest
+from unittest.mock import patch, MagicMock
+from src.pipeline.model_registry import ModelRegistry
+
+# Helper which creates an (empty) model file. joblib.load is mocked so the content doesn't matter.
+def touch_model(folder, version, mtime=None):
+    path = folder / f'xgb_model_{version}.pkl'
+    path.write_bytes(b'')
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+# 1️⃣ The model is loaded only once and then kept resident:
+@patch('joblib.load')
+def test_model_is_loaded_once(mock_joblib, tmp_path):
+    touch_model(tmp_path, '20240720')
+    mock_joblib.return_value = MagicMock()
+    registry = ModelRegistry(model_dir=tmp_path)
+
+    first = registry.get()
+    second = registry.get()
+
+    mock_joblib.assert_called_once()
+    assert first is second
+    assert first.version == '20240720'
+
+# 2️⃣ A newer model is swapped in by refresh and the old snapshot stays usable:
+@patch('joblib.load')
+def test_refresh_swaps_newer_model(mock_joblib, tmp_path):
+    old_model, new_model = MagicMock(), MagicMock()
+    mock_joblib.side_effect = [old_model, new_model]
+    touch_model(tmp_path, '20240720')
+    registry = ModelRegistry(model_dir=tmp_path)
+    old = registry.get()
+
+    # Nothing changed => nothing to load
+    assert registry.refresh() is False
+
+    touch_model(tmp_path, '20240801')
+    assert registry.refresh() is True
+
+    assert registry.get().model is new_model
+    assert registry.get().version == '20240801'
+    assert old.model is old_model
+    # Only the resident version is reported on /metrics
+    from src import monitoring
+    assert monitoring.model_info.value(version='20240801') == 1
+    assert 'version="20240720"' not in '\n'.join(monitoring.model_info.render())
+    assert registry.info()['Version'] == '20240801'
+
+# 3️⃣ A broken file doesn't replace the resident model:
+@patch('joblib.load')
+def test_broken_model_keeps_resident_one(mock_joblib, tmp_path):
+    resident = MagicMock()
+    mock_joblib.side_effect = [resident, EOFError('half-written file')]
+    touch_model(tmp_path, '20240720')
+    registry = ModelRegistry(model_dir=tmp_path)
+    registry.get()
+
+    touch_model(tmp_path, '20240801')
+    with pytest.raises(EOFError):
+        registry.refresh()
+
+    assert registry.get().model is resident
+
+# 4️⃣ No model at all:
+def test_no_model_raises(tmp_path):
+    registry = ModelRegistry(model_dir=tmp_path)
+    with pytest.raises(FileNotFoundError):
+        registry.get()
+    assert registry.info() == {}
+
+# 5️⃣ The feature order is loaded together with the model:
+@patch('joblib.load')
+def test_schema_is_bound_to_model(mock_joblib, tmp_path):
+    touch_model(tmp_path, '20240720')
+    (tmp_path / 'model_features.json').write_text('["heart_rate", "stress_max"]')
+    registry = ModelRegistry(model_dir=tmp_path)
+
+    assert registry.get().schema.features == ('heart_rate', 'stress_max')
+    assert registry.info()['Features'] == ['heart_rate', 'stress_max']
+
+# 6️⃣ The compiled forest is preferred over the pickle when it exists:
+@patch('src.pipeline.model_registry.CompiledForest.load')
+@patch('joblib.load')
+def test_compiled_forest_is_preferred(mock_joblib, mock_compiled, tmp_path):
+    touch_model(tmp_path, '20240720')
+    (tmp_path / 'xgb_model_20240720.npz').write_bytes(b'')
+
+    assert registry_model(tmp_path, compiled=True) is mock_compiled.return_value
+    mock_joblib.assert_not_called()
+    assert registry_model(tmp_path, compiled=False) is mock_joblib.return_value
+
+def registry_model(folder, compiled):
+    return ModelRegistry(model_dir=folder, compiled=compiled).get().model
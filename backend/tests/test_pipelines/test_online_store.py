@@ -0,0 +1,50 @@
+import math
+from datetime import date, timedelta
+
+import pandas as pd
+
+from src.components.feature_engine import build_features, history_days
+from src.pipeline.online_store import OnlineFeatureStore, assemble_features
+
+def test_window_is_bounded_and_persisted(tmp_path):
+    path = str(tmp_path / "online.sqlite")
+    store = OnlineFeatureStore(path, window_days=4)
+    start = date(2024, 7, 1)
+    for i in range(10):
+        store.put("user-1", start + timedelta(days=i), {"heart_min_rate": 50 + i})
+    store.put("user-2", start, {"heart_min_rate": 60})
+
+    # A new process (e.g. after a restart) reads the same file
+    reopened = OnlineFeatureStore(path, window_days=4)
+    history = reopened.history("user-1", start + timedelta(days=9))
+    assert [day.day for day, _ in history] == [7, 8, 9, 10]
+    assert reopened.stats() == {"Users": 2, "Days": 5, "Window_days": 4}
+
+def test_features_match_the_training_engine():
+    start = date(2024, 7, 1)
+    history = [(start + timedelta(days=i), {"heart_min_rate": 50.0 + i, "heart_rate": 80.0}) for i in range(4)]
+
+    features = assemble_features(history, ["heart_min_rate", "heart_rate"])
+
+    assert features["heart_min_rate"] == 53.0
+    assert [features[f"heart_min_rate_lag{k}"] for k in (1, 2, 3)] == [52.0, 51.0, 50.0]
+
+def test_window_holds_the_ewm_history(tmp_path):
+    config = {"features_to_lag": ["heart_min_rate"], "lags": [1], "ewm_spans": [7]}
+    store = OnlineFeatureStore(str(tmp_path / "online.sqlite"), window_days=history_days(config) + 1)
+    start = date(2024, 7, 1)
+    days = [start + timedelta(days=i) for i in range(60)]
+    values = [50.0 + (i * 7) % 13 for i in range(60)]
+    for day, value in zip(days, values):
+        store.put("user-1", day, {"heart_min_rate": value})
+    for day, value in zip(days[:4], values):
+        store.put("user-2", day, {"heart_min_rate": value})
+
+    # A short history doesn't serve an EWM of a couple of days
+    short = assemble_features(store.history("user-2", days[3]), ["heart_min_rate"], config)
+    assert not math.isnan(short["heart_min_rate_lag1"]) and math.isnan(short["heart_min_rate_ewm7"])
+
+    # A full window serves the value of the training set
+    features = assemble_features(store.history("user-1", days[-1]), ["heart_min_rate"], config)
+    training = build_features(pd.DataFrame({"date": days, "heart_min_rate": values}), config).iloc[-1]
+    assert math.isclose(features["heart_min_rate_ewm7"], training["heart_min_rate_ewm7"])
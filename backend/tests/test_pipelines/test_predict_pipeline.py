@@ -3,10 +3,11 @@ from unittest.mock import patch, MagicMock
 import pandas as pd
 import numpy as np
 from src.pipeline.predict_pipeline import predict_input
+from src.pipeline.model_registry import ModelRegistry
 
-@patch('src.pipeline.predict_pipeline.joblib.load')
-@patch('src.pipeline.predict_pipeline.glob.glob')
-@patch('src.pipeline.predict_pipeline.pd.read_csv')
+@patch('joblib.load')
+@patch('src.pipeline.model_registry.glob.glob')
+@patch('pandas.read_csv')
 def test_if_na_data_provided(mock_read_csv,mock_glob,mock_joblib):
     
     # The mock for model.pkl
@@ -34,11 +35,11 @@ def test_if_na_data_provided(mock_read_csv,mock_glob,mock_joblib):
     
     # ⚠️ Check if ValueError is raised:
     with pytest.raises(ValueError, match='You have to provide all the values to predict your Stress Score'):
-        predict_input(mock_read_csv("fake_path.csv"))
+        predict_input(mock_read_csv("fake_path.csv"), registry=ModelRegistry())
         
-@patch('src.pipeline.predict_pipeline.joblib.load')
-@patch('src.pipeline.predict_pipeline.glob.glob')
-@patch('src.pipeline.predict_pipeline.pd.read_csv')    
+@patch('joblib.load')
+@patch('src.pipeline.model_registry.glob.glob')
+@patch('pandas.read_csv')    
 def test_if_not_model_path(mock_read_csv,mock_glob,mock_joblib):
     
     # 1️⃣ I need to mock a full form in order to pass the first if statement.
@@ -58,12 +59,13 @@ def test_if_not_model_path(mock_read_csv,mock_glob,mock_joblib):
     
     # 2️⃣ The I can try directly if runs the exception
     with pytest.raises(RuntimeError, match='📄 Model file not found'):
-        predict_input(mock_read_csv('fake_path.csv'))
+        predict_input(mock_read_csv('fake_path.csv'), registry=ModelRegistry())
         
-@patch('src.pipeline.predict_pipeline.joblib.load')
-@patch('src.pipeline.predict_pipeline.glob.glob')
-@patch('src.pipeline.predict_pipeline.pd.read_csv')    
-def test_if_model_path(mock_read_csv,mock_glob,mock_joblib):
+@patch('src.pipeline.model_registry.os.path.getmtime', return_value=0.0)
+@patch('joblib.load')
+@patch('src.pipeline.model_registry.glob.glob')
+@patch('pandas.read_csv')    
+def test_if_model_path(mock_read_csv,mock_glob,mock_joblib,mock_getmtime):
     
     # 1️⃣ I need to mock a full form in order to pass the first if statement.
     mock_read_csv.side_effect = None # Restart the side effect from the preview test.
@@ -81,16 +83,17 @@ def test_if_model_path(mock_read_csv,mock_glob,mock_joblib):
     mock_glob.return_value =['models/xgb_model_20240720.pkl']
     
     # Act
-    predict_input(mock_read_csv('fake_path.csv'))
+    predict_input(mock_read_csv('fake_path.csv'), registry=ModelRegistry())
     
     # Assert
     mock_joblib.assert_called_once_with('models/xgb_model_20240720.pkl')
 
 
-@patch('src.pipeline.predict_pipeline.joblib.load')
-@patch('src.pipeline.predict_pipeline.glob.glob')
-@patch('src.pipeline.predict_pipeline.pd.read_csv')
-def test_model_predict(mock_read_csv,mock_glob,mock_joblib):
+@patch('src.pipeline.model_registry.os.path.getmtime', return_value=0.0)
+@patch('joblib.load')
+@patch('src.pipeline.model_registry.glob.glob')
+@patch('pandas.read_csv')
+def test_model_predict(mock_read_csv,mock_glob,mock_joblib,mock_getmtime):
     
     # 1️⃣ I need to mock a full form in order to pass the first if statement.
     mock_read_csv.side_effect = None # Restart the side effect from the preview test.
@@ -113,7 +116,7 @@ def test_model_predict(mock_read_csv,mock_glob,mock_joblib):
     mock_joblib.return_value = mock_model
 
     # Act
-    result = predict_input(mock_read_csv('fake_path.csv'))
+    result = predict_input(mock_read_csv('fake_path.csv'), registry=ModelRegistry())
 
     # Assert
     mock_model.predict.assert_called_once()
@@ -0,0 +1,38 @@
+import numpy as np
+from unittest.mock import patch
+
+from src.pipeline.prediction_cache import PredictionCache
+
+def row(value):
+    return np.full((1, 3), value, dtype=np.float32)
+
+def test_lru_eviction():
+    cache = PredictionCache(max_entries=2, ttl_seconds=0)
+    cache.get("v1", row(1))
+    for value in (1, 2):
+        cache.put("v1", row(value), np.array([value]))
+    cache.get("v1", row(1))              # 1 becomes the most recently used
+    cache.put("v1", row(3), np.array([3]))  # => 2 is evicted
+
+    assert cache.get("v1", row(2)) is None
+    assert cache.get("v1", row(1))[0] == 1
+    assert cache.stats()["Evictions"] == 1
+
+def test_ttl_expiration():
+    cache = PredictionCache(max_entries=10, ttl_seconds=60)
+    with patch("src.pipeline.prediction_cache.time.monotonic", side_effect=[0, 30, 61]):
+        cache.get("v1", row(1))
+        cache.put("v1", row(1), np.array([1]))
+        assert cache.get("v1", row(1))[0] == 1
+        assert cache.get("v1", row(1)) is None
+    assert cache.stats()["Expirations"] == 1
+
+def test_new_model_version_invalidates():
+    cache = PredictionCache(max_entries=10, ttl_seconds=0)
+    cache.get("v1", row(1))
+    cache.put("v1", row(1), np.array([1]))
+
+    assert cache.get("v2", row(1)) is None
+    # A prediction computed by the old model arriving late is not stored
+    cache.put("v1", row(1), np.array([1]))
+    assert cache.stats()["Entries"] == 0 and cache.stats()["Invalidations"] == 1
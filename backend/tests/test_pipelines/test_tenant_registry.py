@@ -0,0 +1,102 @@
+import time
+import threading
+import pytest
+from unittest.mock import patch, MagicMock
+from src.pipeline.tenant_registry import TenantRegistry, UnknownTenantError
+
+# Helper which creates an (empty) legacy model of a tenant. joblib.load is mocked so the content doesn't matter.
+def touch_tenant_model(root, tenant, version='20240720', size=0):
+    models = root / tenant / 'models'
+    models.mkdir(parents=True, exist_ok=True)
+    path = models / f'xgb_model_{version}.pkl'
+    path.write_bytes(b'0' * size)
+    return path
+
+# 1️⃣ Every tenant gets its own model:
+@patch('joblib.load')
+def test_each_tenant_gets_its_latest_model(mock_joblib, tmp_path):
+    mock_joblib.side_effect = lambda path: MagicMock(path=str(path))
+    touch_tenant_model(tmp_path, 'alice', '20240720')
+    touch_tenant_model(tmp_path, 'alice', '20240801')
+    touch_tenant_model(tmp_path, 'bob', '20240705')
+    tenants = TenantRegistry(root=tmp_path, max_models=10, max_memory_mb=0)
+
+    assert tenants.get('alice').version == '20240801'
+    assert tenants.get('bob').version == '20240705'
+    assert tenants.get('alice') is tenants.get('alice')
+    assert mock_joblib.call_count == 2
+    assert tenants.stats()['Hits'] == 2
+
+# 2️⃣ Bounded residency: least recently used tenants are evicted by count and by memory:
+@patch('joblib.load')
+def test_least_recently_used_tenants_are_evicted(mock_joblib, tmp_path):
+    mock_joblib.return_value = MagicMock()
+    for tenant in ('a', 'b', 'c'):
+        touch_tenant_model(tmp_path, tenant)
+    tenants = TenantRegistry(root=tmp_path, max_models=2, max_memory_mb=0)
+
+    tenants.get('a'); tenants.get('b'); tenants.get('a'); tenants.get('c')
+    stats = tenants.stats()
+    assert stats['Resident'] == 2 and stats['Evictions'] == 1
+    # 'b' was the least recently used one => reloaded on its next request
+    tenants.get('a')
+    assert mock_joblib.call_count == 3
+    tenants.get('b')
+    assert mock_joblib.call_count == 4
+
+@patch('joblib.load')
+def test_memory_budget_evicts_models(mock_joblib, tmp_path):
+    mock_joblib.return_value = MagicMock()
+    for tenant in ('a', 'b', 'c'):
+        touch_tenant_model(tmp_path, tenant, size=400 * 1024)
+    tenants = TenantRegistry(root=tmp_path, max_models=0, max_memory_mb=1)
+
+    for tenant in ('a', 'b', 'c'):
+        tenants.get(tenant)
+    stats = tenants.stats()
+    assert stats['Resident'] == 2 and stats['Resident_mb'] <= 1
+
+# 3️⃣ Concurrent misses of the same tenant share a single load:
+@patch('joblib.load')
+def test_concurrent_misses_load_once(mock_joblib, tmp_path):
+    def slow_load(path):
+        time.sleep(0.2)
+        return MagicMock()
+    mock_joblib.side_effect = slow_load
+    touch_tenant_model(tmp_path, 'alice')
+    tenants = TenantRegistry(root=tmp_path)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(tenants.get('alice'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    mock_joblib.assert_called_once()
+    assert len(results) == 8 and all(result is results[0] for result in results)
+    assert tenants.stats()['Coalesced_loads'] >= 1
+
+# 4️⃣ Unknown or invalid tenants:
+def test_unknown_and_invalid_tenants(tmp_path):
+    tenants = TenantRegistry(root=tmp_path)
+    with pytest.raises(UnknownTenantError):
+        tenants.get('nobody')
+    (tmp_path / 'empty' / 'models').mkdir(parents=True)
+    with pytest.raises(UnknownTenantError):
+        tenants.get('empty')
+    for tenant in ('../models', 'a/b', '', '..'):
+        with pytest.raises(UnknownTenantError):
+            tenants.get(tenant)
+    assert tenants.stats()['Resident'] == 0
+
+# 5️⃣ A resident tenant picks up its retrained model:
+@patch('joblib.load')
+def test_resident_tenant_is_refreshed(mock_joblib, tmp_path):
+    mock_joblib.return_value = MagicMock()
+    touch_tenant_model(tmp_path, 'alice', '20240720')
+    tenants = TenantRegistry(root=tmp_path, refresh_interval=0)
+    assert tenants.get('alice').version == '20240720'
+
+    touch_tenant_model(tmp_path, 'alice', '20240801')
+    assert tenants.get('alice').version == '20240801'
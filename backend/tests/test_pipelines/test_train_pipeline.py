@@ -12,9 +12,13 @@ from src.pipeline.train_pipeline import train_execution_pipeline
 # You can also mock internal functions that never will be call inside the test in order
 # to prevent real execution (e.g., avoid real read_csv calls during test).
 
+# Dates of the processed dataset (stored with the date as a datetime index)
+STORED_DATASET = pd.DataFrame(index=pd.DatetimeIndex([pd.to_datetime(date.today())], name='date'))
+
 # 1️⃣ Check if first time training works properly:
 @patch('src.pipeline.train_pipeline.train_selected_model')
 @patch('src.pipeline.train_pipeline.glob.glob')
+@patch('src.pipeline.train_pipeline.read_processed', new=lambda columns=None: STORED_DATASET)
 @patch('src.pipeline.train_pipeline.pd.read_csv')
 def test_train_from_scratch(mock_read_csv, mock_glob, mock_train):
     '''
@@ -27,7 +31,6 @@ def test_train_from_scratch(mock_read_csv, mock_glob, mock_train):
     
     # ✅ Return real DataFrames — not mocks
     mock_read_csv.side_effect = [
-        pd.DataFrame({'date': [pd.to_datetime(date.today())]}),  # This simulates data.csv
         pd.DataFrame({'date': [pd.to_datetime(date.today())]})   # This simulates metrics_log.csv
     ]
 
@@ -40,6 +43,7 @@ def test_train_from_scratch(mock_read_csv, mock_glob, mock_train):
 # 2️⃣ Check if we have fresh new data an a model updated:
 @patch('src.pipeline.train_pipeline.train_selected_model')
 @patch('src.pipeline.train_pipeline.glob.glob')
+@patch('src.pipeline.train_pipeline.read_processed', new=lambda columns=None: STORED_DATASET)
 @patch('src.pipeline.train_pipeline.pd.read_csv')
 def test_train_due_new_data(mock_read_csv, mock_glob, mock_train):
     
@@ -48,7 +52,6 @@ def test_train_due_new_data(mock_read_csv, mock_glob, mock_train):
     
     # ✅ Return real DataFrames — not mocks
     mock_read_csv.side_effect = [
-        pd.DataFrame({'date': [pd.to_datetime(date.today())]}),  # This simulates data.csv
         pd.DataFrame({'date': [pd.to_datetime('2025-07-25')]})   # This simulates metrics_log.csv
     ]
 
@@ -61,6 +64,7 @@ def test_train_due_new_data(mock_read_csv, mock_glob, mock_train):
 # 3️⃣ Check if we need to force the re-training model for some reason works properly:
 @patch('src.pipeline.train_pipeline.train_selected_model')
 @patch('src.pipeline.train_pipeline.glob.glob')
+@patch('src.pipeline.train_pipeline.read_processed', new=lambda columns=None: STORED_DATASET)
 @patch('src.pipeline.train_pipeline.pd.read_csv')
 def test_force_retrain(mock_read_csv, mock_glob, mock_train):
     # Simulate model exists
@@ -68,7 +72,6 @@ def test_force_retrain(mock_read_csv, mock_glob, mock_train):
 
     # ✅ Return real DataFrames — not mocks
     mock_read_csv.side_effect = [
-        pd.DataFrame({'date': [pd.to_datetime(date.today())]}),  # This simulates data.csv
         pd.DataFrame({'date': [pd.to_datetime(date.today())]})   # This simulates metrics_log.csv
     ]
 
@@ -81,13 +84,13 @@ def test_force_retrain(mock_read_csv, mock_glob, mock_train):
 # 4️⃣ Check if the dates condition is not meet and the function is not trigger it. 
 @patch('src.pipeline.train_pipeline.train_selected_model')
 @patch('src.pipeline.train_pipeline.glob.glob')
+@patch('src.pipeline.train_pipeline.read_processed', new=lambda columns=None: STORED_DATASET)
 @patch('src.pipeline.train_pipeline.pd.read_csv')
 def test_no_retrain_needed(mock_read_csv, mock_glob, mock_train):
     mock_glob.return_value = ['models/xgb_model_20250720.pkl']
 
     # ✅ Return real DataFrames — not mocks
     mock_read_csv.side_effect = [
-        pd.DataFrame({'date': [pd.to_datetime(date.today())]}),  # This simulates data.csv
         pd.DataFrame({'date': [pd.to_datetime(date.today())]})   # This simulates metrics_log.csv
     ]
 
@@ -95,3 +98,29 @@ def test_no_retrain_needed(mock_read_csv, mock_glob, mock_train):
     train_execution_pipeline(force_retrain=False)
 
     mock_train.assert_not_called()
+
+# 5️⃣ With a manifest the decision doesn't read the dataset, the logs or the models folder:
+@patch('src.pipeline.train_pipeline.train_selected_model')
+@patch('src.pipeline.train_pipeline.glob.glob')
+@patch('src.pipeline.train_pipeline.read_processed')
+@patch('src.pipeline.train_pipeline.pd.read_csv')
+@patch('src.pipeline.train_pipeline.sources_changed', return_value=False)
+def test_decision_from_manifest(mock_changed, mock_read_csv, mock_read_processed, mock_glob, mock_train, tmp_path):
+    from src.components.manifest import update_manifest
+    manifest_path = str(tmp_path / 'manifest.json')
+    model_path = tmp_path / 'xgb_model_20250720.pkl'
+    model_path.write_bytes(b'')
+    update_manifest('model', {'path': str(model_path), 'date': date(2025, 7, 20)}, manifest_path)
+    update_manifest('data', {'last_date': date(2025, 7, 19), 'sources': {}}, manifest_path)
+
+    train_execution_pipeline(manifest_path=manifest_path)
+    mock_train.assert_not_called()
+
+    # The raw exports changed after the last transformation => fresh data
+    mock_changed.return_value = True
+    train_execution_pipeline(manifest_path=manifest_path)
+    mock_train.assert_called_once()
+
+    mock_read_csv.assert_not_called()
+    mock_read_processed.assert_not_called()
+    mock_glob.assert_not_called()
@@ -0,0 +1,19 @@
+"""
+Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+
+With `preload_app = True` this module is imported once by the gunicorn master,
+so the model is unpickled before the workers are forked and every worker
+shares the same memory pages copy-on-write.
+"""
+import gc
+from app import app, registry
+
+try:
+    registry.refresh()
+except Exception as e:
+    # The workers will keep answering /ready with 503 until a model shows up.
+    print(f'⚠️ No model could be preloaded => {e}')
+
+# Move everything loaded so far out of the GC generations: the collector won't
+# touch (and therefore won't copy) those pages in the forked workers.
+gc.freeze()